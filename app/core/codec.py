@@ -0,0 +1,122 @@
+"""
+JSON codec: raw bytes to validated models and back without intermediate dicts
+
+Models are validated from and serialized to JSON bytes by pydantic-core,
+through one cached TypeAdapter per type. Plain values (API payloads, NDJSON
+rows) use orjson when it is installed and pydantic-core otherwise; both
+handle datetimes and emit compact UTF-8.
+"""
+from functools import lru_cache
+from typing import Any, Optional, Type, TypeVar, Union
+
+from pydantic import TypeAdapter
+from pydantic_core import from_json
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Optional: pydantic-core is the fallback
+    orjson = None
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def type_adapter(tp: Any) -> TypeAdapter:
+    """
+    TypeAdapter for a type, built once per process
+
+    Building an adapter compiles the type's validator and serializer, which
+    costs far more than using it.
+
+    Args:
+        tp: Model class or typing expression (e.g. ``List[CVData]``)
+
+    Returns:
+        TypeAdapter: Cached adapter
+    """
+    return TypeAdapter(tp)
+
+
+def validate_json(tp: Type[T], data: Union[bytes, str]) -> T:
+    """
+    Parse and validate JSON straight into a model or typed value
+
+    Args:
+        tp: Target type
+        data: JSON document
+
+    Returns:
+        Validated value
+
+    Raises:
+        pydantic.ValidationError: If the JSON is malformed or invalid for ``tp``
+    """
+    return type_adapter(tp).validate_json(data)
+
+
+def dump_json(tp: Any, value: Any, indent: Optional[int] = None) -> bytes:
+    """
+    Serialize a model or typed value to JSON bytes
+
+    Output is deterministic (fields in declaration order), so it can be
+    hashed for cache keys.
+
+    Args:
+        tp: Declared type of ``value``
+        value: Value to serialize
+        indent: Pretty-print with this indentation
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    return type_adapter(tp).dump_json(value, indent=indent)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize plain data (dicts, lists, strings, numbers, datetimes) to JSON bytes
+
+    Args:
+        value: Value to serialize
+
+    Returns:
+        bytes: Compact UTF-8 JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return type_adapter(Any).dump_json(value)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse JSON into plain data
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Parsed value
+
+    Raises:
+        ValueError: If the JSON is malformed
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return from_json(data)
+
+
+class JSONBytesResponse(Response):
+    """
+    JSON response whose body is serialized by this codec
+
+    Bytes (e.g. from dump_json) are sent as they are; anything else goes
+    through dumps. Handlers returning it skip FastAPI's jsonable_encoder.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
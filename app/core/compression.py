@@ -0,0 +1,164 @@
+"""
+Response compression: Content-Encoding negotiation, precompression and a
+middleware compressing large JSON responses on the fly
+"""
+import gzip
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses fall back to gzip
+    brotli = None
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+
+# Encodings this process can produce, preferred first
+ENCODINGS: Tuple[str, ...] = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+
+# Settings for artifacts compressed once and served many times
+_STORED_LEVELS = {GZIP: 9, BROTLI: 11}
+# Settings for responses compressed per request
+_DYNAMIC_LEVELS = {GZIP: 6, BROTLI: 4}
+
+
+def compress(content: bytes, encoding: str, stored: bool = False) -> bytes:
+    """
+    Compress content for a Content-Encoding
+
+    Output is deterministic (gzip carries no timestamp), so equal content
+    always compresses to equal bytes.
+
+    Args:
+        content: Uncompressed bytes
+        encoding: GZIP or BROTLI
+        stored: Use the slowest, smallest setting for artifacts that are
+            compressed once and served many times
+
+    Returns:
+        bytes: Encoded content
+    """
+    level = (_STORED_LEVELS if stored else _DYNAMIC_LEVELS)[encoding]
+    if encoding == BROTLI:
+        return brotli.compress(content, quality=level)
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def precompress(content: bytes) -> Dict[str, bytes]:
+    """
+    Every encoded variant of an artifact, for storing next to it
+
+    Args:
+        content: Uncompressed bytes
+
+    Returns:
+        dict: Encoding to encoded bytes, for each encoding in ENCODINGS
+    """
+    return {encoding: compress(content, encoding, stored=True) for encoding in ENCODINGS}
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Sequence[str] = ENCODINGS) -> str:
+    """
+    Pick the Content-Encoding for a request's Accept-Encoding header
+
+    Highest q-value wins; ties go to the order of ``available`` (brotli
+    first). ``*`` stands for any encoding not listed explicitly.
+
+    Args:
+        accept_encoding: Accept-Encoding request header, if any
+        available: Encodings that can be served
+
+    Returns:
+        str: One of ``available``, or IDENTITY
+    """
+    if not accept_encoding:
+        return IDENTITY
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    best, best_quality = IDENTITY, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress complete responses of the given media types above a size threshold
+
+    Streaming responses (several body messages, e.g. NDJSON or ZIP exports)
+    and responses that already carry a Content-Encoding pass through
+    untouched, so streams keep flushing line by line.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        media_types: Iterable[str] = ("application/json",)
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.media_types = tuple(media_types)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding == IDENTITY:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not headers.get("content-type", "").startswith(self.media_types)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
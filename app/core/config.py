@@ -0,0 +1,98 @@
+"""
+Application configuration for CV Generator application
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def _get_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _get_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment"""
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+class Settings:
+    """Runtime settings, read once from environment variables (or .env)"""
+
+    def __init__(self) -> None:
+        # Storage ("local" shards CVs into <dir>/ab/cd/<cv_id>/, "flat" is the legacy
+        # layout, "s3" uses an object store; the index and caches stay under generated_dir)
+        self.storage_backend = os.getenv("CV_STORAGE_BACKEND", "local")
+        self.generated_dir = os.getenv("CV_GENERATED_DIR", "generated")
+
+        # Encoding of newly written CV data files ("compact" or "json"); reads accept both
+        self.data_format = os.getenv("CV_DATA_FORMAT", "compact")
+
+        # Jinja2 templates and their compiled bytecode ("" disables the bytecode cache)
+        self.templates_dir = os.getenv("CV_TEMPLATES_DIR", "templates")
+        self.template_cache_dir = os.getenv("CV_TEMPLATE_CACHE_DIR", ".template_cache")
+
+        # S3-compatible object store (CV_STORAGE_BACKEND=s3)
+        self.s3_bucket = os.getenv("CV_S3_BUCKET", "")
+        self.s3_prefix = os.getenv("CV_S3_PREFIX", "cvs/")
+        self.s3_endpoint_url = os.getenv("CV_S3_ENDPOINT_URL") or None
+        self.s3_region = os.getenv("CV_S3_REGION") or os.getenv("AWS_REGION") or None
+        self.s3_max_pool_connections = _get_int("CV_S3_MAX_POOL_CONNECTIONS", 50)
+        self.s3_multipart_threshold = _get_int("CV_S3_MULTIPART_THRESHOLD", 8 * 1024 * 1024)
+        self.s3_multipart_concurrency = _get_int("CV_S3_MULTIPART_CONCURRENCY", 8)
+        self.cache_dir = os.getenv("CV_CACHE_DIR", os.path.join(self.generated_dir, "cache"))
+
+        # PDF artifact cache
+        self.pdf_cache_max_bytes = _get_int("CV_PDF_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+
+        # Lazily rendered CV pages: in-memory LRU in front of a disk cache
+        self.html_cache_memory_bytes = _get_int("CV_HTML_CACHE_MEMORY_BYTES", 16 * 1024 * 1024)
+        self.html_cache_max_bytes = _get_int("CV_HTML_CACHE_MAX_BYTES", 128 * 1024 * 1024)
+
+        # PDF render engine (0 workers renders on a thread instead of processes)
+        self.pdf_workers = _get_int("CV_PDF_WORKERS", os.cpu_count() or 1)
+        self.pdf_render_timeout = _get_float("CV_PDF_RENDER_TIMEOUT", 60.0)
+
+        # POST /api/v1/cvs/batch: rows per request, CVs stored per index transaction
+        self.batch_max_items = _get_int("CV_BATCH_MAX_ITEMS", 1000)
+        self.batch_group_size = _get_int("CV_BATCH_GROUP_SIZE", 50)
+
+        # ZIP export of PDFs: CVs per archive, CVs fetched/rendered at once
+        self.export_max_items = _get_int("CV_EXPORT_MAX_ITEMS", 1000)
+        self.export_concurrency = _get_int("CV_EXPORT_CONCURRENCY", max(self.pdf_workers, 1) * 2)
+
+        # Resume books: CVs per book, disk cache of rendered books
+        self.book_max_items = _get_int("CV_BOOK_MAX_ITEMS", 500)
+        self.book_cache_max_bytes = _get_int("CV_BOOK_CACHE_MAX_BYTES", 1024 * 1024 * 1024)
+
+        # JSON responses at least this large are gzip/brotli compressed on the fly
+        self.compress_min_bytes = _get_int("CV_COMPRESS_MIN_BYTES", 1024)
+
+        # Queue a PDF render as soon as a CV is generated
+        self.pdf_prerender = _get_bool("CV_PDF_PRERENDER", False)
+
+        # Logging: level, "text" or "json" lines, size-rotated file ("" logs to stdout only)
+        self.log_level = os.getenv("CV_LOG_LEVEL", "INFO")
+        self.log_format = os.getenv("CV_LOG_FORMAT", "text")
+        self.log_file = os.getenv("CV_LOG_FILE", "app.log")
+        self.log_max_bytes = _get_int("CV_LOG_MAX_BYTES", 10 * 1024 * 1024)
+        self.log_backup_count = _get_int("CV_LOG_BACKUP_COUNT", 5)
+
+        # /metrics: per-worker snapshot files merged on scrape ("" reports the serving worker only)
+        self.metrics_dir = os.getenv("CV_METRICS_DIR", os.path.join(self.generated_dir, "metrics"))
+        self.metrics_interval = _get_float("CV_METRICS_INTERVAL", 5.0)
+
+
+settings = Settings()
@@ -0,0 +1,137 @@
+"""
+Artifact responses with HTTP Range support, streamed from disk when possible
+"""
+import os
+from pathlib import Path
+from typing import Mapping, Optional, Tuple, Union
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a Range header selects nothing inside the representation"""
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range against a representation size
+
+    Multiple ranges and other units are ignored (None), which RFC 9110
+    allows: the full representation is sent instead.
+
+    Args:
+        range_header: Range request header
+        size: Length of the representation in bytes
+
+    Returns:
+        Optional[Tuple[int, int]]: Inclusive ``(start, end)`` offsets, or None
+
+    Raises:
+        RangeNotSatisfiable: If the range lies outside the representation
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+
+    if start < 0 or start > end or start >= size:
+        raise RangeNotSatisfiable(f"bytes */{size}")
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(FileResponse):
+    """206 response streaming one byte range of a file in chunks off the event loop"""
+
+    def __init__(self, path: Union[str, Path], start: int, end: int, stat_result: os.stat_result, **kwargs):
+        super().__init__(path, status_code=206, stat_result=stat_result, **kwargs)
+        self.start = start
+        self.end = end
+        self.headers["content-range"] = f"bytes {start}-{end}/{stat_result.st_size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # The file shrank underneath us; end the response cleanly
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+def _range_requested(request: Request, headers: Mapping[str, str]) -> bool:
+    """A Range header applies unless If-Range names another version"""
+    if "range" not in request.headers:
+        return False
+    if_range = request.headers.get("if-range")
+    if if_range is None:
+        return True
+    return if_range.strip() in (headers.get("ETag"), headers.get("Last-Modified"))
+
+
+async def artifact_response(
+    request: Request,
+    content: Union[bytes, Path],
+    media_type: str,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """
+    Respond with an artifact held in memory or stored in a file
+
+    Files are never read into memory: they are streamed by FileResponse
+    (which ASGI servers may send with sendfile) and their metadata is
+    fetched on a worker thread. Single byte ranges get a 206 for both
+    kinds, so interrupted PDF downloads resume and viewers can fetch pages.
+
+    Args:
+        request: Incoming request (for Range and If-Range)
+        content: Artifact bytes, or the path of the file holding them
+        media_type: Content-Type of the artifact
+        headers: Extra response headers (validators, disposition, encoding)
+
+    Returns:
+        Response: 200, 206 or 416 response
+    """
+    headers = {**(headers or {}), "Accept-Ranges": "bytes"}
+    if isinstance(content, Path):
+        stat_result = await anyio.to_thread.run_sync(os.stat, content)
+        size = stat_result.st_size
+    else:
+        size = len(content)
+
+    byte_range = None
+    if _range_requested(request, headers):
+        try:
+            byte_range = parse_range(request.headers["range"], size)
+        except RangeNotSatisfiable as e:
+            return Response(status_code=416, headers={**headers, "Content-Range": str(e)})
+
+    if isinstance(content, Path):
+        if byte_range is not None:
+            return RangeFileResponse(content, *byte_range, stat_result=stat_result, media_type=media_type, headers=headers)
+        return FileResponse(content, stat_result=stat_result, media_type=media_type, headers=headers)
+
+    if byte_range is not None:
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return Response(content[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+    return Response(content, media_type=media_type, headers=headers)
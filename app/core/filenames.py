@@ -0,0 +1,10 @@
+"""
+Download filenames derived from CV data
+"""
+import re
+
+
+def create_filename(name: str) -> str:
+    """Create a clean filename from the user's name"""
+    clean_name = re.sub(r'[^a-zA-Z0-9\s]', '', name)
+    return clean_name.replace(' ', '_').lower()
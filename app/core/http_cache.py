@@ -0,0 +1,110 @@
+"""
+HTTP caching helpers: validators, conditional requests and Cache-Control values
+"""
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+# Stored by browsers and CDNs, but revalidated (cheaply, via 304) before reuse
+NO_CACHE = "no-cache"
+
+# Content-hashed URLs never change, so they may be reused without asking
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def make_etag(digest: str, encoding: Optional[str] = None) -> str:
+    """
+    Strong entity tag for a content hash
+
+    Each Content-Encoding of a resource is a different representation, so
+    it gets its own tag.
+
+    Args:
+        digest: Hex digest identifying the content (e.g. a cache key)
+        encoding: Content-Encoding of the response body, if compressed
+
+    Returns:
+        str: Quoted ETag value
+    """
+    if encoding and encoding != "identity":
+        return f'"{digest[:32]}-{encoding}"'
+    return f'"{digest[:32]}"'
+
+
+def http_date(value: datetime) -> str:
+    """
+    Format a timestamp as an HTTP-date; naive values are taken as UTC
+
+    Args:
+        value: Timestamp
+
+    Returns:
+        str: e.g. ``Wed, 21 Oct 2015 07:28:00 GMT``
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = NO_CACHE
+) -> Dict[str, str]:
+    """
+    Response headers carrying the validators and caching policy
+
+    Args:
+        etag: Value from make_etag
+        last_modified: When the underlying CV last changed
+        cache_control: Cache-Control value
+
+    Returns:
+        dict: Headers for both the full and the 304 response
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(
+    request_headers: Mapping[str, str],
+    etag: str,
+    last_modified: Optional[datetime] = None
+) -> bool:
+    """
+    Whether a GET can be answered with 304 Not Modified (RFC 9110 13.2.2)
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the client sent no entity tags.
+
+    Args:
+        request_headers: Request headers
+        etag: Current ETag of the representation
+        last_modified: Current modification time
+
+    Returns:
+        bool: True if the client's copy is still current
+    """
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/"x" matches "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return last_modified.replace(microsecond=0) <= since
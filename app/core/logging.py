@@ -1,30 +1,156 @@
 """
 Logging configuration for CV Generator application
+
+Loggers hand records to an in-process queue; a single listener thread
+formats them and writes them to stdout and a size-rotated log file, so a
+request never waits on terminal or disk I/O for a log line.
 """
+import atexit
 import logging
+import queue
 import sys
-from typing import Optional
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
+
+from app.core.codec import dumps
+from app.core.config import settings
+
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else on a record came from ``extra=``
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: time, level, logger, message, and the
+    traceback and ``extra=`` fields when present
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        if record.stack_info:
+            payload["stack"] = self.formatStack(record.stack_info)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+
+        try:
+            return dumps(payload).decode()
+        except TypeError:
+            # An ``extra=`` value the codec can't serialize
+            return dumps({key: _plain(value) for key, value in payload.items()}).decode()
+
+
+def _plain(value: Any) -> Any:
+    """A JSON-serializable stand-in for a value"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    QueueHandler for a listener in the same process
 
+    The stock handler fully formats each record before queueing it so it
+    can be pickled. Nothing is pickled here, so only the message is merged
+    with its arguments on the calling thread; the timestamp, traceback and
+    line layout are formatted on the listener thread. ``extra=`` values are
+    read when the record is written, so pass immutable ones.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments may be mutated after the call returns; capture them now
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
-def setup_logging(level: str = "INFO", format_string: Optional[str] = None) -> None:
+
+def setup_logging(
+    level: Optional[str] = None,
+    format_string: Optional[str] = None,
+    json_format: Optional[bool] = None,
+    log_file: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    backup_count: Optional[int] = None
+) -> None:
     """
     Setup application logging
     
+    Records below ``level`` are dropped by the logger before a record is
+    built. The rest are queued and written by a listener thread, which is
+    drained and stopped at interpreter exit. Calling this again replaces the
+    previous configuration. Unset arguments come from the CV_LOG_* settings.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        format_string: Custom format string for log messages
+        format_string: Custom format string for text log messages
+        json_format: Write one JSON object per line instead of text
+        log_file: Log file path; empty logs to stdout only
+        max_bytes: Size at which the log file is rotated (0 never rotates)
+        backup_count: Rotated files kept (app.log.1, app.log.2, ...)
     """
-    if format_string is None:
-        format_string = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    
-    logging.basicConfig(
-        level=getattr(logging, level.upper()),
-        format=format_string,
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler("app.log")
-        ]
-    )
+    global _listener
+
+    level = level or settings.log_level
+    json_format = settings.log_format == "json" if json_format is None else json_format
+    log_file = settings.log_file if log_file is None else log_file
+    max_bytes = settings.log_max_bytes if max_bytes is None else max_bytes
+    backup_count = settings.log_backup_count if backup_count is None else backup_count
+
+    if json_format:
+        formatter: logging.Formatter = JSONFormatter()
+    else:
+        formatter = logging.Formatter(format_string or DEFAULT_FORMAT)
+
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(
+            RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    stop_logging()
+
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, level.upper()))
+    for handler in root.handlers[:]:
+        if isinstance(handler, _InProcessQueueHandler):
+            root.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(_InProcessQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Write out queued records, stop the listener thread and close its handlers"""
+    global _listener
+
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -0,0 +1,375 @@
+"""
+Process metrics in the Prometheus text exposition format
+
+A small in-process registry of counters and histograms. Recording a value is
+a couple of list updates under a lock, so it is cheap enough for every
+request. Each uvicorn worker keeps its own values and periodically writes
+them to a snapshot file; ``/metrics`` in any worker adds its live values to
+the snapshots of the other running workers, so the totals cover all of them.
+When a worker exits its snapshot is dropped and the merged counters go down,
+which Prometheus reads as a counter reset.
+"""
+import atexit
+import os
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.codec import dumps, loads
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Seconds; from a memory-cache hit (sub-millisecond) to a large PDF layout
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_REGISTRY: Dict[str, "_Metric"] = {}
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric(ABC):
+    """
+    One metric: a child holding the values for each set of label values
+
+    Hot paths bind their labels once (``STAGE_SECONDS.labels("list_cvs")``)
+    and record on the child, which skips the label lookup.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if name in _REGISTRY:
+            raise ValueError(f"Metric {name} is already registered")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, "_Child"] = {}
+        self._lock = threading.Lock()
+        _REGISTRY[name] = self
+
+    def labels(self, *values: str) -> "_Child":
+        """
+        Child recording under a set of label values
+
+        Args:
+            *values: One value per label name, in order
+
+        Returns:
+            Child for these label values, created on first use
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def snapshot(self) -> Dict[LabelValues, List[float]]:
+        """Copy of the current values of every child"""
+        with self._lock:
+            children = list(self._children.items())
+        return {labels: child.values() for labels, child in children}
+
+    @abstractmethod
+    def samples(self, values: Dict[LabelValues, List[float]]) -> Iterable[str]:
+        """Exposition lines for a set of values"""
+
+    @abstractmethod
+    def _new_child(self) -> "_Child":
+        """Empty child for a new set of label values"""
+
+    def _labels(self, labels: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Child(ABC):
+    __slots__ = ("_lock",)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def values(self) -> List[float]:
+        """Current values, in the order samples() expects them"""
+
+
+class _CounterChild(_Child):
+    __slots__ = ("_value",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add to the count"""
+        with self._lock:
+            self._value += amount
+
+    def values(self) -> List[float]:
+        return [self._value]
+
+
+class _HistogramChild(_Child):
+    __slots__ = ("_buckets", "_counts", "_sum")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        super().__init__()
+        self._buckets = buckets
+        # Per-bucket counts, the last for +Inf; cumulated on export
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value (seconds for durations)"""
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> "_Timer":
+        """Context manager observing the time spent in its block (also on exceptions)"""
+        return _Timer(self)
+
+    def values(self) -> List[float]:
+        with self._lock:
+            return [*self._counts, self._sum]
+
+
+class _Timer:
+    __slots__ = ("_child", "_start")
+
+    def __init__(self, child: _HistogramChild) -> None:
+        self._child = child
+
+    def __enter__(self) -> "_Timer":
+        self._start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._child.observe(perf_counter() - self._start)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Add to the count for a set of label values
+
+        Args:
+            *labels: One value per label name, in order
+            amount: Increment
+        """
+        self.labels(*labels).inc(amount)
+
+    def samples(self, values: Dict[LabelValues, List[float]]) -> Iterable[str]:
+        for labels, (count,) in sorted(values.items()):
+            yield f"{self.name}{self._labels(labels)} {_number(count)}"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in fixed buckets, with their sum and count"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = STAGE_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record one value
+
+        Args:
+            value: Observed value (seconds for durations)
+            *labels: One value per label name, in order
+        """
+        self.labels(*labels).observe(value)
+
+    def samples(self, values: Dict[LabelValues, List[float]]) -> Iterable[str]:
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, counts in sorted(values.items()):
+            cumulative = 0.0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{self._labels(labels, le)} {_number(cumulative)}"
+            yield f"{self.name}_sum{self._labels(labels)} {_number(counts[-1])}"
+            yield f"{self.name}_count{self._labels(labels)} {_number(cumulative)}"
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+
+# Application metrics
+STAGE_SECONDS = Histogram(
+    "cv_stage_duration_seconds",
+    "Time spent in each stage of request handling",
+    ("stage",)
+)
+RENDERS = Counter("cv_renders_total", "Documents rendered, by kind", ("kind",))
+CACHE_REQUESTS = Counter("cv_cache_requests_total", "Rendered artifact cache lookups", ("cache", "result"))
+ERRORS = Counter("cv_errors_total", "Requests failed by an application error, by exception class", ("exception",))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def snapshot() -> Dict[str, List[list]]:
+    """
+    Current values of every metric in this process
+
+    Returns:
+        dict: Metric name -> ``[label values, values]`` pairs (JSON-serializable)
+    """
+    return {
+        name: [[list(labels), values] for labels, values in metric.snapshot().items()]
+        for name, metric in _REGISTRY.items()
+    }
+
+
+def render_text(snapshot_dir: Optional[str] = None) -> bytes:
+    """
+    Render all metrics in the Prometheus text format
+
+    Args:
+        snapshot_dir: Directory of per-worker snapshot files to add to this
+            process's values; None reports this process only
+
+    Returns:
+        bytes: Exposition text
+    """
+    merged = {name: metric.snapshot() for name, metric in _REGISTRY.items()}
+    if snapshot_dir:
+        for other in _read_snapshots(Path(snapshot_dir)):
+            for name, rows in other.items():
+                metric_values = merged.get(name)
+                if metric_values is None:
+                    continue
+                for labels, values in rows:
+                    labels = tuple(labels)
+                    current = metric_values.get(labels)
+                    if current is None or len(current) != len(values):
+                        metric_values[labels] = list(values)
+                    else:
+                        metric_values[labels] = [a + b for a, b in zip(current, values)]
+
+    lines = []
+    for name, metric in _REGISTRY.items():
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.type_name}")
+        lines.extend(metric.samples(merged[name]))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _snapshot_file(snapshot_dir: Path, pid: int) -> Path:
+    return snapshot_dir / f"metrics-{pid}.json"
+
+
+def _read_snapshots(snapshot_dir: Path) -> List[Dict[str, List[list]]]:
+    """Snapshots of the other live workers; files left by dead workers are removed"""
+    snapshots = []
+    own_pid = os.getpid()
+    for path in snapshot_dir.glob("metrics-*.json"):
+        try:
+            pid = int(path.stem.split("-", 1)[1])
+        except ValueError:
+            continue
+        if pid == own_pid:
+            continue
+        if not _pid_alive(pid):
+            path.unlink(missing_ok=True)
+            continue
+        try:
+            snapshots.append(loads(path.read_bytes()))
+        except (OSError, ValueError):
+            # Removed or being replaced; the next scrape picks it up
+            continue
+    return snapshots
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def write_snapshot(snapshot_dir: str) -> None:
+    """
+    Atomically write this process's values to its snapshot file
+
+    Args:
+        snapshot_dir: Directory shared by the workers
+    """
+    directory = Path(snapshot_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    target = _snapshot_file(directory, os.getpid())
+    tmp = target.with_suffix(".tmp")
+    tmp.write_bytes(dumps(snapshot()))
+    os.replace(tmp, target)
+
+
+class SnapshotWriter:
+    """Background thread writing this worker's snapshot every ``interval`` seconds"""
+
+    def __init__(self, snapshot_dir: str, interval: float):
+        self.snapshot_dir = snapshot_dir
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start writing snapshots if not already running"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-snapshot", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Stop the thread and remove this worker's snapshot file"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        _snapshot_file(Path(self.snapshot_dir), os.getpid()).unlink(missing_ok=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                write_snapshot(self.snapshot_dir)
+            except OSError:
+                # Retried on the next tick
+                continue
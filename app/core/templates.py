@@ -0,0 +1,100 @@
+"""
+Jinja2 template environment with a persistent bytecode cache
+
+Compiled templates are stored on disk, so a fresh process (a new Lambda
+container or uvicorn worker) loads them instead of parsing and compiling
+the sources again. Build the cache into the deployment image with:
+
+    python -m app.core.templates [templates_dir] [--cache-dir DIR]
+
+Each entry is validated against a checksum of its template source and the
+running Python version, so edited templates are simply recompiled (and the
+cache refreshed where it is writable). Development needs no build step.
+"""
+import argparse
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache
+from jinja2.bccache import Bucket
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PersistentBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that tolerates read-only or missing cache directories"""
+
+    def __init__(self, directory: Union[str, Path]):
+        super().__init__(str(directory), pattern="%s.jinja")
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            # Read-only images (e.g. Lambda) still render, just without persisting
+            logger.debug(f"Could not write template bytecode cache: {str(e)}")
+
+
+def create_templates(
+    directory: Union[str, Path] = "templates",
+    cache_dir: Optional[Union[str, Path]] = None
+) -> Jinja2Templates:
+    """
+    Build the application's Jinja2Templates with an optional bytecode cache
+
+    Args:
+        directory: Template source directory
+        cache_dir: Directory of compiled templates; None disables the cache
+
+    Returns:
+        Jinja2Templates: Templates whose ``env`` is shared by all services
+    """
+    options = {}
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Template bytecode cache directory {cache_dir} unavailable: {str(e)}")
+        options["bytecode_cache"] = PersistentBytecodeCache(cache_dir)
+    return Jinja2Templates(directory=str(directory), **options)
+
+
+def precompile_templates(env: Environment) -> int:
+    """
+    Compile every HTML template so its bytecode lands in the cache
+
+    Args:
+        env: Environment configured with a bytecode cache
+
+    Returns:
+        int: Number of templates compiled
+    """
+    compiled = 0
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            logger.error(f"Failed to compile template {name}: {str(e)}")
+    return compiled
+
+
+if __name__ == "__main__":
+    from app.core.config import settings
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("templates_dir", nargs="?", default=settings.templates_dir)
+    parser.add_argument("--cache-dir", default=settings.template_cache_dir)
+    args = parser.parse_args()
+
+    setup_logging(level="INFO")
+    if not args.cache_dir:
+        parser.error("no cache directory configured (set CV_TEMPLATE_CACHE_DIR or pass --cache-dir)")
+    templates = create_templates(args.templates_dir, args.cache_dir)
+    count = precompile_templates(templates.env)
+    logger.info(f"Compiled {count} templates from {args.templates_dir} into {args.cache_dir}")
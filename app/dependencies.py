@@ -0,0 +1,134 @@
+"""
+Lazily constructed application services
+
+Nothing here is built at import time: each service (and the modules behind
+it) is created on first use and then shared for the life of the process, so
+a cold start that only answers ``/health`` or serves one page never pays for
+the PDF pipeline, the storage backend or the metadata index it does not touch.
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from fastapi.templating import Jinja2Templates
+
+    from app.services.batch_service import BatchService
+    from app.services.book_service import ResumeBookService
+    from app.services.cv_service import CVService
+    from app.services.export_service import ExportService
+    from app.services.html_service import HTMLService
+    from app.services.pdf_service import PDFService
+    from app.services.render_engine import PDFRenderEngine
+
+
+@lru_cache(maxsize=None)
+def get_templates() -> "Jinja2Templates":
+    """Shared Jinja2 templates (compiled bytecode is reused across processes)"""
+    from app.core.templates import create_templates
+
+    return create_templates(settings.templates_dir, settings.template_cache_dir)
+
+
+@lru_cache(maxsize=None)
+def get_render_engine() -> "PDFRenderEngine":
+    """PDF render engine; worker processes are spawned on the first render"""
+    from app.services.render_engine import PDFRenderEngine
+
+    return PDFRenderEngine(workers=settings.pdf_workers, timeout=settings.pdf_render_timeout)
+
+
+@lru_cache(maxsize=None)
+def get_cv_service() -> "CVService":
+    """CV service over the configured storage backend and metadata index"""
+    from app.services.artifact_cache import ArtifactCache
+    from app.services.cv_service import CVService
+    from app.storage.factory import create_storage_backend
+
+    return CVService(
+        settings.generated_dir,
+        pdf_cache=ArtifactCache(
+            Path(settings.cache_dir) / "pdf",
+            max_bytes=settings.pdf_cache_max_bytes,
+            suffix=".pdf"
+        ),
+        storage=create_storage_backend(settings),
+        data_format=settings.data_format,
+        html_cache=ArtifactCache(
+            Path(settings.cache_dir) / "html",
+            max_bytes=settings.html_cache_max_bytes,
+            suffix=".html"
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def get_pdf_service() -> "PDFService":
+    """PDF service sharing the CV service's PDF cache"""
+    from app.services.pdf_service import PDFService
+
+    cv_service = get_cv_service()
+    return PDFService(get_templates().env, get_render_engine(), cv_service, cache=cv_service.pdf_cache)
+
+
+@lru_cache(maxsize=None)
+def get_html_service() -> "HTMLService":
+    """HTML service sharing the CV service's page cache"""
+    from app.services.html_service import HTMLService
+
+    return HTMLService(
+        get_templates().env,
+        cache=get_cv_service().html_cache,
+        memory_max_bytes=settings.html_cache_memory_bytes
+    )
+
+
+@lru_cache(maxsize=None)
+def get_batch_service() -> "BatchService":
+    """Bulk generation over the shared CV and PDF services"""
+    from app.services.batch_service import BatchService
+
+    return BatchService(
+        get_cv_service(),
+        get_pdf_service(),
+        group_size=settings.batch_group_size,
+        max_items=settings.batch_max_items
+    )
+
+
+@lru_cache(maxsize=None)
+def get_export_service() -> "ExportService":
+    """ZIP export over the shared CV and PDF services"""
+    from app.services.export_service import ExportService
+
+    return ExportService(
+        get_cv_service(),
+        get_pdf_service(),
+        concurrency=settings.export_concurrency,
+        max_items=settings.export_max_items
+    )
+
+
+@lru_cache(maxsize=None)
+def get_book_service() -> "ResumeBookService":
+    """Resume book renderer on the shared render engine, with its own disk cache"""
+    from app.services.artifact_cache import ArtifactCache
+    from app.services.book_service import ResumeBookService
+
+    return ResumeBookService(
+        get_templates().env,
+        get_render_engine(),
+        get_cv_service(),
+        ArtifactCache(Path(settings.cache_dir) / "books", max_bytes=settings.book_cache_max_bytes, suffix=".pdf"),
+        max_items=settings.book_max_items
+    )
+
+
+async def shutdown_services() -> None:
+    """Drain queued work and stop services that were started; others are left unbuilt"""
+    if get_pdf_service.cache_info().currsize:
+        await get_pdf_service().wait_for_prerenders()
+    if get_render_engine.cache_info().currsize:
+        get_render_engine().shutdown()
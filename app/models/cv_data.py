@@ -2,7 +2,7 @@
 CV Data Models using Pydantic for validation and serialization
 """
 from typing import List, Optional
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 
 
@@ -23,7 +23,8 @@ class EducationEntry(BaseModel):
     year: str = Field(..., min_length=1, max_length=10)
     cgpa: str = Field(..., min_length=1, max_length=10)
 
-    @validator('qualification', 'stream', 'institute', 'year', 'cgpa')
+    @field_validator('qualification', 'stream', 'institute', 'year', 'cgpa')
+    @classmethod
     def validate_not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError('Field cannot be empty')
@@ -35,7 +36,8 @@ class AchievementEntry(BaseModel):
     description: str = Field(..., min_length=1, max_length=500)
     year: str = Field(..., min_length=1, max_length=10)
 
-    @validator('description', 'year')
+    @field_validator('description', 'year')
+    @classmethod
     def validate_not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError('Field cannot be empty')
@@ -47,15 +49,17 @@ class InternshipEntry(BaseModel):
     company: str = Field(..., min_length=1, max_length=100)
     role: str = Field(..., min_length=1, max_length=100)
     duration: str = Field(..., min_length=1, max_length=50)
-    points: List[str] = Field(..., min_items=1, max_items=5)
+    points: List[str] = Field(..., min_length=1, max_length=5)
 
-    @validator('company', 'role', 'duration')
+    @field_validator('company', 'role', 'duration')
+    @classmethod
     def validate_not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError('Field cannot be empty')
         return v.strip()
 
-    @validator('points')
+    @field_validator('points')
+    @classmethod
     def validate_points(cls, v):
         if not v:
             raise ValueError('At least one point is required')
@@ -71,15 +75,17 @@ class ProjectEntry(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
     type: str = Field(..., min_length=1, max_length=50)
     duration: str = Field(..., min_length=1, max_length=50)
-    points: List[str] = Field(..., min_items=1, max_items=5)
+    points: List[str] = Field(..., min_length=1, max_length=5)
 
-    @validator('title', 'type', 'duration')
+    @field_validator('title', 'type', 'duration')
+    @classmethod
     def validate_not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError('Field cannot be empty')
         return v.strip()
 
-    @validator('points')
+    @field_validator('points')
+    @classmethod
     def validate_points(cls, v):
         if not v:
             raise ValueError('At least one point is required')
@@ -95,15 +101,17 @@ class PositionEntry(BaseModel):
     club: str = Field(..., min_length=1, max_length=100)
     role: str = Field(..., min_length=1, max_length=100)
     duration: str = Field(..., min_length=1, max_length=50)
-    points: List[str] = Field(..., min_items=1, max_items=5)
+    points: List[str] = Field(..., min_length=1, max_length=5)
 
-    @validator('club', 'role', 'duration')
+    @field_validator('club', 'role', 'duration')
+    @classmethod
     def validate_not_empty(cls, v):
         if not v or not v.strip():
             raise ValueError('Field cannot be empty')
         return v.strip()
 
-    @validator('points')
+    @field_validator('points')
+    @classmethod
     def validate_points(cls, v):
         if not v:
             raise ValueError('At least one point is required')
@@ -117,20 +125,22 @@ class PositionEntry(BaseModel):
 class CVData(BaseModel):
     """Complete CV data structure"""
     personal_info: PersonalInfo
-    education: List[EducationEntry] = Field(..., min_items=1, max_items=5)
-    achievements: List[AchievementEntry] = Field(default_factory=list, max_items=5)
-    internships: List[InternshipEntry] = Field(..., min_items=1, max_items=3)
-    projects: List[ProjectEntry] = Field(..., min_items=1, max_items=3)
-    positions_of_responsibility: List[PositionEntry] = Field(..., min_items=1, max_items=3)
-    extracurricular: List[str] = Field(default_factory=list, max_items=5)
-    technical_skills: List[str] = Field(..., min_items=1, max_items=10)
-
-    @validator('extracurricular')
+    education: List[EducationEntry] = Field(..., min_length=1, max_length=5)
+    achievements: List[AchievementEntry] = Field(default_factory=list, max_length=5)
+    internships: List[InternshipEntry] = Field(..., min_length=1, max_length=3)
+    projects: List[ProjectEntry] = Field(..., min_length=1, max_length=3)
+    positions_of_responsibility: List[PositionEntry] = Field(..., min_length=1, max_length=3)
+    extracurricular: List[str] = Field(default_factory=list, max_length=5)
+    technical_skills: List[str] = Field(..., min_length=1, max_length=10)
+
+    @field_validator('extracurricular')
+    @classmethod
     def validate_extracurricular(cls, v):
         # Filter out empty activities
         return [activity.strip() for activity in v if activity and activity.strip()]
 
-    @validator('technical_skills')
+    @field_validator('technical_skills')
+    @classmethod
     def validate_technical_skills(cls, v):
         if not v:
             raise ValueError('At least one technical skill is required')
@@ -154,11 +164,6 @@ class CVDocument(BaseModel):
     metadata: CVMetadata
     data: CVData
 
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
-
 
 class CVGenerateRequest(BaseModel):
     """Request model for CV generation from form data"""
@@ -170,25 +175,25 @@ class CVGenerateRequest(BaseModel):
     email: str = Field(..., pattern=r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
     
     # Education (support up to 5 entries)
-    education_entries: List[EducationEntry] = Field(..., min_items=1, max_items=5)
+    education_entries: List[EducationEntry] = Field(..., min_length=1, max_length=5)
     
     # Achievements (optional, up to 5 entries)
-    achievements: List[AchievementEntry] = Field(default_factory=list, max_items=5)
+    achievements: List[AchievementEntry] = Field(default_factory=list, max_length=5)
     
     # Internships (at least 1, up to 3)
-    internships: List[InternshipEntry] = Field(..., min_items=1, max_items=3)
+    internships: List[InternshipEntry] = Field(..., min_length=1, max_length=3)
     
     # Projects (at least 1, up to 3)
-    projects: List[ProjectEntry] = Field(..., min_items=1, max_items=3)
+    projects: List[ProjectEntry] = Field(..., min_length=1, max_length=3)
     
     # Positions of Responsibility (at least 1, up to 3)
-    positions_of_responsibility: List[PositionEntry] = Field(..., min_items=1, max_items=3)
+    positions_of_responsibility: List[PositionEntry] = Field(..., min_length=1, max_length=3)
     
     # Extracurricular Activities (optional, up to 5)
-    extracurricular: List[str] = Field(default_factory=list, max_items=5)
+    extracurricular: List[str] = Field(default_factory=list, max_length=5)
     
     # Technical Skills (at least 1, up to 10)
-    technical_skills: List[str] = Field(..., min_items=1, max_items=10)
+    technical_skills: List[str] = Field(..., min_length=1, max_length=10)
 
     def to_cv_data(self) -> CVData:
         """Convert form request to structured CV data"""
@@ -210,8 +215,23 @@ class CVGenerateRequest(BaseModel):
         )
 
 
+class CVExportRequest(BaseModel):
+    """Request model for exporting CV PDFs as a ZIP archive"""
+    cv_ids: List[str] = Field(default_factory=list)
+    q: Optional[str] = Field(None, min_length=1, max_length=200)
+    fields: Optional[List[str]] = None
+
+
+class CVBookRequest(CVExportRequest):
+    """Request model for a combined resume book PDF"""
+    title: str = Field("Resume Book", min_length=1, max_length=200)
+
+
 class CVGenerateResponse(BaseModel):
     """Response model for CV generation"""
     cv_id: str
     redirect_url: str
+    html_url: Optional[str] = None
+    pdf_url: Optional[str] = None
+    data_url: Optional[str] = None
     message: str = "CV generated successfully"
\ No newline at end of file
@@ -0,0 +1,383 @@
+"""
+Artifact Cache - Content-addressed on-disk cache for rendered CV artifacts
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from jinja2 import Environment, meta
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ArtifactCache:
+    """
+    Disk cache for rendered artifacts (PDFs, HTML) keyed on a content hash.
+
+    Entries are stored as ``<key><suffix>``. Each CV has a ref directory,
+    ``refs/<shard>/<cv_id>/``, holding one empty ``<variant>.<key>`` file per
+    entry currently associated with it, so the entries can be dropped when the
+    CV changes or is deleted. Total size is capped; the least recently used
+    entries are evicted first, together with the refs that point at them.
+
+    The cache size is tracked incrementally and the directory is only scanned
+    when the tracked size passes ``max_bytes`` or every ``RESCAN_INTERVAL``
+    seconds, which also picks up entries written by other worker processes.
+    """
+
+    # Seconds between full scans of the cache directory
+    RESCAN_INTERVAL = 60.0
+    # Share of max_bytes eviction trims down to, so a full cache is not rescanned on every put
+    LOW_WATERMARK = 0.9
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int, suffix: str = ""):
+        self.cache_dir = Path(cache_dir)
+        self.refs_dir = self.cache_dir / "refs"
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        self._remove_flat_refs()
+
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        # Bytes on disk as of the last scan plus what this process has written since
+        self._tracked_bytes: Optional[int] = None
+        self._next_scan = 0.0
+
+    @staticmethod
+    def make_key(*parts: Union[str, bytes]) -> str:
+        """
+        Build a cache key from the given content parts
+
+        Args:
+            parts: Content that determines the artifact (data, template source, ...)
+
+        Returns:
+            str: Hex digest identifying the artifact
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode("utf-8")
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Return the on-disk path of the entry for ``key``"""
+        return self.cache_dir / f"{key}{self.suffix}"
+
+    def ref_dir(self, cv_id: str) -> Path:
+        """Return the directory holding the refs of a CV"""
+        return self.refs_dir / cv_id[:2] / cv_id
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return the cached artifact for ``key``, or None on a miss
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Optional[bytes]: Artifact content if cached
+        """
+        entry = self.path_for(key)
+        try:
+            content = entry.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        # Bump mtime so eviction treats this entry as recently used
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return content
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """
+        Return the path of the cached artifact for ``key`` without reading it
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Optional[Path]: Entry path if cached
+        """
+        entry = self.path_for(key)
+        try:
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        except OSError:
+            pass
+        return entry
+
+    def temp_path(self) -> Path:
+        """
+        Reserve a scratch file inside the cache for an artifact written to disk
+
+        Returns:
+            Path: Empty file to hand to put_file once complete
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-", suffix=self.suffix)
+        os.close(fd)
+        return Path(tmp_path)
+
+    def put_file(self, key: str, path: Union[str, Path]) -> Path:
+        """
+        Move a finished file from temp_path() into the cache as the entry for ``key``
+
+        Large artifacts are streamed to disk this way instead of being held
+        in memory for put().
+
+        Args:
+            key: Cache key from make_key
+            path: Completed file in the cache directory
+
+        Returns:
+            Path: Path of the cache entry
+        """
+        entry = self.path_for(key)
+        size = os.stat(path).st_size
+        os.replace(path, entry)
+        try:
+            self._track(size)
+        except OSError as e:
+            logger.warning(f"Error trimming artifact cache {self.cache_dir}: {str(e)}")
+        return entry
+
+    def put(
+        self,
+        key: str,
+        content: bytes,
+        cv_id: Optional[str] = None,
+        variant: str = ""
+    ) -> None:
+        """
+        Store an artifact and optionally associate it with a CV
+
+        Args:
+            key: Cache key from make_key
+            content: Artifact bytes
+            cv_id: CV the artifact belongs to, used for invalidation
+            variant: Distinguishes several artifacts cached for the same CV
+        """
+        try:
+            self._write_atomic(self.path_for(key), content)
+            if cv_id is not None:
+                self._set_ref(cv_id, variant or "_", key)
+            self._track(len(content))
+        except OSError as e:
+            # A cache that cannot be written must never fail the request
+            logger.warning(f"Error writing artifact cache entry {key}: {str(e)}")
+
+    def invalidate(self, cv_id: str) -> None:
+        """
+        Drop the cached artifacts (all variants) associated with a CV
+
+        Args:
+            cv_id: CV identifier
+        """
+        ref_dir = self.ref_dir(cv_id)
+        try:
+            names = os.listdir(ref_dir)
+        except FileNotFoundError:
+            return
+        for name in names:
+            self.path_for(name.rpartition(".")[2]).unlink(missing_ok=True)
+        shutil.rmtree(ref_dir, ignore_errors=True)
+
+    def _remove_flat_refs(self) -> None:
+        """Delete ``refs/<cv_id>[.<variant>]`` files left by the previous ref layout"""
+        with os.scandir(self.refs_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+
+    def _set_ref(self, cv_id: str, variant: str, key: str) -> None:
+        """Point a CV's ``variant`` ref at ``key``, dropping the entry it replaces"""
+        ref_dir = self.ref_dir(cv_id)
+        ref_dir.mkdir(parents=True, exist_ok=True)
+        for name in os.listdir(ref_dir):
+            previous_variant, _, previous = name.rpartition(".")
+            if previous_variant == variant and previous != key:
+                self.path_for(previous).unlink(missing_ok=True)
+                (ref_dir / name).unlink(missing_ok=True)
+        (ref_dir / f"{variant}.{key}").touch()
+
+    def _track(self, added: int) -> None:
+        """Account for a new entry and trim the cache when it may be over its limit"""
+        with self._lock:
+            if self._tracked_bytes is not None:
+                self._tracked_bytes += added
+            due = (
+                self._tracked_bytes is None
+                or self._tracked_bytes > self.max_bytes
+                or time.monotonic() >= self._next_scan
+            )
+        if due:
+            self._enforce_limit()
+
+    def _enforce_limit(self) -> None:
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        # A scan already running in another thread will see this entry too
+        if not self._scan_lock.acquire(blocking=False):
+            return
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.startswith(".") or not entry.name.endswith(self.suffix):
+                        continue
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path, entry.name))
+                    total += stat.st_size
+
+            if total > self.max_bytes:
+                target = int(self.max_bytes * self.LOW_WATERMARK)
+                evicted = set()
+                entries.sort()
+                for _, size, path, name in entries:
+                    if total <= target:
+                        break
+                    try:
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        continue
+                    total -= size
+                    evicted.add(name[:len(name) - len(self.suffix)] if self.suffix else name)
+                self._drop_refs(evicted)
+                logger.info(f"Artifact cache {self.cache_dir} trimmed to {total} bytes")
+
+            with self._lock:
+                self._tracked_bytes = total
+                self._next_scan = time.monotonic() + self.RESCAN_INTERVAL
+        finally:
+            self._scan_lock.release()
+
+    def _drop_refs(self, keys: Set[str]) -> None:
+        """Remove refs pointing at evicted entries, and ref directories left empty"""
+        if not keys:
+            return
+        with os.scandir(self.refs_dir) as shards:
+            shard_dirs = [shard.path for shard in shards if shard.is_dir()]
+        for shard_dir in shard_dirs:
+            with os.scandir(shard_dir) as cvs:
+                cv_dirs = [cv.path for cv in cvs if cv.is_dir()]
+            for cv_dir in cv_dirs:
+                names = os.listdir(cv_dir)
+                stale = [name for name in names if name.rpartition(".")[2] in keys]
+                for name in stale:
+                    try:
+                        os.unlink(os.path.join(cv_dir, name))
+                    except FileNotFoundError:
+                        pass
+                if len(stale) == len(names):
+                    try:
+                        os.rmdir(cv_dir)
+                    except OSError:
+                        # A put for this CV added a ref meanwhile
+                        pass
+
+    @staticmethod
+    def _write_atomic(path: Path, content: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+
+def template_closure(templates_env: Environment, template_name: str) -> List[str]:
+    """
+    Names of a template and every template it includes, imports or extends
+
+    Only ``.html`` templates are parsed for references.
+
+    Args:
+        templates_env: Environment the templates are loaded from
+        template_name: Template name as passed to get_template
+
+    Returns:
+        list: Template names, starting with ``template_name``
+    """
+    names = [template_name]
+    for name in names:
+        if not name.endswith(".html"):
+            # Assets such as stylesheets are hashed as they are, not parsed
+            continue
+        source = templates_env.loader.get_source(templates_env, name)[0]
+        for referenced in meta.find_referenced_templates(templates_env.parse(source)):
+            if referenced is not None and referenced not in names:
+                names.append(referenced)
+    return names
+
+
+class TemplateDigests:
+    """
+    Hashes of template sources for cache keys, recomputed only when a file changes
+
+    A template's digest covers the templates it includes, so editing a shared
+    partial changes the key of every artifact rendered through it.
+    """
+
+    def __init__(self, templates_env: Environment):
+        self.templates_env = templates_env
+        self._digests: Dict[str, Tuple[str, float, List[Callable[[], bool]]]] = {}
+
+    def get(self, template_name: str) -> str:
+        """
+        Return the digest of a template's current source and its includes
+
+        Args:
+            template_name: Template name as passed to get_template
+
+        Returns:
+            str: Hex digest of the template sources
+        """
+        return self._lookup(template_name)[0]
+
+    def mtime(self, template_name: str) -> float:
+        """
+        Return the latest modification time of a template and its includes
+
+        Args:
+            template_name: Template name as passed to get_template
+
+        Returns:
+            float: Newest mtime of the template files (0.0 if none are files)
+        """
+        return self._lookup(template_name)[1]
+
+    def _lookup(self, template_name: str) -> Tuple[str, float]:
+        cached = self._digests.get(template_name)
+        if cached is not None and all(uptodate() for uptodate in cached[2]):
+            return cached[0], cached[1]
+
+        sources, checks, mtime = [], [], 0.0
+        for name in template_closure(self.templates_env, template_name):
+            source, filename, uptodate = self.templates_env.loader.get_source(self.templates_env, name)
+            sources.extend((name, source))
+            checks.append(uptodate or (lambda: True))
+            if filename:
+                mtime = max(mtime, os.path.getmtime(filename))
+        digest = ArtifactCache.make_key(*sources)
+        self._digests[template_name] = (digest, mtime, checks)
+        return digest, mtime
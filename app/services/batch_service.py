@@ -0,0 +1,214 @@
+"""
+Batch Service - Bulk CV generation for whole cohorts
+"""
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic import ValidationError as PydanticValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.models.cv_data import CVData
+from app.services.cv_service import CVService
+from app.services.pdf_service import PDFService
+from app.core.codec import loads
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_CREATED = "created"
+STATUS_INVALID = "invalid"
+STATUS_ERROR = "error"
+
+# Longest NDJSON line accepted; a CV is a few KB
+_MAX_LINE_BYTES = 1024 * 1024
+
+
+class _UnparsableRow:
+    """Placeholder for an NDJSON line that is not valid JSON"""
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+def parse_json_array(body: bytes) -> List[Any]:
+    """
+    Parse a JSON array request body into rows
+
+    Args:
+        body: Raw request body
+
+    Returns:
+        list: One item per CV
+
+    Raises:
+        ValidationError: If the body is not a JSON array
+    """
+    try:
+        rows = loads(body)
+    except ValueError as e:
+        raise ValidationError(f"Invalid JSON body: {str(e)}")
+    if not isinstance(rows, list):
+        raise ValidationError("Request body must be a JSON array of CV objects")
+    return rows
+
+
+async def iter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """
+    Parse an NDJSON stream line by line as it arrives
+
+    A line that is not valid JSON yields an _UnparsableRow, so it is reported
+    against its own index without aborting the rest of the stream. Blank
+    lines are skipped. An over-long line ends the stream, since nothing
+    after it can be reliably split.
+
+    Args:
+        chunks: Raw body chunks (e.g. ``request.stream()``)
+
+    Yields:
+        Parsed JSON value per line
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+        if len(buffer) > _MAX_LINE_BYTES:
+            yield _UnparsableRow(f"Line longer than {_MAX_LINE_BYTES} bytes; remaining rows were not read")
+            return
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+async def _aiter(rows: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    if hasattr(rows, "__aiter__"):
+        async for row in rows:
+            yield row
+    else:
+        for row in rows:
+            yield row
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return loads(line)
+    except ValueError as e:
+        return _UnparsableRow(f"Invalid JSON: {str(e)}")
+
+
+class BatchService:
+    """
+    Validates and stores many CVs per request.
+
+    Rows are validated one by one so a bad row is reported on its own, then
+    valid CVs are persisted in groups (one index transaction per group) off
+    the event loop. Their PDFs are queued on the render engine, which lays
+    them out in parallel across its worker processes.
+    """
+
+    def __init__(
+        self,
+        cv_service: CVService,
+        pdf_service: Optional[PDFService] = None,
+        group_size: int = 50,
+        max_items: int = 1000
+    ):
+        self.cv_service = cv_service
+        self.pdf_service = pdf_service
+        self.group_size = group_size
+        self.max_items = max_items
+
+    async def generate(
+        self,
+        rows: Union[Iterable[Any], AsyncIterable[Any]],
+        render_pdf: bool = True
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a CV for every row, yielding one result per row in order
+
+        Results are ``{"index", "status": "created", "cv_id", "url"}`` for a
+        stored CV, ``{"index", "status": "invalid", "errors"}`` for a row that
+        failed validation and ``{"index", "status": "error", "error"}`` if
+        storing failed.
+
+        Args:
+            rows: Parsed rows (dicts of CVData fields), e.g. from
+                parse_json_array or iter_ndjson
+            render_pdf: Queue a PDF render for each stored CV
+
+        Yields:
+            dict: Per-row result
+        """
+        pending: List[Tuple[int, Any]] = []
+        valid_count = 0
+        index = -1
+
+        async for row in _aiter(rows):
+            index += 1
+            if index >= self.max_items:
+                # Rows before the limit are reported first, keeping results in order
+                for result in await self._flush(pending, render_pdf):
+                    yield result
+                pending = []
+                yield {
+                    "index": index,
+                    "status": STATUS_ERROR,
+                    "error": f"Batch limit of {self.max_items} CVs exceeded; remaining rows were not read",
+                }
+                break
+
+            item = self._validate(row)
+            pending.append((index, item))
+            valid_count += isinstance(item, CVData)
+            if valid_count >= self.group_size:
+                for result in await self._flush(pending, render_pdf):
+                    yield result
+                pending = []
+                valid_count = 0
+
+        for result in await self._flush(pending, render_pdf):
+            yield result
+
+    @staticmethod
+    def _validate(row: Any) -> Any:
+        """CVData for a valid row, else the error list to report"""
+        if isinstance(row, _UnparsableRow):
+            return [{"type": "json_invalid", "loc": [], "msg": row.message}]
+        if not isinstance(row, dict):
+            return [{"type": "model_type", "loc": [], "msg": "Each row must be a JSON object"}]
+        try:
+            return CVData.model_validate(row)
+        except PydanticValidationError as e:
+            return e.errors(include_url=False, include_context=False, include_input=False)
+
+    async def _flush(self, pending: Iterable[Tuple[int, Any]], render_pdf: bool) -> List[Dict[str, Any]]:
+        """Persist the valid rows of a group and build the results for all its rows"""
+        pending = list(pending)
+        valid = [(index, item) for index, item in pending if isinstance(item, CVData)]
+
+        created: Dict[int, str] = {}
+        failure: Optional[str] = None
+        if valid:
+            try:
+                cv_ids = await run_in_threadpool(self.cv_service.generate_cvs, [item for _, item in valid])
+                created = {index: cv_id for (index, _), cv_id in zip(valid, cv_ids)}
+            except Exception as e:
+                logger.error(f"Error storing batch group of {len(valid)} CVs: {str(e)}")
+                failure = str(e)
+
+        if render_pdf and self.pdf_service is not None:
+            for index, cv_data in valid:
+                if index in created:
+                    self.pdf_service.schedule_prerender(created[index], cv_data)
+
+        results = []
+        for index, item in pending:
+            if index in created:
+                cv_id = created[index]
+                results.append({"index": index, "status": STATUS_CREATED, "cv_id": cv_id, "url": f"/cv/{cv_id}"})
+            elif isinstance(item, CVData):
+                results.append({"index": index, "status": STATUS_ERROR, "error": failure})
+            else:
+                results.append({"index": index, "status": STATUS_INVALID, "errors": item})
+        return results
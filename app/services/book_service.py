@@ -0,0 +1,167 @@
+"""
+Book Service - Combined "resume book" PDFs of many CVs
+"""
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+from jinja2 import Environment
+from starlette.concurrency import run_in_threadpool
+
+from app.models.cv_data import CVData
+from app.services.artifact_cache import ArtifactCache, TemplateDigests
+from app.services.cv_service import CVService
+from app.services.pdf_service import PDF_STYLESHEET, stylesheet_path
+from app.core.codec import dump_json
+from app.core.exceptions import CVNotFoundError, TemplateError, ValidationError
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_REQUESTS, RENDERS, STAGE_SECONDS
+
+if TYPE_CHECKING:
+    from app.services.render_engine import PDFRenderEngine
+
+logger = get_logger(__name__)
+
+BOOK_TEMPLATE = "resume_book.html"
+
+
+class ResumeBookService:
+    """
+    Lays out many CVs as one PDF: a contents page, then one page per CV.
+
+    All CVs go through a single WeasyPrint pass with the shared PDF
+    stylesheet, so the document is laid out once per book instead of once
+    per CV. The PDF is written by the render worker straight into the book
+    cache on disk and served from there; a book with the same CVs, order and
+    title is reused until one of them (or the template) changes. Loading,
+    hashing and rendering the HTML for up to max_items CVs runs on the
+    threadpool so the event loop stays free.
+    """
+
+    def __init__(
+        self,
+        templates_env: Environment,
+        engine: "PDFRenderEngine",
+        cv_service: CVService,
+        cache: ArtifactCache,
+        max_items: int = 500
+    ):
+        self.templates_env = templates_env
+        self.engine = engine
+        self.cv_service = cv_service
+        self.cache = cache
+        self.max_items = max_items
+        self._template_digests = TemplateDigests(templates_env)
+
+    def render_html(self, entries: Sequence[Tuple[str, CVData]], title: str) -> str:
+        """
+        Render the resume book template
+
+        Args:
+            entries: ``(cv_id, cv_data)`` pairs in book order
+            title: Title shown on the contents page
+
+        Returns:
+            str: HTML ready for WeasyPrint
+
+        Raises:
+            TemplateError: If template rendering fails
+        """
+        try:
+            template = self.templates_env.get_template(BOOK_TEMPLATE)
+            return template.render(
+                title=title,
+                entries=[{"cv_id": cv_id, "cv": cv_data.model_dump()} for cv_id, cv_data in entries]
+            )
+        except Exception as e:
+            logger.error(f"Template rendering error: {str(e)}")
+            raise TemplateError(f"Failed to render template {BOOK_TEMPLATE}: {str(e)}")
+
+    async def get_book(self, cv_ids: Sequence[str], title: str) -> Path:
+        """
+        Return the path of the resume book PDF, rendering it on a cache miss
+
+        Args:
+            cv_ids: CVs in book order
+            title: Title shown on the contents page
+
+        Returns:
+            Path: PDF file in the book cache
+
+        Raises:
+            ValidationError: If no CVs are given, too many are, or some do not exist
+            PDFGenerationError: If the render fails or times out
+        """
+        if not cv_ids:
+            raise ValidationError("A resume book needs at least one CV")
+        if len(cv_ids) > self.max_items:
+            raise ValidationError(f"A resume book is limited to {self.max_items} CVs")
+
+        entries = await run_in_threadpool(self._load_entries, cv_ids)
+        key = await run_in_threadpool(self.cache_key, entries, title)
+        cached = await run_in_threadpool(self.cache.get_path, key)
+        if cached is not None:
+            CACHE_REQUESTS.inc("book", "hit")
+            logger.info(f"Resume book cache hit for {len(entries)} CVs")
+            return cached
+        CACHE_REQUESTS.inc("book", "miss")
+
+        html_content = await run_in_threadpool(self.render_html, entries, title)
+        tmp_path = await run_in_threadpool(self.cache.temp_path)
+        start = time.perf_counter()
+        try:
+            await self.engine.render_file(
+                html_content,
+                str(tmp_path),
+                stylesheet=stylesheet_path(self.templates_env),
+                timeout=self.render_timeout(len(entries))
+            )
+            path = await run_in_threadpool(self.cache.put_file, key, tmp_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, "book_render")
+        RENDERS.inc("book")
+
+        logger.info(f"Resume book of {len(entries)} CVs rendered in {elapsed:.2f}s")
+        return path
+
+    def render_timeout(self, count: int) -> float:
+        """
+        Seconds allowed for laying out a book of ``count`` CVs
+
+        Layout time grows with the number of CVs, so the engine's per-render
+        timeout is scaled by one for every 10 CVs (never below one).
+        """
+        return self.engine.timeout * max(1, count / 10)
+
+    def cache_key(self, entries: Sequence[Tuple[str, CVData]], title: str) -> str:
+        """
+        Content hash of the CVs, their order, the title, the book template and the stylesheet
+
+        Args:
+            entries: ``(cv_id, cv_data)`` pairs in book order
+            title: Title shown on the contents page
+
+        Returns:
+            str: Cache key for the rendered book
+        """
+        payload = dump_json(List[Tuple[str, CVData]], list(entries))
+        return ArtifactCache.make_key(
+            payload,
+            title,
+            self._template_digests.get(BOOK_TEMPLATE),
+            self._template_digests.get(PDF_STYLESHEET)
+        )
+
+    def _load_entries(self, cv_ids: Sequence[str]) -> List[Tuple[str, CVData]]:
+        """Load the CV data for the book, reporting every missing CV at once"""
+        entries, missing = [], []
+        for cv_id in cv_ids:
+            try:
+                entries.append((cv_id, self.cv_service.get_cv_data(cv_id).data))
+            except CVNotFoundError:
+                missing.append(cv_id)
+        if missing:
+            raise ValidationError(f"CVs not found: {', '.join(missing)}")
+        return entries
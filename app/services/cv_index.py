@@ -0,0 +1,411 @@
+"""
+CV Index - Persistent SQLite index of CV metadata and full-text search
+"""
+import re
+import sqlite3
+from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from app.models.cv_data import CVDocument
+from app.storage.base import StorageBackend
+from app.storage.compact import decode_document
+from app.core.exceptions import ValidationError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+STATUS_OK = "ok"
+STATUS_INVALID = "invalid"
+
+# Bump when the schema changes; an older index is rebuilt from disk
+SCHEMA_VERSION = 3
+
+# Searchable fields and their bm25 weights, in FTS column order
+SEARCH_FIELDS = {
+    "name": 10.0,
+    "email": 5.0,
+    "city": 2.0,
+    "education": 2.0,
+    "institute": 4.0,
+    "company": 4.0,
+    "project": 3.0,
+    "skills": 4.0,
+    "points": 1.0,
+}
+
+_MAX_QUERY_TOKENS = 10
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS cvs (
+    cv_id TEXT PRIMARY KEY,
+    name TEXT,
+    created_at TEXT,
+    last_modified TEXT,
+    version TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    data_mtime REAL
+);
+CREATE INDEX IF NOT EXISTS idx_cvs_status_created ON cvs (status, created_at DESC, cv_id DESC);
+CREATE VIRTUAL TABLE IF NOT EXISTS cv_search USING fts5(
+    {", ".join(SEARCH_FIELDS)},
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+"""
+
+_DROP_SCHEMA = """
+DROP TABLE IF EXISTS cv_search;
+DROP TABLE IF EXISTS cvs;
+"""
+
+_SUMMARY_COLUMNS = ("cv_id", "name", "created_at", "last_modified", "version")
+
+_UPSERT = """
+INSERT INTO cvs (cv_id, name, created_at, last_modified, version, status, error, data_mtime)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (cv_id) DO UPDATE SET
+    name = excluded.name,
+    created_at = excluded.created_at,
+    last_modified = excluded.last_modified,
+    version = excluded.version,
+    status = excluded.status,
+    error = excluded.error,
+    data_mtime = excluded.data_mtime
+"""
+
+# Parallel object fetches when syncing against a remote store
+_SYNC_WORKERS = 16
+
+_INSERT_SEARCH = (
+    f"INSERT INTO cv_search (rowid, {', '.join(SEARCH_FIELDS)}) "
+    f"VALUES ({', '.join('?' * (len(SEARCH_FIELDS) + 1))})"
+)
+
+
+class CVIndex:
+    """
+    Metadata index kept in sync by CVService so listing never reads CV files.
+
+    Records that fail to parse are stored with ``status='invalid'`` so the
+    problem is logged once, when the file is indexed, not on every list call.
+    Valid records also get a row in an FTS5 inverted index sharing the
+    ``cvs`` rowid, which backs ranked full-text search. The index can always
+    be rebuilt from the data files on disk.
+    """
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        # SQLite allows one writer at a time; queueing writers here is much
+        # cheaper than the busy handler's sleep-and-retry backoff
+        self._write_lock = threading.Lock()
+        with self._connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # CREATE ... IF NOT EXISTS would keep an older index's tables and columns
+                conn.executescript(_DROP_SCHEMA)
+            conn.executescript(_SCHEMA)
+        self.needs_rebuild = version != SCHEMA_VERSION
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection (sqlite3 connections are not thread-safe)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def upsert(self, cv_document: CVDocument) -> None:
+        """
+        Add or refresh the entry for a CV document
+
+        Args:
+            cv_document: Complete CV document as saved
+        """
+        self.upsert_many([cv_document])
+
+    def upsert_many(self, cv_documents: Sequence[CVDocument]) -> None:
+        """
+        Add or refresh the entries for several CV documents in one transaction
+
+        Args:
+            cv_documents: Complete CV documents as saved
+        """
+        entries = [_entry_from_document(document) for document in cv_documents]
+        with self._write_lock, self._connection() as conn:
+            _write_entries(conn, entries)
+
+    def remove(self, cv_id: str) -> None:
+        """
+        Remove a CV from the index
+
+        Args:
+            cv_id: CV identifier
+        """
+        with self._write_lock, self._connection() as conn:
+            _delete_entry(conn, cv_id)
+
+    def list_cvs(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[str, str]] = None
+    ) -> list[Dict[str, Any]]:
+        """
+        List valid CVs, newest first
+
+        Args:
+            limit: Maximum number of CVs to return (all if None)
+            after: ``(created_at, cv_id)`` of the last CV already seen;
+                only CVs that sort after it are returned
+
+        Returns:
+            list: CV metadata dictionaries
+        """
+        query = f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM cvs WHERE status = ?"
+        params: list = [STATUS_OK]
+        if after is not None:
+            query += " AND (created_at, cv_id) < (?, ?)"
+            params.extend(after)
+        query += " ORDER BY created_at DESC, cv_id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._connection().execute(query, params)
+        return [dict(row) for row in rows]
+
+    def search(
+        self,
+        query: str,
+        fields: Optional[Sequence[str]] = None,
+        limit: int = 20
+    ) -> list[Dict[str, Any]]:
+        """
+        Ranked full-text search over indexed CVs
+
+        Args:
+            query: Free text; every word must match, the last one as a prefix
+            fields: Restrict matching to these SEARCH_FIELDS (all if None)
+            limit: Maximum number of results
+
+        Returns:
+            list: CV metadata dictionaries with a ``score`` (higher is better)
+
+        Raises:
+            ValidationError: If the query has no words or a field is unknown
+        """
+        match = _build_match(query, fields)
+        weights = ", ".join(str(weight) for weight in SEARCH_FIELDS.values())
+        rows = self._connection().execute(
+            f"SELECT {', '.join('c.' + column for column in _SUMMARY_COLUMNS)}, "
+            f"-bm25(cv_search, {weights}) AS score "
+            "FROM cv_search JOIN cvs c ON c.rowid = cv_search.rowid "
+            "WHERE cv_search MATCH ? AND c.status = ? "
+            "ORDER BY score DESC LIMIT ?",
+            (match, STATUS_OK, limit),
+        )
+        return [dict(row) for row in rows]
+
+    def count(self, status: Optional[str] = None) -> int:
+        """
+        Number of indexed files
+
+        Args:
+            status: Only count entries with this status (all if None)
+
+        Returns:
+            int: Number of entries
+        """
+        if status is None:
+            return self._connection().execute("SELECT COUNT(*) FROM cvs").fetchone()[0]
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM cvs WHERE status = ?", (status,)
+        ).fetchone()[0]
+
+    def rebuild(self, storage: StorageBackend) -> int:
+        """
+        Re-create the index from the CV data files in storage
+
+        Args:
+            storage: Backend holding the CV data files
+
+        Returns:
+            int: Number of valid CVs indexed
+        """
+        with self._write_lock, self._connection() as conn:
+            conn.execute("DELETE FROM cv_search")
+            conn.execute("DELETE FROM cvs")
+        self.sync(storage)
+
+        with self._write_lock, self._connection() as conn:
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.needs_rebuild = False
+        return self.count(STATUS_OK)
+
+    def sync(self, storage: StorageBackend) -> int:
+        """
+        Bring the index up to date with storage, fetching only changed CVs
+
+        The store is listed in batches (one request per page for object
+        stores) and compared against the indexed data mtimes. Only new or
+        modified data files are read, in parallel; entries whose files are
+        gone are dropped.
+
+        Args:
+            storage: Backend holding the CV data files
+
+        Returns:
+            int: Number of entries added or refreshed
+        """
+        known = dict(self._connection().execute("SELECT cv_id, data_mtime FROM cvs").fetchall())
+        changed = []
+        for cv_id, mtime in storage.iter_cv_stamps():
+            if known.pop(cv_id, None) != mtime:
+                changed.append((cv_id, mtime))
+
+        with ThreadPoolExecutor(max_workers=_SYNC_WORKERS if storage.shared else 1) as pool:
+            entries = list(pool.map(lambda stamp: _entry_from_storage(storage, *stamp), changed))
+
+        with self._write_lock, self._connection() as conn:
+            _write_entries(conn, entries)
+            for cv_id in known:
+                _delete_entry(conn, cv_id)
+
+        invalid = sum(1 for row, _ in entries if row[5] == STATUS_INVALID)
+        logger.info(
+            f"CV index synced: {len(entries)} refreshed ({invalid} invalid), {len(known)} removed"
+        )
+        return len(entries)
+
+
+def _write_entries(conn: sqlite3.Connection, entries: Iterable[Tuple[tuple, Optional[tuple]]]) -> None:
+    """Upsert metadata rows and replace their search rows (same rowid)"""
+    for row, search_fields in entries:
+        conn.execute(_UPSERT, row)
+        rowid = conn.execute("SELECT rowid FROM cvs WHERE cv_id = ?", (row[0],)).fetchone()[0]
+        conn.execute("DELETE FROM cv_search WHERE rowid = ?", (rowid,))
+        if search_fields is not None:
+            conn.execute(_INSERT_SEARCH, (rowid, *search_fields))
+
+
+def _delete_entry(conn: sqlite3.Connection, cv_id: str) -> None:
+    """Delete a CV's metadata row and its search row"""
+    conn.execute(
+        "DELETE FROM cv_search WHERE rowid = (SELECT rowid FROM cvs WHERE cv_id = ?)",
+        (cv_id,),
+    )
+    conn.execute("DELETE FROM cvs WHERE cv_id = ?", (cv_id,))
+
+
+def _search_fields(data: Dict[str, Any]) -> tuple:
+    """Flatten CV data into the text of each search field, in FTS column order"""
+    personal = data.get("personal_info") or {}
+    education = data.get("education") or []
+    internships = data.get("internships") or []
+    projects = data.get("projects") or []
+    positions = data.get("positions_of_responsibility") or []
+
+    points: List[str] = []
+    for entry in (*internships, *projects, *positions):
+        points.extend(entry.get("points") or [])
+    points.extend(a.get("description", "") for a in data.get("achievements") or [])
+    points.extend(data.get("extracurricular") or [])
+
+    return (
+        personal.get("full_name", ""),
+        personal.get("email", ""),
+        personal.get("city", ""),
+        " ".join([personal.get("highest_education", "")]
+                 + [f"{e.get('qualification', '')} {e.get('stream', '')}" for e in education]),
+        " ".join(e.get("institute", "") for e in education),
+        " ".join(i.get("company", "") for i in internships),
+        " ".join(p.get("title", "") for p in projects),
+        " ".join(data.get("technical_skills") or []),
+        " ".join(points),
+    )
+
+
+def _build_match(query: str, fields: Optional[Sequence[str]]) -> str:
+    """Turn free text into a safe FTS5 MATCH expression"""
+    tokens = _TOKEN_RE.findall(query)[:_MAX_QUERY_TOKENS]
+    if not tokens:
+        raise ValidationError("Search query must contain at least one word")
+
+    unknown = set(fields or ()) - set(SEARCH_FIELDS)
+    if unknown:
+        raise ValidationError(
+            f"Unknown search field(s): {', '.join(sorted(unknown))}. "
+            f"Valid fields: {', '.join(SEARCH_FIELDS)}"
+        )
+
+    # Quote every token so user input is never parsed as FTS syntax
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    expression = " ".join(terms)
+    if fields:
+        expression = f"{{{' '.join(fields)}}} : ({expression})"
+    return expression
+
+
+def _entry_from_document(cv_document: CVDocument) -> Tuple[tuple, tuple]:
+    """Index row and search fields for a CV document being saved"""
+    metadata = cv_document.metadata
+    row = (
+        metadata.cv_id,
+        cv_document.data.personal_info.full_name,
+        str(metadata.created_at),
+        str(metadata.last_modified),
+        metadata.version,
+        STATUS_OK,
+        None,
+        None,  # data_mtime is filled in by the next sync
+    )
+    return row, _search_fields(cv_document.data.model_dump())
+
+
+def _timestamp(value: str) -> str:
+    """Stored ISO timestamp in the ``str(datetime)`` form used for new entries, so rows sort together"""
+    return str(datetime.fromisoformat(value))
+
+
+def _entry_from_storage(
+    storage: StorageBackend,
+    cv_id: str,
+    data_mtime: Optional[float] = None
+) -> Tuple[tuple, Optional[tuple]]:
+    """Index row and search fields for a data file, marking it invalid if unreadable"""
+    try:
+        data = decode_document(storage.read_data(cv_id))
+        metadata = data["metadata"]
+        row = (
+            metadata["cv_id"],
+            data["data"]["personal_info"]["full_name"],
+            _timestamp(metadata["created_at"]),
+            _timestamp(metadata["last_modified"]),
+            metadata["version"],
+            STATUS_OK,
+            None,
+            data_mtime,
+        )
+        return row, _search_fields(data["data"])
+    except Exception as e:
+        logger.warning(f"Error reading CV data file for {cv_id}: {str(e)}")
+        error = f"{type(e).__name__}: {e}"
+        return (cv_id, None, None, None, None, STATUS_INVALID, error, data_mtime), None
+
+
+if __name__ == "__main__":
+    import sys
+
+    from app.services.cv_service import CVService
+
+    generated_dir = sys.argv[1] if len(sys.argv) > 1 else "generated"
+    print(f"Indexed {CVService(generated_dir).rebuild_index()} CVs in {generated_dir}")
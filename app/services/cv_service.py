@@ -1,26 +1,64 @@
 """
 CV Service - Business logic for CV generation and management
 """
-import os
 import json
 import uuid
+import base64
+import binascii
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, Sequence, Tuple
 from pathlib import Path
 
 from app.models.cv_data import CVData, CVDocument, CVMetadata
-from app.core.exceptions import CVGenerationError, CVNotFoundError
+from app.services.artifact_cache import ArtifactCache
+from app.services.cv_index import CVIndex, STATUS_OK
+from app.storage.base import StorageBackend, PDF, validate_cv_id
+from app.storage.compact import FORMAT_COMPACT, FORMAT_JSON, FORMATS, decode_json, encode_json
+from app.storage.local import LocalStorageBackend
+from app.core.codec import dump_json, validate_json
+from app.core.exceptions import CVGenerationError, CVNotFoundError, ValidationError
 from app.core.logging import get_logger
+from app.core.metrics import STAGE_SECONDS
 
 logger = get_logger(__name__)
 
+_READ_SECONDS = STAGE_SECONDS.labels("storage_read")
+_WRITE_SECONDS = STAGE_SECONDS.labels("storage_write")
+_LIST_SECONDS = STAGE_SECONDS.labels("list_cvs")
+
+# Parallel data file writes when generating several CVs on a remote store
+_WRITE_WORKERS = 16
+
 
 class CVService:
     """Service for CV generation and management"""
     
-    def __init__(self, generated_dir: str = "generated"):
+    def __init__(
+        self,
+        generated_dir: str = "generated",
+        pdf_cache: Optional[ArtifactCache] = None,
+        storage: Optional[StorageBackend] = None,
+        data_format: str = FORMAT_COMPACT,
+        html_cache: Optional[ArtifactCache] = None
+    ):
+        if data_format not in FORMATS:
+            raise ValueError(f"Unknown CV data format: {data_format}")
+        
         self.generated_dir = Path(generated_dir)
         self.generated_dir.mkdir(exist_ok=True)
+        self.storage = storage or LocalStorageBackend(self.generated_dir)
+        self.pdf_cache = pdf_cache
+        self.html_cache = html_cache
+        self.data_format = data_format
+        
+        # Metadata and search index; built from disk on first use
+        self.index = CVIndex(self.generated_dir / "index.sqlite3")
+        if self.index.needs_rebuild:
+            self.rebuild_index()
+        elif self.storage.shared:
+            # Other instances may have written to the store since we last ran
+            self.index.sync(self.storage)
         
     def generate_cv(self, cv_data: CVData) -> str:
         """
@@ -35,26 +73,52 @@ class CVService:
         Raises:
             CVGenerationError: If CV generation fails
         """
-        try:
-            # Generate unique CV ID
-            cv_id = str(uuid.uuid4())
-            
-            # Create metadata
-            metadata = CVMetadata(
-                cv_id=cv_id,
-                created_at=datetime.utcnow(),
-                last_modified=datetime.utcnow(),
-                version="2.0"
-            )
-            
-            # Create complete CV document
-            cv_document = CVDocument(metadata=metadata, data=cv_data)
+        return self.generate_cvs([cv_data])[0]
+    
+    def generate_cvs(self, cv_data_list: Sequence[CVData]) -> list[str]:
+        """
+        Generate several CVs, recording them in the index in one transaction
+        
+        Args:
+            cv_data_list: Validated CV data, one entry per CV
             
-            # Save CV data to file
-            self._save_cv_data(cv_document)
+        Returns:
+            list: Generated CV IDs, in input order
             
-            logger.info(f"CV generated successfully with ID: {cv_id}")
-            return cv_id
+        Raises:
+            CVGenerationError: If CV generation fails
+        """
+        try:
+            cv_documents = []
+            for cv_data in cv_data_list:
+                # Generate unique CV ID
+                cv_id = str(uuid.uuid4())
+                
+                # Create metadata
+                now = datetime.utcnow()
+                metadata = CVMetadata(
+                    cv_id=cv_id,
+                    created_at=now,
+                    last_modified=now,
+                    version="2.0"
+                )
+                
+                # Create complete CV document
+                cv_documents.append(CVDocument(metadata=metadata, data=cv_data))
+            
+            # Save CV data files (in parallel on a remote store), then index them together
+            if self.storage.shared and len(cv_documents) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(cv_documents), _WRITE_WORKERS)) as pool:
+                    list(pool.map(self._write_cv_data, cv_documents))
+            else:
+                for cv_document in cv_documents:
+                    self._write_cv_data(cv_document)
+            self.index.upsert_many(cv_documents)
+            
+            cv_ids = [cv_document.metadata.cv_id for cv_document in cv_documents]
+            for cv_id in cv_ids:
+                logger.info("CV generated successfully with ID: %s", cv_id)
+            return cv_ids
             
         except Exception as e:
             logger.error(f"Error generating CV: {str(e)}")
@@ -74,15 +138,13 @@ class CVService:
             CVNotFoundError: If CV not found
         """
         try:
-            data_file = self.generated_dir / f"{cv_id}_data.json"
-            
-            if not data_file.exists():
+            try:
+                with _READ_SECONDS.time():
+                    raw = self.storage.read_data(validate_cv_id(cv_id))
+            except FileNotFoundError:
                 raise CVNotFoundError(f"CV with ID {cv_id} not found")
             
-            with open(data_file, 'r') as f:
-                data = json.load(f)
-            
-            return CVDocument(**data)
+            return validate_json(CVDocument, decode_json(raw))
             
         except CVNotFoundError:
             raise
@@ -112,8 +174,9 @@ class CVService:
             
             # Save updated document
             self._save_cv_data(existing_doc)
+            self._invalidate_artifacts(cv_id)
             
-            logger.info(f"CV updated successfully with ID: {cv_id}")
+            logger.info("CV updated successfully with ID: %s", cv_id)
             
         except CVNotFoundError:
             raise
@@ -137,12 +200,11 @@ class CVService:
                 raise CVNotFoundError(f"CV with ID {cv_id} not found")
             
             # Delete all associated files
-            for file_pattern in [f"{cv_id}_data.json", f"{cv_id}.html", f"{cv_id}_display.html"]:
-                file_path = self.generated_dir / file_pattern
-                if file_path.exists():
-                    file_path.unlink()
+            self.storage.delete_all(cv_id)
+            self.index.remove(cv_id)
+            self._invalidate_artifacts(cv_id)
             
-            logger.info(f"CV deleted successfully with ID: {cv_id}")
+            logger.info("CV deleted successfully with ID: %s", cv_id)
             
         except CVNotFoundError:
             raise
@@ -150,6 +212,75 @@ class CVService:
             logger.error(f"Error deleting CV with ID {cv_id}: {str(e)}")
             raise CVGenerationError(f"Failed to delete CV: {str(e)}")
     
+    def save_artifact(self, cv_id: str, artifact: str, content: bytes) -> None:
+        """
+        Store a rendered artifact (HTML, PDF) alongside the CV data
+        
+        Only CVs that still exist get artifacts: a render finishing after
+        its CV was deleted, possibly by another worker, is dropped rather
+        than leaving a directory with no data file.
+        
+        Args:
+            cv_id: CV identifier
+            artifact: Artifact name from app.storage.base
+            content: Artifact bytes
+        
+        Raises:
+            CVNotFoundError: If the CV was deleted
+        """
+        if not self.cv_exists(cv_id):
+            raise CVNotFoundError(f"CV with ID {cv_id} not found")
+        self.storage.write_bytes(cv_id, artifact, content)
+        if not self.cv_exists(cv_id):
+            # Deleted while the artifact was being written
+            self.storage.delete_all(cv_id)
+            raise CVNotFoundError(f"CV with ID {cv_id} not found")
+    
+    def read_artifact(self, cv_id: str, artifact: str) -> bytes:
+        """
+        Read a stored artifact
+        
+        Args:
+            cv_id: CV identifier
+            artifact: Artifact name from app.storage.base
+            
+        Returns:
+            bytes: Artifact content
+            
+        Raises:
+            CVNotFoundError: If the artifact is not stored
+        """
+        try:
+            return self.storage.read_bytes(validate_cv_id(cv_id), artifact)
+        except FileNotFoundError:
+            raise CVNotFoundError(f"CV {artifact} not found for ID: {cv_id}")
+    
+    def artifact_path(self, cv_id: str, artifact: str) -> Optional[Path]:
+        """
+        Filesystem path of a stored artifact, for streaming it from disk
+        
+        Args:
+            cv_id: CV identifier
+            artifact: Artifact name from app.storage.base
+            
+        Returns:
+            Optional[Path]: Path when the storage backend is local, else None
+        """
+        return self.storage.local_path(validate_cv_id(cv_id), artifact)
+    
+    def artifact_mtime(self, cv_id: str, artifact: str) -> Optional[float]:
+        """
+        Modification time of a stored artifact
+        
+        Args:
+            cv_id: CV identifier
+            artifact: Artifact name from app.storage.base
+            
+        Returns:
+            Optional[float]: Unix timestamp, or None if not stored
+        """
+        return self.storage.mtime(validate_cv_id(cv_id), artifact)
+    
     def cv_exists(self, cv_id: str) -> bool:
         """
         Check if CV exists
@@ -160,56 +291,199 @@ class CVService:
         Returns:
             bool: True if CV exists
         """
-        data_file = self.generated_dir / f"{cv_id}_data.json"
-        return data_file.exists()
+        try:
+            return self.storage.data_mtime(validate_cv_id(cv_id)) is not None
+        except CVNotFoundError:
+            return False
     
     def list_cvs(self) -> list[Dict[str, Any]]:
         """
         List all CVs with basic metadata
         
         Returns:
-            list: List of CV metadata dictionaries
+            list: List of CV metadata dictionaries, newest first
         """
-        cvs = []
-        
         try:
-            for data_file in self.generated_dir.glob("*_data.json"):
-                try:
-                    with open(data_file, 'r') as f:
-                        data = json.load(f)
-                    
-                    cv_info = {
-                        "cv_id": data["metadata"]["cv_id"],
-                        "name": data["data"]["personal_info"]["full_name"],
-                        "created_at": data["metadata"]["created_at"],
-                        "last_modified": data["metadata"]["last_modified"],
-                        "version": data["metadata"]["version"]
-                    }
-                    cvs.append(cv_info)
-                    
-                except Exception as e:
-                    logger.warning(f"Error reading CV data file {data_file}: {str(e)}")
-                    continue
-            
-            # Sort by creation date (newest first)
-            cvs.sort(key=lambda x: x["created_at"], reverse=True)
-            
+            with _LIST_SECONDS.time():
+                return self.index.list_cvs()
         except Exception as e:
             logger.error(f"Error listing CVs: {str(e)}")
+            return []
+    
+    def list_cvs_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Tuple[list[Dict[str, Any]], Optional[str]]:
+        """
+        List one page of CVs ordered by creation date (newest first)
         
-        return cvs
+        Args:
+            limit: Maximum number of CVs in the page
+            cursor: Opaque cursor returned with the previous page
+            
+        Returns:
+            tuple: CV metadata dictionaries and the cursor for the next page
+            (None on the last page)
+            
+        Raises:
+            ValidationError: If the cursor is malformed
+        """
+        after = self._decode_cursor(cursor) if cursor else None
+        with _LIST_SECONDS.time():
+            cvs = self.index.list_cvs(limit=limit, after=after)
+        
+        next_cursor = None
+        if len(cvs) == limit:
+            next_cursor = self._encode_cursor(cvs[-1])
+        return cvs, next_cursor
+    
+    def iter_cvs(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all CVs, newest first, holding one batch in memory
+        
+        Args:
+            batch_size: Number of CVs fetched from the index per query
+            
+        Yields:
+            dict: CV metadata dictionary
+        """
+        after = None
+        while True:
+            cvs = self.index.list_cvs(limit=batch_size, after=after)
+            yield from cvs
+            if len(cvs) < batch_size:
+                return
+            after = (cvs[-1]["created_at"], cvs[-1]["cv_id"])
+    
+    def search_cvs(
+        self,
+        query: str,
+        fields: Optional[Sequence[str]] = None,
+        limit: int = 20
+    ) -> list[Dict[str, Any]]:
+        """
+        Full-text search over CVs, best matches first
+        
+        Served entirely from the search index; no CV data file is opened.
+        
+        Args:
+            query: Free-text query
+            fields: Restrict matching to these index fields (all if None)
+            limit: Maximum number of results
+            
+        Returns:
+            list: CV metadata dictionaries with a relevance score
+            
+        Raises:
+            ValidationError: If the query or field filter is invalid
+        """
+        return self.index.search(query, fields=fields, limit=limit)
+    
+    def select_cv_ids(
+        self,
+        cv_ids: Optional[Sequence[str]] = None,
+        query: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+        max_items: int = 1000
+    ) -> list[str]:
+        """
+        Resolve a set of CVs from explicit IDs or a search filter
+        
+        Args:
+            cv_ids: CV identifiers, kept in the given order
+            query: Full-text search query selecting the CVs instead
+            fields: Restrict the search to these index fields
+            max_items: Largest selection allowed
+            
+        Returns:
+            list: Unique CV identifiers
+            
+        Raises:
+            ValidationError: If neither IDs nor a query are given, the
+                selection exceeds max_items or the query is invalid
+        """
+        if cv_ids:
+            selected = list(dict.fromkeys(cv_ids))
+        elif query:
+            results = self.search_cvs(query, fields=fields, limit=max_items + 1)
+            selected = [result["cv_id"] for result in results]
+        else:
+            raise ValidationError("Pass cv_ids or a search query to select CVs")
+        
+        if len(selected) > max_items:
+            raise ValidationError(f"At most {max_items} CVs can be selected at once")
+        return selected
+    
+    def count_cvs(self) -> int:
+        """
+        Count valid CVs
+        
+        Returns:
+            int: Number of CVs that can be listed
+        """
+        return self.index.count(STATUS_OK)
+    
+    @staticmethod
+    def _encode_cursor(cv_info: Dict[str, Any]) -> str:
+        raw = json.dumps([cv_info["created_at"], cv_info["cv_id"]], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[str, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            created_at, cv_id = json.loads(raw)
+            if not isinstance(created_at, str) or not isinstance(cv_id, str):
+                raise ValueError("cursor fields must be strings")
+            return created_at, cv_id
+        except (binascii.Error, ValueError, TypeError) as e:
+            raise ValidationError(f"Invalid cursor: {str(e)}")
+    
+    def rebuild_index(self) -> int:
+        """
+        Rebuild the metadata index from the CV data files on disk
+        
+        Returns:
+            int: Number of valid CVs indexed
+        """
+        return self.index.rebuild(self.storage)
     
     def _save_cv_data(self, cv_document: CVDocument) -> None:
         """
-        Save CV document to file
+        Save CV document through the storage backend and index it
         
         Args:
             cv_document: Complete CV document to save
         """
-        data_file = self.generated_dir / f"{cv_document.metadata.cv_id}_data.json"
+        self._write_cv_data(cv_document, replace=True)
+        self.index.upsert(cv_document)
+    
+    def _write_cv_data(self, cv_document: CVDocument, replace: bool = False) -> None:
+        """
+        Write the CV data file through the storage backend
         
-        with open(data_file, 'w') as f:
-            json.dump(cv_document.dict(), f, indent=2, default=str)
+        Args:
+            cv_document: Complete CV document to save
+            replace: The CV may already have a data file, possibly in the
+                other format; False for new CVs
+        """
+        indent = 2 if self.data_format == FORMAT_JSON else None
+        content = encode_json(dump_json(CVDocument, cv_document, indent=indent), self.data_format)
+        with _WRITE_SECONDS.time():
+            self.storage.write_data(cv_document.metadata.cv_id, content, replace=replace)
+    
+    def _invalidate_artifacts(self, cv_id: str) -> None:
+        """
+        Drop cached artifacts rendered from a previous version of the CV
+        
+        Args:
+            cv_id: CV identifier
+        """
+        self.storage.delete(cv_id, PDF)
+        for cache in (self.pdf_cache, self.html_cache):
+            if cache is not None:
+                cache.invalidate(cv_id)
     
     def convert_legacy_data(self, legacy_data: Dict[str, Any]) -> CVData:
         """
@@ -221,124 +495,6 @@ class CVService:
         Returns:
             CVData: Structured CV data
         """
-        try:
-            # Extract personal info
-            personal_info = {
-                "full_name": legacy_data.get("full_name", ""),
-                "highest_education": legacy_data.get("highest_education", ""),
-                "city": legacy_data.get("city", ""),
-                "phone": legacy_data.get("phone", ""),
-                "email": legacy_data.get("email", "")
-            }
-            
-            # Extract education entries
-            education = []
-            for i in range(1, 6):  # Support up to 5 education entries
-                qual = legacy_data.get(f"edu_{i}_qual", "")
-                if qual and qual.strip():
-                    education.append({
-                        "qualification": qual,
-                        "stream": legacy_data.get(f"edu_{i}_stream", ""),
-                        "institute": legacy_data.get(f"edu_{i}_institute", ""),
-                        "year": legacy_data.get(f"edu_{i}_year", ""),
-                        "cgpa": legacy_data.get(f"edu_{i}_cgpa", "")
-                    })
-            
-            # Extract achievements
-            achievements = []
-            for i in range(1, 6):  # Support up to 5 achievements
-                desc = legacy_data.get(f"ach_{i}_desc", "")
-                if desc and desc.strip():
-                    achievements.append({
-                        "description": desc,
-                        "year": legacy_data.get(f"ach_{i}_year", "")
-                    })
-            
-            # Extract internships
-            internships = []
-            for i in range(1, 4):  # Support up to 3 internships
-                company = legacy_data.get(f"intern_{i}_company", "")
-                if company and company.strip():
-                    points = []
-                    for j in range(1, 6):  # Support up to 5 points per internship
-                        point = legacy_data.get(f"intern_{i}_point_{j}", "")
-                        if point and point.strip():
-                            points.append(point)
-                    
-                    if points:  # Only add if there are points
-                        internships.append({
-                            "company": company,
-                            "role": legacy_data.get(f"intern_{i}_role", ""),
-                            "duration": legacy_data.get(f"intern_{i}_duration", ""),
-                            "points": points
-                        })
-            
-            # Extract projects
-            projects = []
-            for i in range(1, 4):  # Support up to 3 projects
-                title = legacy_data.get(f"proj_{i}_title", "")
-                if title and title.strip():
-                    points = []
-                    for j in range(1, 6):  # Support up to 5 points per project
-                        point = legacy_data.get(f"proj_{i}_point_{j}", "")
-                        if point and point.strip():
-                            points.append(point)
-                    
-                    if points:  # Only add if there are points
-                        projects.append({
-                            "title": title,
-                            "type": legacy_data.get(f"proj_{i}_type", ""),
-                            "duration": legacy_data.get(f"proj_{i}_duration", ""),
-                            "points": points
-                        })
-            
-            # Extract positions of responsibility
-            positions = []
-            for i in range(1, 4):  # Support up to 3 positions
-                club = legacy_data.get(f"por_{i}_club", "")
-                if club and club.strip():
-                    points = []
-                    for j in range(1, 6):  # Support up to 5 points per position
-                        point = legacy_data.get(f"por_{i}_point_{j}", "")
-                        if point and point.strip():
-                            points.append(point)
-                    
-                    if points:  # Only add if there are points
-                        positions.append({
-                            "club": club,
-                            "role": legacy_data.get(f"por_{i}_role", ""),
-                            "duration": legacy_data.get(f"por_{i}_duration", ""),
-                            "points": points
-                        })
-            
-            # Extract extracurricular activities
-            extracurricular = []
-            for i in range(1, 6):  # Support up to 5 activities
-                activity = legacy_data.get(f"extracur_{i}_desc", "")
-                if activity and activity.strip():
-                    extracurricular.append(activity)
-            
-            # Extract technical skills
-            technical_skills = []
-            for i in range(1, 11):  # Support up to 10 skills
-                skill = legacy_data.get(f"techskill_{i}", "")
-                if skill and skill.strip():
-                    technical_skills.append(skill)
-            
-            # Create structured CV data
-            cv_data_dict = {
-                "personal_info": personal_info,
-                "education": education,
-                "achievements": achievements,
-                "internships": internships,
-                "projects": projects,
-                "positions_of_responsibility": positions,
-                "extracurricular": extracurricular,
-                "technical_skills": technical_skills
-            }
-            
-            return CVData(**cv_data_dict)
-            
-        except Exception as e:
-            logger.error(f"Error converting legacy data: {str(e)}")
-            raise CVGenerationError(f"Failed to convert legacy data: {str(e)}")
\ No newline at end of file
+        from app.services.legacy_forms import convert_legacy_data
+        
+        return convert_legacy_data(legacy_data)
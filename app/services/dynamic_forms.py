@@ -0,0 +1,116 @@
+"""
+Parsing of the dynamic CV form (``education[0][institute]``-style fields)
+into structured CV data
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sized, Tuple
+
+from app.core.exceptions import ValidationError
+
+# Fields accepted per submission; a maxed-out CV form posts about 130
+MAX_FORM_FIELDS = 1000
+# Highest entry index; the form numbers entries with a counter that only grows
+MAX_ENTRY_INDEX = 99
+
+PERSONAL_FIELDS = ("full_name", "highest_education", "city", "phone", "email")
+
+# Form prefix -> CVData field
+_SECTIONS = {
+    "education": "education",
+    "achievements": "achievements",
+    "internships": "internships",
+    "projects": "projects",
+    "positions": "positions_of_responsibility",
+}
+# Sections whose entries carry a ``[points][]`` list
+_POINT_SECTIONS = frozenset(("internships", "projects", "positions"))
+# Repeated top-level fields -> CVData field (blank values are dropped)
+_LIST_FIELDS = {
+    "extracurricular[]": "extracurricular",
+    "technical_skills[]": "technical_skills",
+}
+_SECTION_PREFIXES = tuple(f"{prefix}[" for prefix in _SECTIONS)
+
+# section[index][field] or section[index][field][]; bounded so hostile keys fail fast
+_SECTION_KEY = re.compile(
+    r"(" + "|".join(_SECTIONS) + r")\[(\d{1,4})\]\[(\w{1,32})\](\[\])?"
+)
+
+
+def parse_dynamic_form_data(
+    form_items: Iterable[Tuple[str, Any]],
+    max_fields: int = MAX_FORM_FIELDS,
+    max_index: int = MAX_ENTRY_INDEX
+) -> Optional[Dict[str, Any]]:
+    """
+    Parse a dynamic form submission into the structured CVData layout
+
+    Every field is visited once. Section entries are collected by index and
+    emitted in index order; for repeated fields the last value wins, except
+    for ``[]`` fields, whose values are all kept in order.
+
+    Args:
+        form_items: Submitted (name, value) pairs, e.g. ``FormData.multi_items()``
+        max_fields: Most fields accepted
+        max_index: Highest entry index accepted
+
+    Returns:
+        Optional[dict]: Structured data for CVData, or None if the submission
+        has no section fields (a legacy flat form)
+
+    Raises:
+        ValidationError: If a limit is exceeded or a section field is malformed
+    """
+    if isinstance(form_items, Sized) and len(form_items) > max_fields:
+        raise ValidationError(f"Form has more than {max_fields} fields")
+
+    personal_info = dict.fromkeys(PERSONAL_FIELDS, "")
+    entries: Dict[str, Dict[int, Dict[str, Any]]] = {prefix: {} for prefix in _SECTIONS}
+    lists: Dict[str, List[Any]] = {name: [] for name in _LIST_FIELDS.values()}
+    dynamic = False
+
+    for count, (key, value) in enumerate(form_items, 1):
+        if count > max_fields:
+            raise ValidationError(f"Form has more than {max_fields} fields")
+
+        if key in personal_info:
+            personal_info[key] = value
+            continue
+
+        list_name = _LIST_FIELDS.get(key)
+        if list_name is not None:
+            if value.strip():
+                lists[list_name].append(value)
+            continue
+
+        match = _SECTION_KEY.fullmatch(key)
+        if match is None:
+            if key.startswith(_SECTION_PREFIXES):
+                raise ValidationError(f"Malformed form field: {key[:80]}")
+            # Unknown fields are ignored
+            continue
+
+        prefix, index, field, is_list = match.groups()
+        index = int(index)
+        if index > max_index:
+            raise ValidationError(f"Form entry index {index} exceeds {max_index}")
+
+        dynamic = True
+        section = entries[prefix]
+        entry = section.get(index)
+        if entry is None:
+            entry = section[index] = {"points": []} if prefix in _POINT_SECTIONS else {}
+        if is_list:
+            entry.setdefault(field, []).append(value)
+        else:
+            entry[field] = value
+
+    if not dynamic:
+        return None
+
+    structured_data: Dict[str, Any] = {"personal_info": personal_info}
+    for prefix, name in _SECTIONS.items():
+        section = entries[prefix]
+        structured_data[name] = [section[index] for index in sorted(section)]
+    structured_data.update(lists)
+    return structured_data
@@ -0,0 +1,175 @@
+"""
+Export Service - Streaming ZIP archives of CV PDFs
+"""
+import asyncio
+import time
+import zipfile
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.cv_service import CVService
+from app.services.pdf_service import PDFService
+from app.core.filenames import create_filename
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+ERRORS_ENTRY = "errors.txt"
+
+# (cv_id, entry name, PDF bytes or None, error message or None)
+_Fetched = Tuple[str, Optional[str], Optional[bytes], Optional[str]]
+
+
+class _ChunkSink:
+    """
+    Write-only file object for zipfile that hands out what was written
+
+    It has no ``tell``/``seek``, so zipfile writes in streaming mode (sizes
+    and CRCs follow each entry in a data descriptor) and never goes back to
+    patch earlier bytes, which lets every chunk be sent as soon as it exists.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ExportService:
+    """
+    Builds ZIP archives of CV PDFs on the fly.
+
+    PDFs come from the stored artifact or the PDF cache when they exist and
+    are rendered otherwise, with at most ``concurrency`` CVs in flight. Each
+    entry is written to the response as soon as its PDF is ready, so the
+    download starts immediately and memory stays bounded by the window of
+    in-flight PDFs rather than the size of the archive.
+    """
+
+    def __init__(
+        self,
+        cv_service: CVService,
+        pdf_service: PDFService,
+        concurrency: int = 8,
+        max_items: int = 1000
+    ):
+        self.cv_service = cv_service
+        self.pdf_service = pdf_service
+        self.concurrency = max(1, concurrency)
+        self.max_items = max_items
+
+    def select_cv_ids(
+        self,
+        cv_ids: Optional[Sequence[str]] = None,
+        query: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None
+    ) -> List[str]:
+        """
+        Resolve the CVs to export (see CVService.select_cv_ids)
+
+        Raises:
+            ValidationError: If the selection is empty, too large or invalid
+        """
+        return self.cv_service.select_cv_ids(cv_ids, query=query, fields=fields, max_items=self.max_items)
+
+    async def stream_zip(self, cv_ids: Iterable[str]) -> AsyncIterator[bytes]:
+        """
+        Stream a ZIP archive with one PDF per CV
+
+        Entries appear in the order their PDFs become ready. CVs that cannot
+        be exported are listed in a final ``errors.txt`` entry instead of
+        failing the download. If the client goes away, pending renders are
+        cancelled.
+
+        Args:
+            cv_ids: CV identifiers to export
+
+        Yields:
+            bytes: Consecutive pieces of the archive
+        """
+        sink = _ChunkSink()
+        # PDF content streams are already deflated, so entries are stored as is
+        archive = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+        remaining = iter(cv_ids)
+        pending: "set[asyncio.Task[_Fetched]]" = set()
+        failures: List[str] = []
+        names: set = set()
+        exported = 0
+        start = time.perf_counter()
+
+        def fill_window() -> None:
+            while len(pending) < self.concurrency:
+                cv_id = next(remaining, None)
+                if cv_id is None:
+                    return
+                pending.add(asyncio.create_task(self._fetch(cv_id)))
+
+        try:
+            fill_window()
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.difference_update(done)
+                fill_window()
+
+                for task in done:
+                    cv_id, name, pdf_bytes, error = task.result()
+                    if error is not None:
+                        failures.append(f"{cv_id}: {error}")
+                        continue
+                    archive.writestr(self._entry_info(_unique_name(name, names)), pdf_bytes)
+                    exported += 1
+
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+            if failures:
+                archive.writestr(self._entry_info(ERRORS_ENTRY), "\n".join(failures) + "\n")
+            archive.close()
+            yield sink.drain()
+            logger.info(
+                f"Exported {exported} CV PDFs ({len(failures)} failed) in "
+                f"{time.perf_counter() - start:.2f}s"
+            )
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _fetch(self, cv_id: str) -> _Fetched:
+        """Load one CV and its PDF; failures are returned, not raised"""
+        try:
+            cv_document = await run_in_threadpool(self.cv_service.get_cv_data, cv_id)
+            pdf_bytes = await self.pdf_service.get_cv_pdf(cv_id, cv_document.data)
+        except Exception as e:
+            logger.warning(f"Skipping CV {cv_id} in export: {str(e)}")
+            return cv_id, None, None, str(e)
+
+        name = create_filename(cv_document.data.personal_info.full_name) or "cv"
+        return cv_id, f"{name}_{cv_id[:8]}.pdf", pdf_bytes, None
+
+    @staticmethod
+    def _entry_info(name: str) -> zipfile.ZipInfo:
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        return info
+
+
+def _unique_name(name: str, taken: set) -> str:
+    """Suffix an entry name that is already in the archive"""
+    candidate, counter = name, 1
+    while candidate in taken:
+        counter += 1
+        candidate = name.replace(".pdf", f"_{counter}.pdf")
+    taken.add(candidate)
+    return candidate
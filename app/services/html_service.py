@@ -0,0 +1,271 @@
+"""
+HTML Service - On-demand rendering and caching of CV HTML pages
+"""
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from jinja2 import Environment
+
+from app.models.cv_data import CVData
+from app.services.artifact_cache import ArtifactCache, TemplateDigests
+from app.core.codec import dump_json
+from app.core.compression import IDENTITY, precompress
+from app.core.exceptions import TemplateError
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_REQUESTS, RENDERS, STAGE_SECONDS
+
+logger = get_logger(__name__)
+
+_CACHE_HITS = CACHE_REQUESTS.labels("html", "hit")
+_CACHE_MISSES = CACHE_REQUESTS.labels("html", "miss")
+_RENDERS = RENDERS.labels("html")
+_RENDER_SECONDS = STAGE_SECONDS.labels("render_template")
+
+HTML_TEMPLATE = "cv_template.html"
+
+
+class HTMLService:
+    """
+    Renders CV pages from the stored CV data instead of keeping HTML files.
+
+    Both the plain page and the display page (with its download button) come
+    from the same template. Rendered pages are kept in a small in-memory LRU
+    in front of an optional disk cache, both keyed on a hash of the CV data,
+    the template source and the variant, so an edited CV or template is never
+    served stale. Gzip and brotli variants are produced when a page is
+    rendered and cached next to it, so compressed responses cost nothing
+    per request.
+    """
+
+    def __init__(
+        self,
+        templates_env: Environment,
+        cache: Optional[ArtifactCache] = None,
+        memory_max_bytes: int = 16 * 1024 * 1024
+    ):
+        self.templates_env = templates_env
+        self.cache = cache
+        self.memory_max_bytes = memory_max_bytes
+        self._template_digests = TemplateDigests(templates_env)
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def cache_key(
+        self,
+        cv_id: str,
+        cv_data: CVData,
+        download_filename: Optional[str] = None,
+        download_url: Optional[str] = None
+    ) -> str:
+        """
+        Content hash identifying a rendered page, without rendering it
+
+        Covers the CV data, the template source and the page variant, so it
+        doubles as the page's ETag.
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+            download_filename: Download button filename (display page only)
+            download_url: Download button target (display page only)
+
+        Returns:
+            str: Cache key for the page
+        """
+        variant = "display" if download_filename else "plain"
+        payload = dump_json(CVData, cv_data)
+        return ArtifactCache.make_key(
+            payload, self._template_digests.get(HTML_TEMPLATE), variant, cv_id,
+            download_filename or "", download_url or ""
+        )
+
+    def get_html(
+        self,
+        cv_id: str,
+        cv_data: CVData,
+        download_filename: Optional[str] = None,
+        download_url: Optional[str] = None,
+        key: Optional[str] = None,
+        encoding: str = IDENTITY
+    ) -> bytes:
+        """
+        Return the HTML page for a CV, rendering it only on a cache miss
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+            download_filename: If set, render the display page with a PDF
+                download button saving under this name
+            download_url: Download button target (``/cv/{cv_id}/pdf`` if None)
+            key: The page's cache_key, if already computed
+            encoding: Content-Encoding to return (IDENTITY or one of
+                compression.ENCODINGS)
+
+        Returns:
+            bytes: UTF-8 encoded HTML, compressed as requested
+
+        Raises:
+            TemplateError: If template rendering fails
+        """
+        if key is None:
+            key = self.cache_key(cv_id, cv_data, download_filename, download_url)
+        entry_key = self._entry_key(key, encoding)
+
+        content = self._memory_get(entry_key)
+        if content is not None:
+            _CACHE_HITS.inc()
+            return content
+
+        if self.cache:
+            content = self.cache.get(entry_key)
+        if content is None:
+            _CACHE_MISSES.inc()
+            content = self._store_variants(cv_id, cv_data, download_filename, download_url, key)[encoding]
+        else:
+            _CACHE_HITS.inc()
+
+        self._memory_put(entry_key, content)
+        return content
+
+    def locate_html(
+        self,
+        cv_id: str,
+        cv_data: CVData,
+        download_filename: Optional[str] = None,
+        download_url: Optional[str] = None,
+        key: Optional[str] = None,
+        encoding: str = IDENTITY
+    ) -> Union[bytes, Path]:
+        """
+        Like get_html, but return the disk cache file instead of reading it
+
+        Pages already in the memory LRU and freshly rendered pages are
+        returned as bytes; a disk cache hit is returned as its path so the
+        response can be streamed from the file.
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+            download_filename: If set, the display page with this download name
+            download_url: Download button target (``/cv/{cv_id}/pdf`` if None)
+            key: The page's cache_key, if already computed
+            encoding: Content-Encoding to return
+
+        Returns:
+            Union[bytes, Path]: Page content or the cache file holding it
+
+        Raises:
+            TemplateError: If template rendering fails
+        """
+        if key is None:
+            key = self.cache_key(cv_id, cv_data, download_filename, download_url)
+        entry_key = self._entry_key(key, encoding)
+
+        content = self._memory_get(entry_key)
+        if content is not None:
+            _CACHE_HITS.inc()
+            return content
+
+        if self.cache:
+            path = self.cache.get_path(entry_key)
+            if path is not None:
+                _CACHE_HITS.inc()
+                return path
+        _CACHE_MISSES.inc()
+        return self._store_variants(cv_id, cv_data, download_filename, download_url, key)[encoding]
+
+    def _store_variants(
+        self,
+        cv_id: str,
+        cv_data: CVData,
+        download_filename: Optional[str],
+        download_url: Optional[str],
+        key: str
+    ) -> Dict[str, bytes]:
+        """
+        Render a page (unless already cached) and cache it with its compressed variants
+
+        Compressing once here, at maximum settings, means every later
+        request is served its encoding straight from the cache.
+        """
+        content = self._memory_get(key)
+        if content is None and self.cache:
+            content = self.cache.get(key)
+        if content is None:
+            content = self.render_html(cv_id, cv_data, download_filename, download_url).encode("utf-8")
+
+        variant = "display" if download_filename else "plain"
+        variants = {IDENTITY: content, **precompress(content)}
+        for encoding, encoded in variants.items():
+            entry_key = self._entry_key(key, encoding)
+            if self.cache:
+                self.cache.put(
+                    entry_key, encoded, cv_id=cv_id,
+                    variant=variant if encoding == IDENTITY else f"{variant}.{encoding}"
+                )
+            self._memory_put(entry_key, encoded)
+        return variants
+
+    @staticmethod
+    def _entry_key(key: str, encoding: str) -> str:
+        return key if encoding == IDENTITY else f"{key}-{encoding}"
+
+    def render_html(
+        self,
+        cv_id: str,
+        cv_data: CVData,
+        download_filename: Optional[str] = None,
+        download_url: Optional[str] = None
+    ) -> str:
+        """
+        Render the HTML template for a CV
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+            download_filename: If set, include the PDF download button
+            download_url: Download button target (``/cv/{cv_id}/pdf`` if None)
+
+        Returns:
+            str: Rendered HTML
+
+        Raises:
+            TemplateError: If template rendering fails
+        """
+        context = cv_data.model_dump()
+        if download_filename:
+            context["download_url"] = download_url or f"/cv/{cv_id}/pdf"
+            context["download_filename"] = download_filename
+
+        try:
+            with _RENDER_SECONDS.time():
+                template = self.templates_env.get_template(HTML_TEMPLATE)
+                content = template.render(**context)
+            _RENDERS.inc()
+            return content
+        except Exception as e:
+            logger.error(f"Template rendering error: {str(e)}")
+            raise TemplateError(f"Failed to render template {HTML_TEMPLATE}: {str(e)}")
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+            return content
+
+    def _memory_put(self, key: str, content: bytes) -> None:
+        if len(content) > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_bytes -= len(previous)
+            self._memory[key] = content
+            self._memory_bytes += len(content)
+            while self._memory_bytes > self.memory_max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
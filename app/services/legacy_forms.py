@@ -0,0 +1,228 @@
+"""
+Conversion between the legacy flat form fields and structured CV data
+
+Only old clients post the flat ``edu_1_qual``-style fields, so this module is
+imported on first use rather than at application start.
+"""
+from typing import Any, Dict
+
+from app.models.cv_data import CVData
+from app.core.exceptions import CVGenerationError
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def convert_legacy_data(legacy_data: Dict[str, Any]) -> CVData:
+    """
+    Convert legacy flat form data to new structured format
+    
+    Args:
+        legacy_data: Legacy form data dictionary
+        
+    Returns:
+        CVData: Structured CV data
+    """
+    try:
+        # Extract personal info
+        personal_info = {
+            "full_name": legacy_data.get("full_name", ""),
+            "highest_education": legacy_data.get("highest_education", ""),
+            "city": legacy_data.get("city", ""),
+            "phone": legacy_data.get("phone", ""),
+            "email": legacy_data.get("email", "")
+        }
+        
+        # Extract education entries
+        education = []
+        for i in range(1, 6):  # Support up to 5 education entries
+            qual = legacy_data.get(f"edu_{i}_qual", "")
+            if qual and qual.strip():
+                education.append({
+                    "qualification": qual,
+                    "stream": legacy_data.get(f"edu_{i}_stream", ""),
+                    "institute": legacy_data.get(f"edu_{i}_institute", ""),
+                    "year": legacy_data.get(f"edu_{i}_year", ""),
+                    "cgpa": legacy_data.get(f"edu_{i}_cgpa", "")
+                })
+        
+        # Extract achievements
+        achievements = []
+        for i in range(1, 6):  # Support up to 5 achievements
+            desc = legacy_data.get(f"ach_{i}_desc", "")
+            if desc and desc.strip():
+                achievements.append({
+                    "description": desc,
+                    "year": legacy_data.get(f"ach_{i}_year", "")
+                })
+        
+        # Extract internships
+        internships = []
+        for i in range(1, 4):  # Support up to 3 internships
+            company = legacy_data.get(f"intern_{i}_company", "")
+            if company and company.strip():
+                points = []
+                for j in range(1, 6):  # Support up to 5 points per internship
+                    point = legacy_data.get(f"intern_{i}_point_{j}", "")
+                    if point and point.strip():
+                        points.append(point)
+                
+                if points:  # Only add if there are points
+                    internships.append({
+                        "company": company,
+                        "role": legacy_data.get(f"intern_{i}_role", ""),
+                        "duration": legacy_data.get(f"intern_{i}_duration", ""),
+                        "points": points
+                    })
+        
+        # Extract projects
+        projects = []
+        for i in range(1, 4):  # Support up to 3 projects
+            title = legacy_data.get(f"proj_{i}_title", "")
+            if title and title.strip():
+                points = []
+                for j in range(1, 6):  # Support up to 5 points per project
+                    point = legacy_data.get(f"proj_{i}_point_{j}", "")
+                    if point and point.strip():
+                        points.append(point)
+                
+                if points:  # Only add if there are points
+                    projects.append({
+                        "title": title,
+                        "type": legacy_data.get(f"proj_{i}_type", ""),
+                        "duration": legacy_data.get(f"proj_{i}_duration", ""),
+                        "points": points
+                    })
+        
+        # Extract positions of responsibility
+        positions = []
+        for i in range(1, 4):  # Support up to 3 positions
+            club = legacy_data.get(f"por_{i}_club", "")
+            if club and club.strip():
+                points = []
+                for j in range(1, 6):  # Support up to 5 points per position
+                    point = legacy_data.get(f"por_{i}_point_{j}", "")
+                    if point and point.strip():
+                        points.append(point)
+                
+                if points:  # Only add if there are points
+                    positions.append({
+                        "club": club,
+                        "role": legacy_data.get(f"por_{i}_role", ""),
+                        "duration": legacy_data.get(f"por_{i}_duration", ""),
+                        "points": points
+                    })
+        
+        # Extract extracurricular activities
+        extracurricular = []
+        for i in range(1, 6):  # Support up to 5 activities
+            activity = legacy_data.get(f"extracur_{i}_desc", "")
+            if activity and activity.strip():
+                extracurricular.append(activity)
+        
+        # Extract technical skills
+        technical_skills = []
+        for i in range(1, 11):  # Support up to 10 skills
+            skill = legacy_data.get(f"techskill_{i}", "")
+            if skill and skill.strip():
+                technical_skills.append(skill)
+        
+        # Create structured CV data
+        cv_data_dict = {
+            "personal_info": personal_info,
+            "education": education,
+            "achievements": achievements,
+            "internships": internships,
+            "projects": projects,
+            "positions_of_responsibility": positions,
+            "extracurricular": extracurricular,
+            "technical_skills": technical_skills
+        }
+        
+        return CVData(**cv_data_dict)
+        
+    except Exception as e:
+        logger.error(f"Error converting legacy data: {str(e)}")
+        raise CVGenerationError(f"Failed to convert legacy data: {str(e)}")
+
+
+def convert_structured_to_form_data(structured_data: dict) -> dict:
+    """Convert structured data to legacy form format for template compatibility"""
+    form_data = {}
+    
+    # Personal info
+    personal_info = structured_data.get("personal_info", {})
+    form_data.update({
+        "full_name": personal_info.get("full_name", ""),
+        "highest_education": personal_info.get("highest_education", ""),
+        "city": personal_info.get("city", ""),
+        "phone": personal_info.get("phone", ""),
+        "email": personal_info.get("email", "")
+    })
+    
+    # Education
+    education = structured_data.get("education", [])
+    for i, edu in enumerate(education[:5], 1):
+        form_data.update({
+            f"edu_{i}_qual": edu.get("qualification", ""),
+            f"edu_{i}_stream": edu.get("stream", ""),
+            f"edu_{i}_institute": edu.get("institute", ""),
+            f"edu_{i}_year": edu.get("year", ""),
+            f"edu_{i}_cgpa": edu.get("cgpa", "")
+        })
+    
+    # Achievements
+    achievements = structured_data.get("achievements", [])
+    for i, ach in enumerate(achievements[:5], 1):
+        form_data.update({
+            f"ach_{i}_desc": ach.get("description", ""),
+            f"ach_{i}_year": ach.get("year", "")
+        })
+    
+    # Internships
+    internships = structured_data.get("internships", [])
+    for i, intern in enumerate(internships[:3], 1):
+        form_data.update({
+            f"intern_{i}_company": intern.get("company", ""),
+            f"intern_{i}_role": intern.get("role", ""),
+            f"intern_{i}_duration": intern.get("duration", "")
+        })
+        points = intern.get("points", [])
+        for j, point in enumerate(points[:5], 1):
+            form_data[f"intern_{i}_point_{j}"] = point
+    
+    # Projects
+    projects = structured_data.get("projects", [])
+    for i, proj in enumerate(projects[:3], 1):
+        form_data.update({
+            f"proj_{i}_title": proj.get("title", ""),
+            f"proj_{i}_type": proj.get("type", ""),
+            f"proj_{i}_duration": proj.get("duration", "")
+        })
+        points = proj.get("points", [])
+        for j, point in enumerate(points[:5], 1):
+            form_data[f"proj_{i}_point_{j}"] = point
+    
+    # Positions of responsibility
+    positions = structured_data.get("positions_of_responsibility", [])
+    for i, pos in enumerate(positions[:3], 1):
+        form_data.update({
+            f"por_{i}_club": pos.get("club", ""),
+            f"por_{i}_role": pos.get("role", ""),
+            f"por_{i}_duration": pos.get("duration", "")
+        })
+        points = pos.get("points", [])
+        for j, point in enumerate(points[:5], 1):
+            form_data[f"por_{i}_point_{j}"] = point
+    
+    # Extracurricular activities
+    extracurricular = structured_data.get("extracurricular", [])
+    for i, activity in enumerate(extracurricular[:5], 1):
+        form_data[f"extracur_{i}_desc"] = activity
+    
+    # Technical skills
+    technical_skills = structured_data.get("technical_skills", [])
+    for i, skill in enumerate(technical_skills[:10], 1):
+        form_data[f"techskill_{i}"] = skill
+    
+    return form_data
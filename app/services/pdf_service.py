@@ -0,0 +1,470 @@
+"""
+PDF Service - Rendering and caching of CV PDFs
+"""
+import asyncio
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+
+from jinja2 import Environment
+from starlette.concurrency import run_in_threadpool
+
+from app.models.cv_data import CVData
+from app.services.artifact_cache import ArtifactCache, TemplateDigests
+from app.services.cv_service import CVService
+from app.storage.base import PDF
+from app.core.codec import dump_json
+from app.core.exceptions import CVNotFoundError, TemplateError
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_REQUESTS, RENDERS, STAGE_SECONDS
+
+if TYPE_CHECKING:
+    from app.services.render_engine import PDFRenderEngine
+
+logger = get_logger(__name__)
+
+_CACHE_HITS = CACHE_REQUESTS.labels("pdf", "hit")
+_CACHE_MISSES = CACHE_REQUESTS.labels("pdf", "miss")
+_RENDERS = RENDERS.labels("pdf")
+_RENDER_SECONDS = STAGE_SECONDS.labels("render_template")
+_LAYOUT_SECONDS = STAGE_SECONDS.labels("pdf_render")
+
+PDF_TEMPLATE = "cv_template_pdf.html"
+PDF_STYLESHEET = "cv_pdf.css"
+
+
+def _pin_pdf_metadata(document, pdf) -> None:
+    """WeasyPrint finisher dropping volatile metadata so output is reproducible"""
+    for key in ("CreationDate", "ModDate"):
+        pdf.info.pop(key, None)
+
+
+@lru_cache(maxsize=None)
+def font_configuration():
+    """
+    The process-wide WeasyPrint FontConfiguration
+
+    Fonts found through fontconfig are cached on this object, so reusing it
+    for every stylesheet and render means each worker looks them up once.
+    """
+    from weasyprint.text.fonts import FontConfiguration
+
+    return FontConfiguration()
+
+
+@lru_cache(maxsize=8)
+def _parsed_stylesheet(path: str, mtime_ns: int):
+    """Parse a stylesheet file; cached per path and modification time"""
+    import weasyprint
+
+    return weasyprint.CSS(filename=path, font_config=font_configuration())
+
+
+@lru_cache(maxsize=None)
+def stylesheet_path(templates_env: Environment) -> str:
+    """
+    Absolute path of the PDF stylesheet, looked up through the template loader once
+
+    Args:
+        templates_env: Environment the PDF template is loaded from
+
+    Returns:
+        str: CSS file next to the PDF template
+    """
+    filename = templates_env.loader.get_source(templates_env, PDF_STYLESHEET)[1]
+    return os.path.abspath(filename)
+
+
+def load_stylesheets(stylesheet: Optional[str]) -> list:
+    """
+    Parsed ``weasyprint.CSS`` objects for a render, parsed once per process
+
+    The file is parsed again only if it changes on disk.
+
+    Args:
+        stylesheet: Path of the CSS file to apply, or None
+
+    Returns:
+        list: Stylesheets to pass to ``write_pdf``
+    """
+    if not stylesheet:
+        return []
+    return [_parsed_stylesheet(stylesheet, os.stat(stylesheet).st_mtime_ns)]
+
+
+def _write_pdf(html_content: str, target=None, stylesheet: Optional[str] = None):
+    # Without HarfBuzz-Subset, WeasyPrint subsets fonts with fontTools, which
+    # stamps each embedded font with the current time unless this is set
+    os.environ.setdefault("SOURCE_DATE_EPOCH", "0")
+    # Imported here so processes that never render a PDF skip WeasyPrint entirely
+    import weasyprint
+
+    return weasyprint.HTML(string=html_content).write_pdf(
+        target,
+        stylesheets=load_stylesheets(stylesheet),
+        font_config=font_configuration(),
+        finisher=_pin_pdf_metadata,
+        pdf_identifier=False,
+    )
+
+
+def render_pdf_bytes(html_content: str, stylesheet: Optional[str] = None) -> bytes:
+    """
+    Lay out HTML with WeasyPrint and return deterministic PDF bytes
+
+    Identical input always yields byte-identical output: no file identifier
+    is written and creation/modification timestamps are stripped.
+
+    Args:
+        html_content: Rendered PDF template (the document body)
+        stylesheet: Path of the CSS file to apply, parsed once per process
+
+    Returns:
+        bytes: PDF document
+    """
+    return _write_pdf(html_content, stylesheet=stylesheet)
+
+
+def render_pdf_file(html_content: str, target: str, stylesheet: Optional[str] = None) -> str:
+    """
+    Lay out HTML with WeasyPrint straight into a file
+
+    Used for large documents so the PDF never has to be held in memory or
+    sent back from a worker process.
+
+    Args:
+        html_content: Rendered PDF template
+        target: Path of the PDF file to write
+        stylesheet: Path of the CSS file to apply, parsed once per process
+
+    Returns:
+        str: The target path
+    """
+    _write_pdf(html_content, target, stylesheet=stylesheet)
+    return target
+
+
+class PDFService:
+    """Service for rendering CV PDFs with a content-addressed artifact cache"""
+
+    def __init__(
+        self,
+        templates_env: Environment,
+        engine: "PDFRenderEngine",
+        cv_service: CVService,
+        cache: Optional[ArtifactCache] = None
+    ):
+        self.templates_env = templates_env
+        self.engine = engine
+        self.cv_service = cv_service
+        self.cache = cache
+        self._template_digests = TemplateDigests(templates_env)
+        # Pre-renders by CV, queued or running; a fixed number of consumers drains the queue.
+        # Each worker process has its own, see the README on pre-rendering
+        self._jobs: Dict[str, "asyncio.Future[bytes]"] = {}
+        self._started: Set[str] = set()
+        self._queue: Optional["asyncio.Queue[Tuple[str, CVData, asyncio.Future[bytes]]]"] = None
+        self._queue_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._consumers: List["asyncio.Task[None]"] = []
+
+    def render_html(self, cv_data: CVData) -> str:
+        """
+        Render the PDF-specific HTML template for a CV
+
+        Args:
+            cv_data: Validated CV data
+
+        Returns:
+            str: HTML ready for WeasyPrint
+
+        Raises:
+            TemplateError: If template rendering fails
+        """
+        try:
+            with _RENDER_SECONDS.time():
+                template = self.templates_env.get_template(PDF_TEMPLATE)
+                return template.render(**cv_data.model_dump())
+        except Exception as e:
+            logger.error(f"Template rendering error: {str(e)}")
+            raise TemplateError(f"Failed to render template {PDF_TEMPLATE}: {str(e)}")
+
+    def cache_key(self, cv_data: CVData) -> str:
+        """
+        Content hash of the CV payload plus the PDF template and stylesheet
+
+        Args:
+            cv_data: Validated CV data
+
+        Returns:
+            str: Cache key for the rendered PDF
+        """
+        payload = dump_json(CVData, cv_data)
+        return ArtifactCache.make_key(
+            payload,
+            self._template_digests.get(PDF_TEMPLATE),
+            self._template_digests.get(PDF_STYLESHEET)
+        )
+
+    def immutable_url(self, cv_id: str, cv_data: CVData) -> str:
+        """
+        Content-hashed URL of a CV's current PDF
+
+        The URL changes whenever the CV data, template or stylesheet does,
+        so responses under it can be cached forever.
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+
+        Returns:
+            str: ``/cv/{cv_id}/pdf/{cache key}``
+        """
+        return f"/cv/{cv_id}/pdf/{self.cache_key(cv_data)}"
+
+    async def get_pdf(self, cv_data: CVData, cv_id: Optional[str] = None, cache_result: bool = True) -> bytes:
+        """
+        Return the PDF for a CV, rendering it only on a cache miss
+
+        Args:
+            cv_data: Validated CV data
+            cv_id: CV identifier the PDF belongs to, if stored
+            cache_result: Add a fresh render to the artifact cache; False when
+                the caller keeps its own copy
+
+        Returns:
+            bytes: PDF document
+        """
+        key = self.cache_key(cv_data) if self.cache else None
+
+        if key:
+            pdf_bytes = await run_in_threadpool(self.cache.get, key)
+            if pdf_bytes is not None:
+                _CACHE_HITS.inc()
+                logger.info("PDF cache hit for CV: %s", cv_id)
+                return pdf_bytes
+            _CACHE_MISSES.inc()
+
+        html_content = self.render_html(cv_data)
+        # WeasyPrint layout and PDF write on the render pool, including any wait for a worker
+        with _LAYOUT_SECONDS.time():
+            pdf_bytes = await self.engine.render(html_content, stylesheet=self.stylesheet_path())
+        _RENDERS.inc()
+
+        if key and cache_result:
+            await run_in_threadpool(self.cache.put, key, pdf_bytes, cv_id)
+        return pdf_bytes
+
+    async def get_cv_pdf(self, cv_id: str, cv_data: CVData) -> bytes:
+        """
+        Return the PDF for a stored CV
+
+        Waits on a running pre-render for the CV instead of starting a
+        duplicate, then prefers the stored {cv_id}.pdf artifact, and only
+        falls back to the cache/renderer when neither is available.
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+
+        Returns:
+            bytes: PDF document
+        """
+        pdf_bytes = await self._await_prerender(cv_id)
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+        # Storage may be remote (S3), so look the artifact up off the event loop
+        pdf_bytes = await run_in_threadpool(self._read_stored_pdf, cv_id)
+        if pdf_bytes is not None:
+            logger.info("Serving pre-rendered PDF for CV: %s", cv_id)
+            return pdf_bytes
+
+        return await self.get_pdf(cv_data, cv_id=cv_id)
+
+    def stylesheet_path(self) -> Optional[str]:
+        """
+        Path of the PDF stylesheet, which render workers parse once and reuse
+
+        Returns:
+            Optional[str]: CSS file next to the PDF template
+        """
+        return stylesheet_path(self.templates_env)
+
+    async def locate_cv_pdf(self, cv_id: str, cv_data: CVData) -> Union[bytes, Path]:
+        """
+        Like get_cv_pdf, but return the file holding the PDF when there is one
+
+        A fresh stored artifact on local storage or a PDF cache entry is
+        returned as a path so it can be streamed from disk without being
+        read into memory. Remote artifacts and fresh renders are bytes.
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+
+        Returns:
+            Union[bytes, Path]: PDF document or the file containing it
+        """
+        pdf_bytes = await self._await_prerender(cv_id)
+        if pdf_bytes is not None:
+            return pdf_bytes
+
+        stored = await run_in_threadpool(self._read_stored_pdf, cv_id, True)
+        if stored is not None:
+            logger.info("Serving pre-rendered PDF for CV: %s", cv_id)
+            return stored
+
+        if self.cache:
+            cached = await run_in_threadpool(self.cache.get_path, self.cache_key(cv_data))
+            if cached is not None:
+                _CACHE_HITS.inc()
+                logger.info("PDF cache hit for CV: %s", cv_id)
+                return cached
+
+        return await self.get_pdf(cv_data, cv_id=cv_id)
+
+    def schedule_prerender(self, cv_id: str, cv_data: CVData) -> None:
+        """
+        Queue a background render of a CV's PDF
+
+        Pre-renders are drained by one consumer per render worker, so a large
+        batch waits in the queue instead of flooding the render engine.
+
+        Args:
+            cv_id: CV identifier
+            cv_data: Validated CV data
+        """
+        if cv_id in self._jobs:
+            return
+
+        queue = self._prerender_queue()
+        job = asyncio.get_running_loop().create_future()
+        self._jobs[cv_id] = job
+        job.add_done_callback(lambda finished: self._finish_prerender(cv_id, finished))
+        queue.put_nowait((cv_id, cv_data, job))
+
+    def cancel_prerender(self, cv_id: str) -> None:
+        """
+        Drop a CV's queued or running pre-render, e.g. because the CV is being deleted
+
+        A queued job is skipped. A running render is left to finish, but its
+        PDF is not stored.
+
+        Args:
+            cv_id: CV identifier
+        """
+        job = self._jobs.get(cv_id)
+        if job is not None:
+            job.cancel()
+
+    async def wait_for_prerenders(self) -> None:
+        """Wait for queued pre-renders, then stop the consumers, e.g. before shutting the engine down"""
+        if self._jobs:
+            await asyncio.gather(*self._jobs.values(), return_exceptions=True)
+        for consumer in self._consumers:
+            consumer.cancel()
+        self._consumers = []
+        self._queue = self._queue_loop = None
+
+    def _prerender_queue(self) -> "asyncio.Queue[Tuple[str, CVData, asyncio.Future[bytes]]]":
+        """The pre-render queue of the running event loop, with its consumers started"""
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._queue_loop is not loop:
+            # Jobs queued on another (closed) loop can never run
+            self._jobs.clear()
+            self._started.clear()
+            self._queue = asyncio.Queue()
+            self._queue_loop = loop
+            self._consumers = [
+                asyncio.create_task(self._consume_prerenders(self._queue))
+                for _ in range(max(1, self.engine.workers))
+            ]
+        return self._queue
+
+    async def _consume_prerenders(self, queue: "asyncio.Queue[Tuple[str, CVData, asyncio.Future[bytes]]]") -> None:
+        while True:
+            cv_id, cv_data, job = await queue.get()
+            try:
+                if job.done():
+                    continue
+                self._started.add(cv_id)
+                try:
+                    result = await self._prerender(cv_id, cv_data, job)
+                except asyncio.CancelledError:
+                    job.cancel()
+                    raise
+                except Exception as e:
+                    if not job.done():
+                        job.set_exception(e)
+                else:
+                    if not job.done():
+                        job.set_result(result)
+            finally:
+                queue.task_done()
+
+    async def _await_prerender(self, cv_id: str) -> Optional[bytes]:
+        """
+        Result of the CV's pre-render if one is running
+
+        A pre-render still waiting in the queue is not waited for: the
+        caller renders straight away, and the queued job then finds the
+        PDF cached.
+        """
+        job = self._jobs.get(cv_id)
+        if job is None or cv_id not in self._started:
+            return None
+        try:
+            return await asyncio.shield(job)
+        except asyncio.CancelledError:
+            if not job.cancelled():
+                raise
+            # The pre-render was dropped; the caller renders
+            return None
+        except Exception:
+            # The pre-render already logged its failure; the caller renders
+            return None
+
+    async def _prerender(self, cv_id: str, cv_data: CVData, job: "asyncio.Future[bytes]") -> bytes:
+        # The stored {cv_id}.pdf is the one copy of a pre-render: it is what
+        # get_cv_pdf and locate_cv_pdf serve, so it is not cached as well
+        pdf_bytes = await self.get_pdf(cv_data, cv_id=cv_id, cache_result=False)
+        if job.cancelled():
+            return pdf_bytes
+        try:
+            # save_artifact also catches a CV deleted by another worker
+            await run_in_threadpool(self.cv_service.save_artifact, cv_id, PDF, pdf_bytes)
+        except CVNotFoundError:
+            logger.info("CV %s was deleted before its PDF was pre-rendered", cv_id)
+            return pdf_bytes
+        logger.info("PDF pre-rendered for CV: %s", cv_id)
+        return pdf_bytes
+
+    def _finish_prerender(self, cv_id: str, job: "asyncio.Future[bytes]") -> None:
+        if self._jobs.get(cv_id) is job:
+            del self._jobs[cv_id]
+            self._started.discard(cv_id)
+        if not job.cancelled() and job.exception() is not None:
+            logger.error(f"Error pre-rendering PDF for CV {cv_id}: {str(job.exception())}")
+
+    def _read_stored_pdf(self, cv_id: str, as_path: bool = False) -> Union[bytes, Path, None]:
+        """
+        The stored {cv_id}.pdf artifact, unless missing or older than the template or stylesheet
+
+        With ``as_path`` a local artifact is returned as its path instead of being read.
+        """
+        stored_mtime = self.cv_service.artifact_mtime(cv_id, PDF)
+        if stored_mtime is None or stored_mtime < self._template_mtime(PDF_TEMPLATE, PDF_STYLESHEET):
+            return None
+        if as_path:
+            path = self.cv_service.artifact_path(cv_id, PDF)
+            if path is not None:
+                return path
+        try:
+            return self.cv_service.read_artifact(cv_id, PDF)
+        except CVNotFoundError:
+            return None
+
+    def _template_mtime(self, *template_names: str) -> float:
+        """Latest modification time of templates and their partials, so stale stored PDFs are not served"""
+        return max(self._template_digests.mtime(name) for name in template_names)
@@ -0,0 +1,185 @@
+"""
+Render Engine - Runs CPU-bound WeasyPrint layout off the event loop
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.core.exceptions import PDFGenerationError
+from app.core.logging import get_logger
+from app.services.pdf_service import font_configuration, render_pdf_bytes, render_pdf_file
+
+logger = get_logger(__name__)
+
+# Tries per render when its pool is replaced under it
+MAX_ATTEMPTS = 3
+
+
+def _warm_up_worker() -> None:
+    """Pool initializer: pay the WeasyPrint import and font setup once per worker"""
+    font_configuration()
+
+
+class PDFRenderEngine:
+    """
+    Pool of worker processes that lay out PDFs in parallel.
+
+    With ``workers=0`` renders run on a thread instead, for platforms
+    without multiprocessing support (e.g. AWS Lambda has no /dev/shm).
+    """
+
+    def __init__(self, workers: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor: Optional[Executor] = None
+        self._stopped = False
+        # One slot per worker, so a render's timeout only starts once a worker takes it
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """Create the worker pool if it is not already running"""
+        self._stopped = False
+        if self._executor is not None:
+            return
+
+        if self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_up_worker,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-render")
+        logger.info(f"PDF render engine started with {self.workers} worker process(es)")
+
+    async def render(self, html_content: str, stylesheet: Optional[str] = None) -> bytes:
+        """
+        Render HTML to PDF on the pool without blocking the event loop
+
+        Args:
+            html_content: Rendered PDF template
+            stylesheet: CSS file applied to the document, parsed once per worker
+
+        Returns:
+            bytes: PDF document
+
+        Raises:
+            PDFGenerationError: If the render fails or exceeds the timeout
+        """
+        return await self._run(render_pdf_bytes, (html_content, stylesheet), self.timeout)
+
+    async def render_file(
+        self,
+        html_content: str,
+        target: str,
+        stylesheet: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> str:
+        """
+        Render HTML to a PDF file on the pool without blocking the event loop
+
+        Args:
+            html_content: Rendered PDF template
+            target: Path of the PDF file to write
+            stylesheet: CSS file applied to the document, parsed once per worker
+            timeout: Seconds allowed for this render (the engine default if None)
+
+        Returns:
+            str: The target path
+
+        Raises:
+            PDFGenerationError: If the render fails or exceeds the timeout
+        """
+        return await self._run(render_pdf_file, (html_content, target, stylesheet), timeout or self.timeout)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for in-flight renders to finish"""
+        self._stopped = True
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        logger.info("PDF render engine stopped")
+
+    async def _run(self, fn: Callable, args: tuple, timeout: float):
+        """
+        Run one render on the pool
+
+        Renders wait for a free worker first, so the timeout covers the
+        render itself, not the time spent queued behind others. Only the
+        render that exceeds its timeout fails. Renders running on a pool that
+        is replaced meanwhile (another render timed out, or a worker died)
+        are resubmitted to the new pool, each attempt with a fresh timeout.
+        """
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+            self._slots_loop = loop
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            async with self._slots:
+                if self._stopped:
+                    raise PDFGenerationError("PDF render engine stopped before the render ran")
+                self.start()
+                executor = self._executor
+                job = executor.submit(fn, *args)
+                future = asyncio.wrap_future(job)
+                try:
+                    # Unlike wait_for, wait leaves the job alone on timeout, and a
+                    # CancelledError here always means the caller was cancelled
+                    await asyncio.wait({future}, timeout=timeout)
+                except asyncio.CancelledError:
+                    job.cancel()
+                    raise
+
+                if not future.done():
+                    logger.error(f"PDF render exceeded {timeout}s timeout")
+                    if job.running():
+                        self._recycle(executor)
+                    else:
+                        job.cancel()
+                    raise PDFGenerationError(f"PDF rendering timed out after {timeout} seconds")
+                if future.cancelled():
+                    # Cancelled by the pool: recycled, or the engine is shutting down
+                    if self._stopped:
+                        raise PDFGenerationError("PDF render engine stopped before the render ran")
+                elif isinstance(future.exception(), BrokenExecutor):
+                    logger.error("PDF render pool broke (a worker died)")
+                    self._recycle(executor)
+                elif isinstance(future.exception(), PDFGenerationError):
+                    raise future.exception()
+                elif future.exception() is not None:
+                    error = future.exception()
+                    logger.error(f"PDF rendering error: {str(error)}")
+                    raise PDFGenerationError(f"PDF rendering failed: {str(error)}") from error
+                else:
+                    return future.result()
+            logger.warning(f"PDF render interrupted by a pool restart (attempt {attempt} of {MAX_ATTEMPTS})")
+        raise PDFGenerationError(f"PDF rendering failed: the render pool restarted {MAX_ATTEMPTS} times")
+
+    def _recycle(self, executor: Executor) -> None:
+        """
+        Replace a pool whose worker is stuck or dead
+
+        New renders go to a fresh pool. The old one stops taking work and its
+        worker processes are killed: a stuck layout never returns on its own.
+        Renders still queued or running on it end with a cancellation or
+        BrokenProcessPool, which ``_run`` answers by resubmitting them.
+        A render thread (``workers=0``) cannot be killed; it is left to
+        finish in the background.
+        """
+        if executor is not self._executor:
+            # Already replaced by another render that saw the same failure
+            return
+        self._executor = None
+        self.start()
+
+        # The executor drops its process table on shutdown
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+        if processes:
+            logger.warning(f"Killed {len(processes)} PDF render worker(s) of the replaced pool")
@@ -0,0 +1 @@
+# CV Storage Backends Package
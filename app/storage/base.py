@@ -0,0 +1,130 @@
+"""
+Storage backend interface for CV data and generated artifacts
+"""
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from app.core.exceptions import CVNotFoundError
+from app.storage.compact import is_compact
+
+# Artifacts stored per CV
+DATA = "data"
+# The data file in plain JSON (earlier releases, CV_DATA_FORMAT=json). Its
+# name says JSON; compact documents (app.storage.compact) are binary and are
+# stored as DATA under a name of their own.
+JSON_DATA = "json_data"
+HTML = "html"
+DISPLAY_HTML = "display_html"
+PDF = "pdf"
+
+ARTIFACTS = (DATA, JSON_DATA, HTML, DISPLAY_HTML, PDF)
+# Names a CV's data file may be stored under, preferred first
+DATA_ARTIFACTS = (DATA, JSON_DATA)
+
+_CV_ID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def validate_cv_id(cv_id: str) -> str:
+    """
+    Ensure a CV ID is a canonical UUID before it is turned into a storage key
+
+    Args:
+        cv_id: CV identifier from a request or listing
+
+    Returns:
+        str: The same CV identifier
+
+    Raises:
+        CVNotFoundError: If the ID cannot belong to any stored CV
+    """
+    if not _CV_ID_RE.match(cv_id):
+        raise CVNotFoundError(f"CV with ID {cv_id} not found")
+    return cv_id
+
+
+class StorageBackend(ABC):
+    """
+    Where CV data files and rendered artifacts live.
+
+    All reads and writes of per-CV files go through a backend, addressed by
+    ``(cv_id, artifact)`` where artifact is one of ``ARTIFACTS``. Missing
+    artifacts raise ``FileNotFoundError`` on read.
+    """
+
+    # True when other processes/hosts may write to the same store, so the
+    # local metadata index has to be re-synced on startup
+    shared = False
+
+    @abstractmethod
+    def read_bytes(self, cv_id: str, artifact: str) -> bytes:
+        """Return the content of an artifact"""
+
+    @abstractmethod
+    def write_bytes(self, cv_id: str, artifact: str, content: bytes) -> None:
+        """Atomically create or replace an artifact"""
+
+    @abstractmethod
+    def exists(self, cv_id: str, artifact: str) -> bool:
+        """Whether an artifact is stored"""
+
+    @abstractmethod
+    def mtime(self, cv_id: str, artifact: str) -> Optional[float]:
+        """Last modification time of an artifact as a Unix timestamp, or None if missing"""
+
+    @abstractmethod
+    def delete(self, cv_id: str, artifact: str) -> None:
+        """Remove an artifact; missing artifacts are ignored"""
+
+    @abstractmethod
+    def iter_cv_ids(self) -> Iterator[str]:
+        """Yield the ID of every CV that has a data file"""
+
+    def iter_cv_stamps(self) -> Iterator[Tuple[str, float]]:
+        """Yield ``(cv_id, data mtime)`` for every CV, used to sync the metadata index"""
+        for cv_id in self.iter_cv_ids():
+            mtime = self.data_mtime(cv_id)
+            if mtime is not None:
+                yield cv_id, mtime
+
+    def read_data(self, cv_id: str) -> bytes:
+        """Return a CV's data file, in whichever encoding it is stored"""
+        for artifact in DATA_ARTIFACTS:
+            try:
+                return self.read_bytes(cv_id, artifact)
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"No data file for CV {cv_id}")
+
+    def write_data(self, cv_id: str, content: bytes, replace: bool = True) -> None:
+        """
+        Store a CV's data file under the name matching its encoding
+
+        Args:
+            cv_id: CV identifier
+            content: Encoded document (compact or plain JSON)
+            replace: Remove a data file stored under the other name; False
+                for new CVs, saving a request on remote stores
+        """
+        artifact, other = (DATA, JSON_DATA) if is_compact(content) else (JSON_DATA, DATA)
+        self.write_bytes(cv_id, artifact, content)
+        if replace:
+            self.delete(cv_id, other)
+
+    def data_mtime(self, cv_id: str) -> Optional[float]:
+        """Last modification time of a CV's data file, or None if it has none"""
+        for artifact in DATA_ARTIFACTS:
+            mtime = self.mtime(cv_id, artifact)
+            if mtime is not None:
+                return mtime
+        return None
+
+    def delete_all(self, cv_id: str) -> None:
+        """Remove every artifact of a CV"""
+        for artifact in ARTIFACTS:
+            self.delete(cv_id, artifact)
+
+    def local_path(self, cv_id: str, artifact: str) -> Optional[Path]:
+        """Filesystem path of an artifact when the backend is local, else None"""
+        return None
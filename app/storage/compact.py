@@ -0,0 +1,220 @@
+"""
+Compact, versioned encoding for stored CV documents
+
+A compact document is a 4-byte header (``CVZ`` plus a format version)
+followed by minified JSON compressed with raw DEFLATE against a preset
+dictionary trained on the CV corpus. Most of a CV is field names and values
+shared with every other student (institutes, streams, skills), so the
+dictionary lets even a single small document compress well.
+
+Readers detect the format from the first bytes; plain JSON written by
+earlier releases is still accepted. Dictionaries are immutable once
+shipped: a retrained dictionary gets a new format version.
+"""
+import json
+import math
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from app.core.codec import loads
+
+FORMAT_JSON = "json"
+FORMAT_COMPACT = "compact"
+FORMATS = (FORMAT_JSON, FORMAT_COMPACT)
+
+MAGIC = b"CVZ"
+CURRENT_VERSION = 2
+
+_DICTIONARY_DIR = Path(__file__).parent / "dictionaries"
+_DICTIONARIES: Dict[int, str] = {
+    # Only read: v1 was trained on the unredacted sample CV, so nothing is
+    # written with it any more. ``app.storage.convert`` upgrades v1 files.
+    1: "cv-v1.zdict",
+    2: "cv-v2.zdict",
+}
+
+# Keys and string values with the structural characters around them,
+# e.g. ``,"institute":`` or ``"Computer Science"``
+_TOKEN_PATTERN = re.compile(rb'[{}\[\],:]*"(?:[^"\\]|\\.)*":?')
+
+# Blanked before training: values identifying a student or their CV, and
+# text they wrote themselves. Only field names and values shared across CVs
+# (institutes, streams, companies, skills) can become dictionary entries.
+_PRIVATE_FIELDS = frozenset((
+    "metadata", "personal_info",
+    # Also found outside personal_info in documents from early releases
+    "cv_id", "name", "full_name", "email", "phone", "city",
+))
+_FREE_TEXT_FIELDS = frozenset(("description", "title", "points", "extracurricular"))
+
+
+@lru_cache(maxsize=None)
+def _dictionary(version: int) -> bytes:
+    """Preset dictionary for a format version, read once per process"""
+    try:
+        filename = _DICTIONARIES[version]
+    except KeyError:
+        raise ValueError(f"Unknown compact document version: {version}")
+    return (_DICTIONARY_DIR / filename).read_bytes()
+
+
+def is_compact(raw: bytes) -> bool:
+    """Whether stored bytes use the compact encoding"""
+    return raw[:len(MAGIC)] == MAGIC
+
+
+def compact_version(raw: bytes) -> Optional[int]:
+    """Format version of compact document bytes, or None if they are not compact"""
+    if not is_compact(raw) or len(raw) <= len(MAGIC):
+        return None
+    return raw[len(MAGIC)]
+
+
+def encode_json(payload: bytes, data_format: str = FORMAT_COMPACT) -> bytes:
+    """
+    Encode an already serialized JSON document for storage
+
+    Args:
+        payload: UTF-8 JSON (e.g. from ``codec.dump_json``)
+        data_format: ``compact`` (compressed) or ``json`` (stored as given)
+
+    Returns:
+        bytes: Encoded document
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if data_format == FORMAT_JSON:
+        return payload
+    if data_format != FORMAT_COMPACT:
+        raise ValueError(f"Unknown CV data format: {data_format}")
+
+    compressor = zlib.compressobj(
+        level=9, wbits=-zlib.MAX_WBITS, zdict=_dictionary(CURRENT_VERSION)
+    )
+    body = compressor.compress(payload) + compressor.flush()
+    return MAGIC + bytes([CURRENT_VERSION]) + body
+
+
+def decode_json(raw: bytes) -> bytes:
+    """
+    The JSON payload of stored CV document bytes in any supported format
+
+    Args:
+        raw: Bytes as read from the storage backend
+
+    Returns:
+        bytes: UTF-8 JSON, ready for ``codec.validate_json``
+
+    Raises:
+        ValueError: If the bytes are corrupt or use an unknown version
+    """
+    if not is_compact(raw):
+        return raw
+
+    version = raw[len(MAGIC)] if len(raw) > len(MAGIC) else -1
+    decompressor = zlib.decompressobj(wbits=-zlib.MAX_WBITS, zdict=_dictionary(version))
+    try:
+        payload = decompressor.decompress(raw[len(MAGIC) + 1:]) + decompressor.flush()
+    except zlib.error as e:
+        raise ValueError(f"Corrupt compact CV document: {str(e)}")
+    if not decompressor.eof:
+        raise ValueError("Corrupt compact CV document: truncated stream")
+    return payload
+
+
+def encode_document(document: Dict[str, Any], data_format: str = FORMAT_COMPACT) -> bytes:
+    """
+    Serialize a CV document given as a plain dict for storage
+
+    Args:
+        document: CV document as a plain dict (``CVDocument.model_dump()``)
+        data_format: ``compact`` or ``json`` (indented, as written by earlier releases)
+
+    Returns:
+        bytes: Encoded document
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if data_format == FORMAT_JSON:
+        return json.dumps(document, indent=2, default=str).encode("utf-8")
+    payload = json.dumps(document, separators=(",", ":"), ensure_ascii=False, default=str)
+    return encode_json(payload.encode("utf-8"), data_format)
+
+
+def decode_document(raw: bytes) -> Dict[str, Any]:
+    """
+    Parse stored CV document bytes in any supported format
+
+    Args:
+        raw: Bytes as read from the storage backend
+
+    Returns:
+        dict: CV document
+
+    Raises:
+        ValueError: If the bytes are corrupt or use an unknown version
+    """
+    return loads(decode_json(raw))
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = 16 * 1024, min_share: float = 0.01) -> bytes:
+    """
+    Build a DEFLATE preset dictionary from sample documents
+
+    Keys and values that recur across documents are scored by how many
+    documents contain them times their length, and the best are packed into
+    the dictionary with the most valuable last, where DEFLATE reaches them
+    with the shortest back-references. Personal details, IDs, timestamps and
+    free text are blanked before counting, and a token must appear in at
+    least ``min_share`` of the documents (and at least two), so nothing
+    specific to one student ends up in the dictionary.
+
+    Args:
+        samples: Encoded documents in any supported format
+        size: Maximum dictionary size (DEFLATE can only reference 32 KiB)
+        min_share: Minimum fraction of documents a token must appear in
+
+    Returns:
+        bytes: Dictionary content
+    """
+    document_counts: Counter = Counter()
+    total = 0
+    for raw in samples:
+        total += 1
+        payload = json.dumps(_redact(decode_document(raw)), separators=(",", ":"), ensure_ascii=False)
+        document_counts.update(set(_TOKEN_PATTERN.findall(payload.encode("utf-8"))))
+
+    min_count = max(2, math.ceil(total * min_share))
+    ranked = sorted(
+        (token for token, count in document_counts.items() if count >= min_count),
+        key=lambda token: (document_counts[token] * len(token), token),
+        reverse=True,
+    )
+
+    chosen = []
+    remaining = min(size, 32 * 1024)
+    for token in ranked:
+        if len(token) <= remaining:
+            chosen.append(token)
+            remaining -= len(token)
+    return b"".join(reversed(chosen))
+
+
+def _redact(value: Any, private: bool = False) -> Any:
+    """Copy of a document with the string values of private and free-text fields blanked"""
+    if isinstance(value, dict):
+        return {
+            key: _redact(item, private or key in _PRIVATE_FIELDS or key in _FREE_TEXT_FIELDS)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item, private) for item in value]
+    if private and isinstance(value, str):
+        return ""
+    return value
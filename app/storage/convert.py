@@ -0,0 +1,148 @@
+"""
+Re-encode stored CV data files in the compact (or plain JSON) format
+
+Usage:
+    python -m app.storage.convert [--to compact|json] [--dry-run]
+    python -m app.storage.convert --drop-rendered-html [--dry-run]
+    python -m app.storage.convert --train-dictionary PATH [--size BYTES] [--min-share FRACTION]
+
+Operates on the storage backend configured through the CV_* environment
+variables, so the same command converts local directories and S3 buckets.
+"""
+import argparse
+
+from app.core.logging import get_logger
+from app.storage.base import DISPLAY_HTML, HTML, StorageBackend
+from app.storage.compact import (
+    CURRENT_VERSION, FORMAT_COMPACT, FORMATS, compact_version, decode_document, encode_document, is_compact,
+    train_dictionary
+)
+
+logger = get_logger(__name__)
+
+
+def convert_data_files(
+    storage: StorageBackend,
+    data_format: str = FORMAT_COMPACT,
+    dry_run: bool = False
+) -> int:
+    """
+    Rewrite every CV data file that is not already in ``data_format``
+
+    Compact files written with an older format version are re-encoded with
+    the current dictionary. Documents are decoded and re-encoded, so the
+    conversion is lossless and can be re-run safely if interrupted.
+    Unreadable files are left alone.
+
+    Args:
+        storage: Backend holding the CVs
+        data_format: Target format (``compact`` or ``json``)
+        dry_run: Only report what would be converted
+
+    Returns:
+        int: Number of data files converted
+    """
+    converted = 0
+    bytes_before = bytes_after = 0
+
+    for cv_id in list(storage.iter_cv_ids()):
+        try:
+            raw = storage.read_data(cv_id)
+            if data_format == FORMAT_COMPACT:
+                current = compact_version(raw) == CURRENT_VERSION
+            else:
+                current = not is_compact(raw)
+            if current:
+                continue
+            content = encode_document(decode_document(raw), data_format)
+        except Exception as e:
+            logger.warning(f"Skipping unreadable CV data file for {cv_id}: {str(e)}")
+            continue
+
+        if not dry_run:
+            storage.write_data(cv_id, content)
+        converted += 1
+        bytes_before += len(raw)
+        bytes_after += len(content)
+
+    logger.info(
+        f"{'Would convert' if dry_run else 'Converted'} {converted} CV data files to {data_format} "
+        f"({bytes_before} -> {bytes_after} bytes)"
+    )
+    return converted
+
+
+def drop_rendered_html(storage: StorageBackend, dry_run: bool = False) -> int:
+    """
+    Delete HTML pages stored by earlier releases
+
+    CV pages are now rendered from the data file on demand, so stored
+    copies are never read again.
+
+    Args:
+        storage: Backend holding the CVs
+        dry_run: Only report what would be deleted
+
+    Returns:
+        int: Number of files deleted
+    """
+    dropped = 0
+    for cv_id in list(storage.iter_cv_ids()):
+        for artifact in (HTML, DISPLAY_HTML):
+            if not storage.exists(cv_id, artifact):
+                continue
+            if not dry_run:
+                storage.delete(cv_id, artifact)
+            dropped += 1
+
+    logger.info(f"{'Would delete' if dry_run else 'Deleted'} {dropped} stored HTML files")
+    return dropped
+
+
+def train_from_storage(storage: StorageBackend, size: int, min_share: float = 0.01) -> bytes:
+    """
+    Train a compact-format dictionary on every CV in a backend
+
+    Args:
+        storage: Backend holding the CVs
+        size: Maximum dictionary size in bytes
+        min_share: Minimum fraction of CVs a dictionary entry must appear in
+
+    Returns:
+        bytes: Dictionary content
+    """
+    def samples():
+        for cv_id in storage.iter_cv_ids():
+            try:
+                yield storage.read_data(cv_id)
+            except FileNotFoundError:
+                continue
+
+    return train_dictionary(samples(), size=size, min_share=min_share)
+
+
+if __name__ == "__main__":
+    from app.core.config import settings
+    from app.core.logging import setup_logging
+    from app.storage.factory import create_storage_backend
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--to", choices=FORMATS, default=FORMAT_COMPACT, help="target format")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be converted")
+    parser.add_argument("--drop-rendered-html", action="store_true", help="delete HTML pages stored by earlier releases")
+    parser.add_argument("--train-dictionary", metavar="PATH", help="write a dictionary trained on the stored CVs")
+    parser.add_argument("--size", type=int, default=16 * 1024, help="maximum dictionary size in bytes")
+    parser.add_argument("--min-share", type=float, default=0.01, help="minimum fraction of CVs per dictionary entry")
+    args = parser.parse_args()
+
+    setup_logging(level="INFO")
+    storage = create_storage_backend(settings)
+    if args.train_dictionary:
+        dictionary = train_from_storage(storage, args.size, args.min_share)
+        with open(args.train_dictionary, "wb") as f:
+            f.write(dictionary)
+        logger.info(f"Wrote {len(dictionary)}-byte dictionary to {args.train_dictionary}")
+    elif args.drop_rendered_html:
+        drop_rendered_html(storage, dry_run=args.dry_run)
+    else:
+        convert_data_files(storage, args.to, dry_run=args.dry_run)
@@ -0,0 +1,55 @@
+"""
+Construction of the configured storage backend
+"""
+from app.core.config import Settings
+from app.core.logging import get_logger
+from app.storage.base import DATA_ARTIFACTS, StorageBackend
+from app.storage.local import FlatStorageBackend, LocalStorageBackend
+from app.storage.migrate import iter_flat_files, migrate_flat_to_sharded
+
+logger = get_logger(__name__)
+
+
+def create_storage_backend(settings: Settings) -> StorageBackend:
+    """
+    Build the storage backend selected by ``settings.storage_backend``
+
+    Args:
+        settings: Application settings
+
+    Returns:
+        StorageBackend: ``local`` (sharded directories; CVs found in the
+        legacy flat layout are moved in first), ``flat`` (legacy single
+        directory) or ``s3`` (object store) backend
+
+    Raises:
+        ValueError: If the backend name is unknown or misconfigured
+    """
+    backend = settings.storage_backend
+    root = settings.generated_dir
+
+    if backend == "local":
+        if any(artifact in DATA_ARTIFACTS for _, artifact, _ in iter_flat_files(root)):
+            # Otherwise CVs saved in the legacy flat layout would silently disappear.
+            # Nothing is deleted here; orphaned artifacts are only removed by the CLI.
+            logger.warning(f"{root} contains CVs in the legacy flat layout; moving them to sharded directories")
+            migrate_flat_to_sharded(str(root))
+        return LocalStorageBackend(root)
+    if backend == "flat":
+        return FlatStorageBackend(root)
+    if backend == "s3":
+        if not settings.s3_bucket:
+            raise ValueError("CV_S3_BUCKET must be set for the s3 storage backend")
+        from app.storage.s3 import S3StorageBackend
+
+        return S3StorageBackend(
+            settings.s3_bucket,
+            prefix=settings.s3_prefix,
+            endpoint_url=settings.s3_endpoint_url,
+            region=settings.s3_region,
+            max_pool_connections=settings.s3_max_pool_connections,
+            multipart_threshold=settings.s3_multipart_threshold,
+            multipart_concurrency=settings.s3_multipart_concurrency,
+        )
+    raise ValueError(f"Unknown storage backend: {backend}")
+
@@ -0,0 +1,138 @@
+"""
+Local filesystem storage backends
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+from app.storage.base import (
+    DATA, DATA_ARTIFACTS, DISPLAY_HTML, HTML, JSON_DATA, PDF, StorageBackend, validate_cv_id
+)
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Stores each CV in its own directory, sharded by UUID prefix:
+    ``<root>/ab/cd/<cv_id>/data.cvz``. Two levels of 256 shards keep every
+    directory small even with millions of CVs.
+    """
+
+    FILENAMES: Dict[str, str] = {
+        DATA: "data.cvz",
+        JSON_DATA: "data.json",
+        HTML: "cv.html",
+        DISPLAY_HTML: "display.html",
+        PDF: "cv.pdf",
+    }
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def cv_dir(self, cv_id: str) -> Path:
+        """Directory holding all artifacts of a CV"""
+        validate_cv_id(cv_id)
+        return self.root / cv_id[0:2] / cv_id[2:4] / cv_id
+
+    def path_for(self, cv_id: str, artifact: str) -> Path:
+        """Filesystem path of an artifact"""
+        return self.cv_dir(cv_id) / self.FILENAMES[artifact]
+
+    def local_path(self, cv_id: str, artifact: str) -> Optional[Path]:
+        return self.path_for(cv_id, artifact)
+
+    def read_bytes(self, cv_id: str, artifact: str) -> bytes:
+        return self.path_for(cv_id, artifact).read_bytes()
+
+    def write_bytes(self, cv_id: str, artifact: str, content: bytes) -> None:
+        path = self.path_for(cv_id, artifact)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file and rename so readers never see partial content
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def exists(self, cv_id: str, artifact: str) -> bool:
+        return self.path_for(cv_id, artifact).is_file()
+
+    def mtime(self, cv_id: str, artifact: str) -> Optional[float]:
+        try:
+            return self.path_for(cv_id, artifact).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def delete(self, cv_id: str, artifact: str) -> None:
+        self.path_for(cv_id, artifact).unlink(missing_ok=True)
+
+    def delete_all(self, cv_id: str) -> None:
+        super().delete_all(cv_id)
+        try:
+            self.cv_dir(cv_id).rmdir()
+        except OSError:
+            pass
+
+    def iter_cv_ids(self) -> Iterator[str]:
+        data_names = [self.FILENAMES[artifact] for artifact in DATA_ARTIFACTS]
+        for level1 in _subdirs(self.root, 2):
+            for level2 in _subdirs(level1, 2):
+                for cv_dir in _subdirs(level2):
+                    if any(os.path.isfile(os.path.join(cv_dir, name)) for name in data_names):
+                        yield os.path.basename(cv_dir)
+
+
+class FlatStorageBackend(LocalStorageBackend):
+    """
+    Legacy layout with every file directly in one directory
+    (``<root>/<cv_id>_data.json``, ``<cv_id>.html``, ...).
+    """
+
+    SUFFIXES: Dict[str, str] = {
+        DATA: "_data.cvz",
+        JSON_DATA: "_data.json",
+        HTML: ".html",
+        DISPLAY_HTML: "_display.html",
+        PDF: ".pdf",
+    }
+
+    def cv_dir(self, cv_id: str) -> Path:
+        validate_cv_id(cv_id)
+        return self.root
+
+    def path_for(self, cv_id: str, artifact: str) -> Path:
+        validate_cv_id(cv_id)
+        return self.root / f"{cv_id}{self.SUFFIXES[artifact]}"
+
+    def delete_all(self, cv_id: str) -> None:
+        StorageBackend.delete_all(self, cv_id)
+
+    def iter_cv_ids(self) -> Iterator[str]:
+        suffixes = [self.SUFFIXES[artifact] for artifact in DATA_ARTIFACTS]
+        seen = set()
+        with os.scandir(self.root) as it:
+            for entry in it:
+                for suffix in suffixes:
+                    if entry.name.endswith(suffix):
+                        cv_id = entry.name[: -len(suffix)]
+                        if cv_id not in seen:
+                            seen.add(cv_id)
+                            yield cv_id
+
+
+def _subdirs(path: Union[str, Path], name_length: Optional[int] = None) -> Iterator[str]:
+    """Child directories of path, optionally only those with names of a given length"""
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if name_length is not None and len(entry.name) != name_length:
+                    continue
+                if entry.is_dir():
+                    yield entry.path
+    except FileNotFoundError:
+        return
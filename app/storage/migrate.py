@@ -0,0 +1,149 @@
+"""
+Move CVs from the legacy flat ``generated/`` layout to sharded directories
+
+Usage:
+    python -m app.storage.migrate [generated_dir] [--apply] [--delete-orphans]
+"""
+import argparse
+import fcntl
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple, Union
+
+from app.core.exceptions import CVNotFoundError
+from app.core.logging import get_logger
+from app.storage.base import DATA_ARTIFACTS, validate_cv_id
+from app.storage.local import FlatStorageBackend, LocalStorageBackend
+
+logger = get_logger(__name__)
+
+# Held by a process while it migrates; not named after a CV, so never migrated itself
+LOCK_FILE = ".migrate.lock"
+
+# Longest first, so "<id>_display.html" is not taken for "<id>_display" + ".html"
+_FLAT_SUFFIXES = sorted(FlatStorageBackend.SUFFIXES.items(), key=lambda item: -len(item[1]))
+
+
+def iter_flat_files(root: Union[str, Path]) -> Iterator[Tuple[str, str, str]]:
+    """
+    CV files of the legacy flat layout directly in root
+
+    Files whose name does not start with a CV ID (e.g. hand-made samples)
+    are not part of the layout and are skipped.
+
+    Args:
+        root: Directory to scan
+
+    Yields:
+        ``(cv_id, artifact, path)`` for each file
+    """
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                for artifact, suffix in _FLAT_SUFFIXES:
+                    if entry.name.endswith(suffix):
+                        cv_id = entry.name[: -len(suffix)]
+                        try:
+                            validate_cv_id(cv_id)
+                        except CVNotFoundError:
+                            break
+                        if entry.is_file():
+                            yield cv_id, artifact, entry.path
+                        break
+    except FileNotFoundError:
+        return
+
+
+@contextmanager
+def _migration_lock(root: Union[str, Path]) -> Iterator[None]:
+    """Exclusive lock on ``<root>/.migrate.lock``, so workers starting together migrate one at a time"""
+    Path(root).mkdir(parents=True, exist_ok=True)
+    with open(os.path.join(root, LOCK_FILE), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _has_data(flat: FlatStorageBackend, sharded: LocalStorageBackend, cv_id: str) -> bool:
+    """Whether a data file for the CV exists in either layout"""
+    return any(
+        backend.path_for(cv_id, artifact).is_file()
+        for backend in (flat, sharded)
+        for artifact in DATA_ARTIFACTS
+    )
+
+
+def migrate_flat_to_sharded(root: str, dry_run: bool = False, delete_orphans: bool = False) -> int:
+    """
+    Move every CV's files from ``<root>/<cv_id>_*`` to ``<root>/ab/cd/<cv_id>/``
+
+    Files are renamed, not copied, so the migration is cheap and can be
+    re-run safely if interrupted. Processes migrating the same directory
+    take turns on a lock file. Artifacts of a CV with no data file in either
+    layout are orphans: they are left in place unless ``delete_orphans``.
+
+    Args:
+        root: Directory holding the flat layout
+        dry_run: Only report what would be moved or deleted
+        delete_orphans: Delete orphaned artifacts instead of leaving them
+
+    Returns:
+        int: Number of CVs migrated
+    """
+    flat = FlatStorageBackend(root)
+    sharded = LocalStorageBackend(root)
+    with _migration_lock(root):
+        cvs: Dict[str, Dict[str, str]] = {}
+        for cv_id, artifact, path in iter_flat_files(root):
+            cvs.setdefault(cv_id, {})[artifact] = path
+
+        migrated = orphaned = deleted = 0
+        for cv_id, files in cvs.items():
+            if not files.keys() & set(DATA_ARTIFACTS):
+                orphaned += len(files)
+                # Checked again right before deleting, in case the data file has just been written
+                if not delete_orphans or _has_data(flat, sharded, cv_id):
+                    continue
+                for path in files.values():
+                    if dry_run:
+                        logger.info(f"Would delete orphaned artifact {path}")
+                        continue
+                    Path(path).unlink(missing_ok=True)
+                    deleted += 1
+                continue
+
+            for artifact, path in files.items():
+                target = sharded.path_for(cv_id, artifact)
+                if dry_run:
+                    logger.info(f"Would move {path} -> {target}")
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.replace(path, target)
+                except FileNotFoundError:
+                    # Moved by a migration that ran before this one took the lock
+                    continue
+            migrated += 1
+
+    verb = "Would migrate" if dry_run else "Migrated"
+    logger.info(f"{verb} {migrated} CVs in {root}; {orphaned} orphaned artifacts found, {deleted} deleted")
+    return migrated
+
+
+if __name__ == "__main__":
+    from app.core.logging import setup_logging
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("generated_dir", nargs="?", default="generated")
+    parser.add_argument("--apply", action="store_true", help="move the files (without it only report what would change)")
+    parser.add_argument(
+        "--delete-orphans", action="store_true",
+        help="also delete artifacts of CVs that have no data file (with --apply)"
+    )
+    args = parser.parse_args()
+
+    setup_logging(level="INFO")
+    migrate_flat_to_sharded(args.generated_dir, dry_run=not args.apply, delete_orphans=args.delete_orphans)
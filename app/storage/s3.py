@@ -0,0 +1,184 @@
+"""
+S3-compatible object store backend (AWS S3, MinIO, moto server)
+"""
+import io
+import threading
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.storage.base import (
+    ARTIFACTS, DATA, DATA_ARTIFACTS, DISPLAY_HTML, HTML, JSON_DATA, PDF, StorageBackend, validate_cv_id
+)
+
+logger = get_logger(__name__)
+
+_CONTENT_TYPES: Dict[str, str] = {
+    DATA: "application/octet-stream",
+    JSON_DATA: "application/json",
+    HTML: "text/html; charset=utf-8",
+    DISPLAY_HTML: "text/html; charset=utf-8",
+    PDF: "application/pdf",
+}
+
+_client_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_s3_client(
+    endpoint_url: Optional[str],
+    region: Optional[str],
+    max_pool_connections: int
+):
+    """
+    Shared S3 client for the process
+
+    boto3 clients are thread-safe and keep a pool of HTTP connections, so a
+    single client per configuration is reused by every request instead of
+    paying TLS setup per call.
+
+    Args:
+        endpoint_url: Custom endpoint (MinIO, moto server), None for AWS
+        region: AWS region name
+        max_pool_connections: Size of the HTTP connection pool
+
+    Returns:
+        botocore client for S3
+    """
+    try:
+        import boto3
+        from botocore.config import Config
+    except ImportError as e:
+        raise RuntimeError("The s3 storage backend requires boto3 (pip install boto3)") from e
+
+    config = Config(
+        max_pool_connections=max_pool_connections,
+        retries={"max_attempts": 5, "mode": "adaptive"},
+        tcp_keepalive=True,
+    )
+    # Session creation is not thread-safe; guard the one-time setup
+    with _client_lock:
+        return boto3.session.Session().client(
+            "s3", endpoint_url=endpoint_url, region_name=region, config=config
+        )
+
+
+class S3StorageBackend(StorageBackend):
+    """
+    Stores each CV under ``<prefix><cv_id>/`` in a bucket.
+
+    Artifacts at or above ``multipart_threshold`` (typically PDFs) are
+    uploaded with parallel multipart transfers. Listing uses paginated
+    ``ListObjectsV2`` calls, 1000 keys per request, and reports each data
+    object's LastModified so the metadata index only fetches changed CVs.
+    """
+
+    shared = True
+
+    FILENAMES: Dict[str, str] = {
+        DATA: "data.cvz",
+        JSON_DATA: "data.json",
+        HTML: "cv.html",
+        DISPLAY_HTML: "display.html",
+        PDF: "cv.pdf",
+    }
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "cvs/",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        max_pool_connections: int = 50,
+        multipart_threshold: int = 8 * 1024 * 1024,
+        multipart_concurrency: int = 8
+    ):
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = get_s3_client(endpoint_url, region, max_pool_connections)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=max(multipart_threshold, 5 * 1024 * 1024),
+            max_concurrency=multipart_concurrency,
+            use_threads=True,
+        )
+        self.multipart_threshold = multipart_threshold
+
+    def key_for(self, cv_id: str, artifact: str) -> str:
+        """Object key of an artifact"""
+        validate_cv_id(cv_id)
+        return f"{self.prefix}{cv_id}/{self.FILENAMES[artifact]}"
+
+    def read_bytes(self, cv_id: str, artifact: str) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key_for(cv_id, artifact))
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(self.key_for(cv_id, artifact))
+        return response["Body"].read()
+
+    def write_bytes(self, cv_id: str, artifact: str, content: bytes) -> None:
+        key = self.key_for(cv_id, artifact)
+        content_type = _CONTENT_TYPES[artifact]
+
+        # S3 object writes are atomic, so no temp-and-rename is needed
+        if len(content) >= self.multipart_threshold:
+            self.client.upload_fileobj(
+                io.BytesIO(content), self.bucket, key,
+                ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config,
+            )
+        else:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=content, ContentType=content_type)
+
+    def exists(self, cv_id: str, artifact: str) -> bool:
+        return self.mtime(cv_id, artifact) is not None
+
+    def mtime(self, cv_id: str, artifact: str) -> Optional[float]:
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=self.key_for(cv_id, artifact))
+        except self.client.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response["LastModified"].timestamp()
+
+    def delete(self, cv_id: str, artifact: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.key_for(cv_id, artifact))
+
+    def delete_all(self, cv_id: str) -> None:
+        # One batched request instead of a DELETE per artifact
+        self.client.delete_objects(
+            Bucket=self.bucket,
+            Delete={
+                "Objects": [{"Key": self.key_for(cv_id, artifact)} for artifact in ARTIFACTS],
+                "Quiet": True,
+            },
+        )
+
+    def iter_cv_ids(self) -> Iterator[str]:
+        for cv_id, _ in self.iter_cv_stamps():
+            yield cv_id
+
+    def iter_cv_stamps(self) -> Iterator[Tuple[str, float]]:
+        data_names = tuple("/" + self.FILENAMES[artifact] for artifact in DATA_ARTIFACTS)
+        paginator = self.client.get_paginator("list_objects_v2")
+        # Keys are listed in order, so both data files of a CV (left over by a
+        # conversion) arrive together; report the CV once, with the newer time
+        pending: Optional[Tuple[str, float]] = None
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if not key.endswith(data_names):
+                    continue
+                cv_id = key[len(self.prefix): key.rindex("/")]
+                mtime = obj["LastModified"].timestamp()
+                if pending is not None and pending[0] == cv_id:
+                    pending = (cv_id, max(pending[1], mtime))
+                    continue
+                if pending is not None:
+                    yield pending
+                pending = (cv_id, mtime)
+        if pending is not None:
+            yield pending
@@ -0,0 +1,141 @@
+"""
+Compare the single-pass dynamic form parser with the previous multi-pass one
+
+Usage:
+    python benchmarks/form_parsing.py [--repeat N] [--hostile-fields N]
+
+Two submissions, both parsed from a starlette FormData as /generate does:
+
+- maxed: the form filled to every CVData limit (5 education entries,
+  3 internships/projects/positions with 5 points each, 10 skills, ...)
+- hostile: N well-formed array fields spread over every section; the
+  multi-pass parser looks each ``[points][]`` key up again with getlist,
+  and the single-pass parser stops at MAX_FORM_FIELDS (its time to reject
+  is reported, as well as its time without the limit)
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from starlette.datastructures import FormData  # noqa: E402
+
+from app.core.exceptions import ValidationError  # noqa: E402
+from app.services.dynamic_forms import parse_dynamic_form_data  # noqa: E402
+
+SECTIONS = (
+    ("education", "education", False),
+    ("achievements", "achievements", False),
+    ("internships", "internships", True),
+    ("projects", "projects", True),
+    ("positions", "positions_of_responsibility", True),
+)
+
+
+def parse_multipass(form_data: FormData):
+    """The previous parser: one scan to detect the layout, then one per section"""
+    if not any(key.startswith(tuple(f"{prefix}[" for prefix, _, _ in SECTIONS)) for key in form_data.keys()):
+        return None
+    structured_data = {"personal_info": {
+        field: form_data.get(field, "") for field in ("full_name", "highest_education", "city", "phone", "email")
+    }}
+    for prefix, name, has_points in SECTIONS:
+        section = {}
+        for key in form_data.keys():
+            if key.startswith(f"{prefix}["):
+                parts = key.split('][')
+                index = int(parts[0].split('[')[1])
+                if index not in section:
+                    section[index] = {"points": []} if has_points else {}
+                if has_points and key.endswith("[points][]"):
+                    section[index]["points"].extend(form_data.getlist(key))
+                else:
+                    section[index][parts[1].rstrip(']')] = form_data[key]
+        structured_data[name] = [section[i] for i in sorted(section)]
+    for name in ("extracurricular", "technical_skills"):
+        structured_data[name] = [value for value in form_data.getlist(f"{name}[]") if value.strip()]
+    return structured_data
+
+
+def maxed_form() -> FormData:
+    fields = [
+        ("full_name", "A Student"), ("highest_education", "B.Tech"), ("city", "Pune"),
+        ("phone", "9999999999"), ("email", "student@example.com"),
+    ]
+    for i in range(5):
+        fields += [(f"education[{i}][{field}]", "x" * 40) for field in ("qualification", "stream", "institute", "year", "cgpa")]
+        fields += [(f"achievements[{i}][description]", "x" * 200), (f"achievements[{i}][year]", "2024")]
+    for prefix, fields_of_entry in (
+        ("internships", ("company", "role", "duration")),
+        ("projects", ("title", "type", "duration")),
+        ("positions", ("club", "role", "duration")),
+    ):
+        for i in range(3):
+            fields += [(f"{prefix}[{i}][{field}]", "x" * 40) for field in fields_of_entry]
+            fields += [(f"{prefix}[{i}][points][]", "x" * 150) for _ in range(5)]
+    fields += [("extracurricular[]", "x" * 40) for _ in range(5)]
+    fields += [("technical_skills[]", "x" * 20) for _ in range(10)]
+    return FormData(fields)
+
+
+def hostile_form(count: int) -> FormData:
+    fields = []
+    for n in range(count):
+        prefix, _, has_points = SECTIONS[n % len(SECTIONS)]
+        index = (n // len(SECTIONS)) % 100
+        field = "[points][]" if has_points else f"[f{n % 7}]"
+        fields.append((f"{prefix}[{index}]{field}", "x"))
+    return FormData(fields)
+
+
+def per_call_us(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def rejected(form_data: FormData) -> None:
+    try:
+        parse_dynamic_form_data(form_data.multi_items())
+    except ValidationError:
+        return
+    raise AssertionError("hostile form was accepted")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--hostile-fields", type=int, default=5000)
+    args = parser.parse_args()
+
+    maxed = maxed_form()
+    hostile = hostile_form(args.hostile_fields)
+    assert parse_multipass(maxed) == parse_dynamic_form_data(maxed.multi_items()), "parsers disagree"
+    unlimited = float("inf")
+
+    rows = [
+        (f"maxed ({len(maxed.multi_items())} fields)", [
+            ("multi-pass", lambda: parse_multipass(maxed)),
+            ("single-pass", lambda: parse_dynamic_form_data(maxed.multi_items())),
+        ]),
+        (f"hostile ({args.hostile_fields} fields)", [
+            ("multi-pass", lambda: parse_multipass(hostile)),
+            ("single-pass, no limit", lambda: parse_dynamic_form_data(hostile.multi_items(), max_fields=unlimited)),
+            ("single-pass, rejected", lambda: rejected(hostile)),
+        ]),
+    ]
+    print(f"median of {args.repeat} parses")
+    for title, runs in rows:
+        print(title)
+        for label, run in runs:
+            print(f"  {label:<24}{per_call_us(args.repeat, run):>12.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Load test POST /generate: requests per second and event-loop stalls
+
+Usage:
+    python benchmarks/generate_load.py [--requests N] [--concurrency C] [--url URL]
+
+Submits the test CV (test_data_structured.json, as the dynamic form sends
+it) N times with C requests in flight and reports throughput, latency and
+the longest time the event loop could not run other tasks.
+
+Without --url the app runs in this process against a scratch data
+directory, once per mode:
+
+- inline: form parsing, validation and the storage/index writes all run on
+  the event loop, as the handler used to do
+- threadpool: the storage and index writes on a worker thread (the current
+  handler)
+
+--storage-latency adds a delay to every data file write, to stand in for
+a network store (S3) or a slow disk.
+
+With --url the requests go to a running server instead (e.g. uvicorn on
+the commit before and after a change); stalls are then not measured.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def form_fields(data: dict) -> list:
+    """Flatten structured CV data into the (name, value) pairs the CV form posts"""
+    fields = list(data["personal_info"].items())
+    for section, prefix in (
+        ("education", "education"),
+        ("achievements", "achievements"),
+        ("internships", "internships"),
+        ("projects", "projects"),
+        ("positions_of_responsibility", "positions"),
+    ):
+        for index, entry in enumerate(data[section]):
+            for field, value in entry.items():
+                if field == "points":
+                    fields.extend((f"{prefix}[{index}][points][]", point) for point in value)
+                else:
+                    fields.append((f"{prefix}[{index}][{field}]", str(value)))
+    fields.extend(("extracurricular[]", value) for value in data["extracurricular"])
+    fields.extend(("technical_skills[]", value) for value in data["technical_skills"])
+    return fields
+
+
+async def watch_loop(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Longest delay past ``interval`` before the loop got back to this task"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_load(client: httpx.AsyncClient, body: bytes, requests: int, concurrency: int) -> dict:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {"content-type": "application/x-www-form-urlencoded"}
+
+    async def submit() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/generate", content=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 302:
+                raise RuntimeError(f"POST /generate returned {response.status_code}: {response.text[:200]}")
+
+    stop = asyncio.Event()
+    watcher = asyncio.create_task(watch_loop(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(submit() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    stall = await watcher
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "stall": stall,
+    }
+
+
+def report(label: str, result: dict, show_stall: bool = True) -> None:
+    line = (
+        f"{label:<12}{result['rps']:>9.1f} req/s   p50 {result['p50'] * 1e3:>7.1f} ms"
+        f"   p95 {result['p95'] * 1e3:>7.1f} ms"
+    )
+    if show_stall:
+        line += f"   max loop stall {result['stall'] * 1e3:>7.1f} ms"
+    print(line)
+
+
+async def run_in_process(body: bytes, requests: int, concurrency: int, storage_latency: float) -> None:
+    scratch = tempfile.mkdtemp(prefix="cv-generate-load-")
+    os.environ["CV_GENERATED_DIR"] = scratch
+    os.environ.setdefault("CV_TEMPLATES_DIR", str(REPO_ROOT / "templates"))
+    os.environ["CV_TEMPLATE_CACHE_DIR"] = ""
+    os.environ["CV_PDF_PRERENDER"] = "false"
+    # main logs to ./app.log; keep that in the scratch directory
+    os.chdir(scratch)
+    sys.path.insert(0, str(REPO_ROOT))
+    import logging
+
+    app_module = importlib.import_module("main")
+    logging.disable(logging.INFO)
+
+    async def inline(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    if storage_latency:
+        storage = app_module.get_cv_service().storage
+        write_bytes = storage.write_bytes
+
+        def slow_write_bytes(*args, **kwargs):
+            time.sleep(storage_latency)
+            write_bytes(*args, **kwargs)
+
+        storage.write_bytes = slow_write_bytes
+
+    threadpool = app_module.run_in_threadpool
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Build the services and open the index before timing
+        app_module.run_in_threadpool = inline
+        await run_load(client, body, 5, 1)
+
+        for label, runner in (("inline", inline), ("threadpool", threadpool)):
+            app_module.run_in_threadpool = runner
+            report(label, await run_load(client, body, requests, concurrency))
+    app_module.run_in_threadpool = threadpool
+    print(f"scratch data in {scratch}")
+
+
+async def run_remote(url: str, body: bytes, requests: int, concurrency: int) -> None:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        await run_load(client, body, 5, 1)
+        report("server", await run_load(client, body, requests, concurrency), show_stall=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--storage-latency", type=float, default=0.0, help="ms added per data write (in-process)")
+    args = parser.parse_args()
+
+    data = json.loads((REPO_ROOT / "test_data_structured.json").read_text())
+    body = urlencode(form_fields(data)).encode("ascii")
+
+    print(f"{args.requests} requests, {args.concurrency} in flight")
+    if args.url:
+        asyncio.run(run_remote(args.url, body, args.requests, args.concurrency))
+    else:
+        asyncio.run(run_in_process(body, args.requests, args.concurrency, args.storage_latency / 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compare the JSON codec paths with the generic dict-based ones they replace
+
+Usage:
+    python benchmarks/json_codec.py [--repeat N] [--rows N]
+
+For the test CV (test_data_structured.json) as a stored document:
+
+- load: stored bytes to CVDocument, via ``json.loads`` + ``CVDocument(**...)``
+  vs ``validate_json`` straight from the bytes
+- save: CVDocument to stored bytes, via ``.model_dump()`` + ``json.dumps``
+  vs ``dump_json``
+- API: a handler's return value to response body, via FastAPI's
+  ``jsonable_encoder`` + JSONResponse vs JSONBytesResponse, for the CV
+  document and for a CV list page of N index rows
+
+Storage timings are given for both data formats (compact includes the
+DEFLATE step, which is the same on both sides).
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core import codec  # noqa: E402
+from app.core.codec import JSONBytesResponse, dump_json, validate_json  # noqa: E402
+from app.models.cv_data import CVData, CVDocument, CVMetadata  # noqa: E402
+from app.storage.compact import (  # noqa: E402
+    FORMAT_COMPACT, FORMAT_JSON, decode_json, encode_document, encode_json
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def per_call_us(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=100, help="index rows in the list page")
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    document = CVDocument(
+        metadata=CVMetadata(cv_id=str(uuid.uuid4()), created_at=now, last_modified=now),
+        data=CVData(**json.loads((REPO_ROOT / "test_data_structured.json").read_text())),
+    )
+    rows = [
+        {
+            "cv_id": str(uuid.uuid4()), "name": f"Student {i}", "created_at": str(now),
+            "last_modified": str(now), "version": "2.0", "status": "ok",
+        }
+        for i in range(args.rows)
+    ]
+
+    cases = []
+    for data_format in (FORMAT_JSON, FORMAT_COMPACT):
+        indent = 2 if data_format == FORMAT_JSON else None
+        stored = encode_json(dump_json(CVDocument, document, indent=indent), data_format)
+        cases += [
+            (f"load ({data_format})", [
+                ("dict", lambda stored=stored: CVDocument(**json.loads(decode_json(stored)))),
+                ("codec", lambda stored=stored: validate_json(CVDocument, decode_json(stored))),
+            ]),
+            (f"save ({data_format})", [
+                ("dict", lambda data_format=data_format: encode_document(document.model_dump(), data_format)),
+                ("codec", lambda data_format=data_format, indent=indent: encode_json(
+                    dump_json(CVDocument, document, indent=indent), data_format
+                )),
+            ]),
+        ]
+    cases += [
+        ("API: CV document", [
+            ("dict", lambda: JSONResponse(jsonable_encoder(document.model_dump())).body),
+            ("codec", lambda: JSONBytesResponse(dump_json(CVDocument, document)).body),
+        ]),
+        (f"API: list of {args.rows} CVs", [
+            ("dict", lambda: JSONResponse(jsonable_encoder({"cvs": rows, "total": len(rows)})).body),
+            ("codec", lambda: JSONBytesResponse({"cvs": rows, "total": len(rows)}).body),
+        ]),
+    ]
+
+    backend = "orjson" if codec.orjson is not None else "pydantic-core"
+    print(f"median of {args.repeat} calls; plain values serialized by {backend}")
+    for title, runs in cases:
+        (_, before), (_, after) = runs
+        before_us = per_call_us(args.repeat, before)
+        after_us = per_call_us(args.repeat, after)
+        print(f"{title:<24}dict {before_us:>9.1f} us   codec {after_us:>9.1f} us   {before_us / after_us:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
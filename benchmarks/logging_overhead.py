@@ -0,0 +1,135 @@
+"""
+Per-request logging overhead: synchronous handlers vs the queue listener
+
+Usage:
+    python benchmarks/logging_overhead.py [--requests N] [--records N] [--disk-latency MS]
+
+A request logs ``--records`` INFO lines (like a PDF download: cache lookup,
+serve, generate) and one DEBUG line that the level filters out. Compares:
+
+- sync: the old setup, stdout and ``app.log`` handlers on the root logger
+  that format and write on the calling thread
+- queue text / queue json: ``setup_logging``, where the calling thread only
+  queues the record and the listener thread formats, writes and rotates
+
+For each it reports the median time a request spends in logging calls and
+the wall time until every line is on disk. ``--disk-latency`` adds a sleep
+to every file write to model a slow or network-mounted disk. Output goes to
+a scratch directory; nothing is written to the working tree.
+"""
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core import logging as app_logging  # noqa: E402
+
+logger = logging.getLogger("app.services.pdf_service")
+
+
+def use_sync_handlers(stdout, log_file: Path) -> None:
+    """The configuration setup_logging used to install via basicConfig"""
+    app_logging.stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    formatter = logging.Formatter(app_logging.DEFAULT_FORMAT)
+    for handler in (logging.StreamHandler(stdout), logging.FileHandler(log_file)):
+        handler.setFormatter(formatter)
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def use_queue_listener(stdout, log_file: Path, json_format: bool) -> None:
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    # The listener's stdout handler binds sys.stdout when it is created
+    real_stdout, sys.stdout = sys.stdout, stdout
+    try:
+        app_logging.setup_logging(level="INFO", json_format=json_format, log_file=str(log_file))
+    finally:
+        sys.stdout = real_stdout
+
+
+def flush() -> None:
+    """Block until every record is written"""
+    if app_logging._listener is not None:
+        app_logging.stop_logging()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
+def run_requests(count: int, records: int) -> list:
+    """Log ``count`` requests; time spent in logging calls per request (us)"""
+    timings = []
+    for _ in range(count):
+        cv_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        for _ in range(records):
+            logger.info("PDF cache hit for CV: %s", cv_id)
+        logger.debug("Raw form_data keys: %s", cv_id)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--records", type=int, default=3, help="INFO lines logged per request")
+    parser.add_argument("--disk-latency", type=float, default=0.0, help="ms added to every log file write")
+    args = parser.parse_args()
+
+    if args.disk_latency:
+        file_emit = logging.FileHandler.emit
+
+        def slow_emit(self, record):
+            time.sleep(args.disk_latency / 1000)
+            file_emit(self, record)
+
+        logging.FileHandler.emit = slow_emit
+
+    modes = [
+        ("sync", lambda out, path: use_sync_handlers(out, path)),
+        ("queue text", lambda out, path: use_queue_listener(out, path, json_format=False)),
+        ("queue json", lambda out, path: use_queue_listener(out, path, json_format=True)),
+    ]
+
+    print(
+        f"{args.requests} requests x {args.records} INFO lines + 1 filtered DEBUG line"
+        f"{f', {args.disk_latency:g} ms per file write' if args.disk_latency else ''}"
+    )
+    with tempfile.TemporaryDirectory() as scratch:
+        for name, configure in modes:
+            log_file = Path(scratch) / f"{name.replace(' ', '_')}.log"
+            with open(Path(scratch) / "stdout.log", "w") as stdout:
+                configure(stdout, log_file)
+                start = time.perf_counter()
+                timings = run_requests(args.requests, args.records)
+                logged = time.perf_counter() - start
+                flush()
+                drained = time.perf_counter() - start
+
+            lines = sum(1 for _ in open(log_file))
+            print(
+                f"{name:<12}median {statistics.median(timings) * 1e6:>8.1f} us/request   "
+                f"p99 {statistics.quantiles(timings, n=100)[98] * 1e6:>9.1f} us   "
+                f"logged in {logged:>6.2f}s, on disk after {drained:>6.2f}s ({lines} lines)"
+            )
+
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
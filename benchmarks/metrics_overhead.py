@@ -0,0 +1,183 @@
+"""
+Cost of the /metrics instrumentation on the request hot paths
+
+Usage:
+    python benchmarks/metrics_overhead.py [--repeat N] [--workers N]
+
+Reports:
+
+- the cost of one counter increment, histogram observation and timed block
+- requests through the app (in process, no client or socket) with the
+  metrics recording and with them replaced by no-ops, and the share of the
+  request spent on metrics (from the per-operation cost, since the
+  difference is within run-to-run noise):
+    - cached page: GET /cv/{cv_id}/html served from the memory LRU
+    - create: POST /api/v1/cvs
+    - list: GET /api/v1/cvs?limit=20
+- rendering /metrics with snapshot files from N other workers
+
+Runs against a scratch CV store; nothing is written to the working tree.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+SCRATCH = tempfile.TemporaryDirectory()
+os.environ.update({
+    "CV_GENERATED_DIR": SCRATCH.name,
+    "CV_STORAGE_BACKEND": "local",
+    "CV_TEMPLATES_DIR": str(REPO_ROOT / "templates"),
+    "CV_TEMPLATE_CACHE_DIR": "",
+    "CV_LOG_FILE": "",
+    "CV_LOG_LEVEL": "WARNING",
+    "CV_METRICS_DIR": "",
+})
+
+from app.core import metrics  # noqa: E402
+from app.core.codec import validate_json  # noqa: E402
+from app.dependencies import get_cv_service  # noqa: E402
+from app.models.cv_data import CVData  # noqa: E402
+from main import app  # noqa: E402
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+def per_op_us(run, number: int = 100_000) -> float:
+    """Best-of-5 cost of a tiny operation, net of the loop and call overhead"""
+    def loop(fn):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+
+    baseline = min(loop(lambda: None) for _ in range(5))
+    return (min(loop(run) for _ in range(5)) - baseline) / number * 1e6
+
+
+def per_call_us(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+async def asgi_request(method: str, path: str, body: bytes = b"", query: str = "") -> int:
+    """One request through the app (routing, middleware, threadpool hops), without a client or socket"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "scheme": "http",
+        "method": method, "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = []
+
+    async def receive():
+        return messages.pop() if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def request_us(repeat: int, *request) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await asgi_request(*request)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+@contextlib.contextmanager
+def metrics_disabled():
+    """Swap the recording methods for no-ops"""
+    saved = metrics._CounterChild.inc, metrics._HistogramChild.observe, metrics._HistogramChild.time
+    metrics._CounterChild.inc = lambda self, amount=1.0: None
+    metrics._HistogramChild.observe = lambda self, value: None
+    metrics._HistogramChild.time = lambda self: _NULL_TIMER
+    try:
+        yield
+    finally:
+        metrics._CounterChild.inc, metrics._HistogramChild.observe, metrics._HistogramChild.time = saved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=8, help="other workers' snapshots merged by /metrics")
+    args = parser.parse_args()
+
+    counter = metrics.Counter("bench_total", "benchmark", ("kind",)).labels("pdf")
+    histogram = metrics.Histogram("bench_seconds", "benchmark", ("stage",)).labels("bench")
+
+    def timed_block():
+        with histogram.time():
+            pass
+
+    op_us = {
+        "inc": per_op_us(counter.inc),
+        "observe": per_op_us(lambda: histogram.observe(0.002)),
+        "time": per_op_us(timed_block),
+    }
+    print(
+        f"Counter.inc {op_us['inc']:.2f} us   Histogram.observe {op_us['observe']:.2f} us   "
+        f"timed block {op_us['time']:.2f} us   (best of 5 x 100k calls)"
+    )
+    print(f"request paths: median of {args.repeat} calls")
+
+    body = (REPO_ROOT / "test_data_structured.json").read_bytes()
+    cv_data = validate_json(CVData, body)
+    cv_ids = [get_cv_service().generate_cv(cv_data) for _ in range(50)]
+    cached_page = f"/cv/{cv_ids[0]}/html"
+    asyncio.run(asgi_request("GET", cached_page))
+
+    paths = [
+        # (name, request, metric operations per request: timed blocks, counter increments)
+        ("cached page", ("GET", cached_page), 1, 1),
+        ("create", ("POST", "/api/v1/cvs", body), 2, 0),
+        ("list", ("GET", "/api/v1/cvs", b"", "limit=20"), 1, 0),
+    ]
+    for name, request, blocks, increments in paths:
+        # Alternate so drift (page cache, store growth) hits both sides equally
+        on, off = [], []
+        for _ in range(5):
+            on.append(asyncio.run(request_us(args.repeat // 10, *request)))
+            with metrics_disabled():
+                off.append(asyncio.run(request_us(args.repeat // 10, *request)))
+        on_us, off_us = statistics.median(on), statistics.median(off)
+        share = (blocks * op_us["time"] + increments * op_us["inc"]) / off_us
+        print(
+            f"{name:<12}metrics on {on_us:>8.1f} us   off {off_us:>8.1f} us   "
+            f"metrics share {share:>6.2%}"
+        )
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        # Stand-in snapshots of other workers, under made-up pids counted as live
+        metrics._pid_alive = lambda pid: True
+        metrics.write_snapshot(snapshot_dir)
+        own_file = Path(snapshot_dir) / f"metrics-{os.getpid()}.json"
+        for pid in range(1, args.workers + 1):
+            (Path(snapshot_dir) / f"metrics-{pid}.json").write_bytes(own_file.read_bytes())
+        own_file.unlink()
+        render_us = per_call_us(max(args.repeat // 30, 10), lambda: metrics.render_text(snapshot_dir))
+        size = len(metrics.render_text(snapshot_dir))
+        print(f"/metrics with {args.workers} other workers rendered in {render_us / 1000:.2f} ms, {size} bytes")
+
+
+if __name__ == "__main__":
+    main()
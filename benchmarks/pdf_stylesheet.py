@@ -0,0 +1,98 @@
+"""
+Measure the per-render time saved by reusing the parsed PDF stylesheet and fonts
+
+Usage:
+    python benchmarks/pdf_stylesheet.py [--renders N] [--templates DIR]
+
+Renders the test CV N times each way, in this process, alternating the two
+so that drift over the run (allocator growth, CPU frequency) does not favour
+whichever side runs first:
+
+- inline: the stylesheet pasted into a ``<style>`` block and a fresh
+  WeasyPrint setup per render, as every request used to do
+- shared: the document body only, with the ``weasyprint.CSS`` object and
+  ``FontConfiguration`` each worker now keeps (``render_pdf_bytes``)
+
+Also reports the cost of parsing the stylesheet on its own.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.templates import create_templates  # noqa: E402
+from app.models.cv_data import CVData  # noqa: E402
+from app.services.pdf_service import (  # noqa: E402
+    PDF_STYLESHEET, PDF_TEMPLATE, _pin_pdf_metadata, load_stylesheets, render_pdf_bytes
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def render_inline(html_content: str) -> bytes:
+    import weasyprint
+
+    return weasyprint.HTML(string=html_content).write_pdf(finisher=_pin_pdf_metadata, pdf_identifier=False)
+
+
+def per_call_ms(renders: int, run) -> float:
+    timings = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e3
+
+
+def alternating_ms(renders: int, first, second) -> tuple:
+    """Median ms per call of two functions timed in alternating order"""
+    timings = ([], [])
+    for index in range(renders):
+        order = (0, 1) if index % 2 == 0 else (1, 0)
+        for side in order:
+            start = time.perf_counter()
+            (first, second)[side]()
+            timings[side].append(time.perf_counter() - start)
+    return statistics.median(timings[0]) * 1e3, statistics.median(timings[1]) * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--templates", default=str(REPO_ROOT / "templates"))
+    args = parser.parse_args()
+
+    import weasyprint
+
+    env = create_templates(args.templates).env
+    cv_data = CVData(**json.loads((REPO_ROOT / "test_data_structured.json").read_text()))
+    body_html = env.get_template(PDF_TEMPLATE).render(**cv_data.model_dump())
+    stylesheet = env.loader.get_source(env, PDF_STYLESHEET)[1]
+    css = Path(stylesheet).read_text()
+    inline_html = body_html.replace("</head>", f"<style>\n{css}\n</style>\n</head>", 1)
+
+    # Import WeasyPrint and build the shared objects before timing either side
+    render_pdf_bytes(body_html, stylesheet)
+    render_inline(inline_html)
+
+    parse_ms = per_call_ms(args.renders, lambda: weasyprint.CSS(string=css))
+    inline_ms, shared_ms = alternating_ms(
+        args.renders,
+        lambda: render_inline(inline_html),
+        lambda: render_pdf_bytes(body_html, stylesheet),
+    )
+    assert load_stylesheets(stylesheet), "stylesheet was not loaded"
+
+    print(f"median of {args.renders} renders")
+    print(f"{'stylesheet parse only':<24}{parse_ms:>10.2f} ms")
+    print(f"{'inline <style>':<24}{inline_ms:>10.2f} ms / render")
+    print(f"{'shared CSS + fonts':<24}{shared_ms:>10.2f} ms / render")
+    print(f"{'saved':<24}{inline_ms - shared_ms:>10.2f} ms / render ({1 - shared_ms / inline_ms:.0%})")
+
+
+if __name__ == "__main__":
+    main()
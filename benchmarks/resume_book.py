@@ -0,0 +1,92 @@
+"""
+Compare a resume book (one WeasyPrint pass) with one render per CV
+
+Usage:
+    python benchmarks/resume_book.py [--count N] [--repeat R] [--templates DIR]
+
+Both sides lay out the same synthetic CVs (variations of
+test_data_structured.json) in this process, without the worker pool:
+
+- single: one render of cv_template_pdf.html per CV, as building the book
+  from N separate PDFs would need (concatenation not included)
+- book: one render of resume_book.html holding every CV, written to disk
+
+Reports the best wall time of R rounds, the time per CV and the output size.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.templates import create_templates  # noqa: E402
+from app.models.cv_data import CVData  # noqa: E402
+from app.services.book_service import BOOK_TEMPLATE  # noqa: E402
+from app.services.pdf_service import PDF_TEMPLATE, render_pdf_bytes, render_pdf_file  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def synthetic_cvs(count: int) -> list:
+    base = json.loads((REPO_ROOT / "test_data_structured.json").read_text())
+    cvs = []
+    for i in range(count):
+        data = copy.deepcopy(base)
+        data["personal_info"]["full_name"] = f"Student {i:04d}"
+        data["technical_skills"] = data["technical_skills"][i % 3:] or data["technical_skills"]
+        cvs.append((f"{i:08d}-0000-4000-8000-000000000000", CVData(**data)))
+    return cvs
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=50, help="CVs per book")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--templates", default=str(REPO_ROOT / "templates"))
+    args = parser.parse_args()
+
+    env = create_templates(args.templates).env
+    cvs = synthetic_cvs(args.count)
+    single_html = [env.get_template(PDF_TEMPLATE).render(**cv_data.model_dump()) for _, cv_data in cvs]
+    book_html = env.get_template(BOOK_TEMPLATE).render(
+        title="Benchmark Resume Book",
+        entries=[{"cv_id": cv_id, "cv": cv_data.model_dump()} for cv_id, cv_data in cvs],
+    )
+
+    # Pay the WeasyPrint import and first font lookup before timing either side
+    render_pdf_bytes(single_html[0])
+
+    single_sizes = []
+
+    def render_singles() -> None:
+        single_sizes[:] = [len(render_pdf_bytes(html)) for html in single_html]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        book_path = os.path.join(out_dir, "book.pdf")
+        single_s = best_of(args.repeat, render_singles)
+        book_s = best_of(args.repeat, lambda: render_pdf_file(book_html, book_path))
+        book_size = os.path.getsize(book_path)
+
+    print(f"{args.count} CVs, best of {args.repeat}")
+    print(f"{'mode':<8}{'total s':>10}{'ms / CV':>10}{'output KB':>12}")
+    print(f"{'single':<8}{single_s:>10.2f}{single_s / args.count * 1e3:>10.1f}{sum(single_sizes) / 1024:>12.1f}")
+    print(f"{'book':<8}{book_s:>10.2f}{book_s / args.count * 1e3:>10.1f}{book_size / 1024:>12.1f}")
+    print(f"book speedup: {single_s / book_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Cold-start benchmark: import cost of ``main`` and time to the first /health
+
+Usage:
+    python benchmarks/startup.py [--runs N] [--top N] [--no-budget]
+
+Each run starts a fresh interpreter in a scratch directory, so nothing is
+written to the working tree. Reports the best of N runs for:
+
+- ``import main`` under ``-X importtime``, with the slowest modules it pulls in
+- wall time from launching uvicorn until ``GET /health`` returns 200
+
+and exits non-zero if either exceeds the budget in ``startup_budget.json``.
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BUDGET_FILE = Path(__file__).resolve().parent / "startup_budget.json"
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def measure_import(cwd: str) -> tuple:
+    """Cumulative import time of main (ms) and the modules it imported first-hand"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=cwd, env=_env(), capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            entries.append((int(match.group(2)) / 1000, len(match.group(3)), match.group(4)))
+
+    # importtime lists a module after everything it imported, indented two spaces deeper
+    main_index = next(i for i, entry in enumerate(entries) if entry[2] == "main")
+    main_ms, main_depth, _ = entries[main_index]
+    children = []
+    for ms, depth, name in reversed(entries[:main_index]):
+        if depth <= main_depth:
+            break
+        if depth == main_depth + 2 or name.startswith("app."):
+            children.append((ms, name))
+    return main_ms, children
+
+
+def measure_first_health(cwd: str, timeout: float = 60.0) -> float:
+    """Milliseconds from launching uvicorn until /health answers"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("server did not answer /health in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--no-budget", action="store_true", help="report only, never fail")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cwd:
+        imports = [measure_import(cwd) for _ in range(args.runs)]
+        import_ms, children = min(imports, key=lambda run: run[0])
+        health_ms = min(measure_first_health(cwd) for _ in range(args.runs))
+
+    print(f"import main: {import_ms:.1f} ms (best of {args.runs})")
+    print(f"{'cumulative ms':>14}  module (imported by main, plus any app.* module)")
+    for ms, name in sorted(children, reverse=True)[:args.top]:
+        print(f"{ms:>14.1f}  {name}")
+    print(f"first /health: {health_ms:.1f} ms (best of {args.runs})")
+
+    if args.no_budget:
+        return
+    budget = json.loads(BUDGET_FILE.read_text())
+    failures = [
+        f"{label} {value:.1f} ms > budget {budget[key]} ms"
+        for key, label, value in (
+            ("import_main_ms", "import main", import_ms),
+            ("first_health_ms", "first /health", health_ms),
+        )
+        if value > budget[key]
+    ]
+    if failures:
+        sys.exit("Startup budget exceeded: " + "; ".join(failures))
+    print(f"Within budget ({BUDGET_FILE.name})")
+
+
+if __name__ == "__main__":
+    main()
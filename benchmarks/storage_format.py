@@ -0,0 +1,87 @@
+"""
+Compare stored size and load time of CV data files per encoding
+
+Usage:
+    python benchmarks/storage_format.py [generated_dir] [--repeat N]
+
+Every CV found in generated_dir (flat or sharded layout) is written to a
+scratch directory once per format, then read back through the storage
+backend, decoded and validated into a CVDocument, as ``get_cv_data`` does.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.models.cv_data import CVDocument  # noqa: E402
+from app.storage.compact import FORMAT_COMPACT, FORMAT_JSON, decode_document, encode_document  # noqa: E402
+from app.storage.local import FlatStorageBackend, LocalStorageBackend  # noqa: E402
+
+
+def load_documents(root: str) -> list:
+    documents = []
+    for backend in (FlatStorageBackend(root), LocalStorageBackend(root)):
+        for cv_id in backend.iter_cv_ids():
+            try:
+                document = decode_document(backend.read_data(cv_id))
+                CVDocument(**document)
+            except Exception:
+                continue
+            documents.append(document)
+    return documents
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("generated_dir", nargs="?", default="generated")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    documents = load_documents(args.generated_dir)
+    if not documents:
+        sys.exit(f"No valid CV data files in {args.generated_dir}")
+    count = len(documents)
+
+    minified = [json.dumps(d, separators=(",", ":"), ensure_ascii=False).encode() for d in documents]
+    print(f"{count} documents")
+    print(f"{'encoding':<28}{'bytes/doc':>10}")
+    print(f"{'minified json':<28}{sum(map(len, minified)) / count:>10.0f}")
+    print(f"{'minified json + zlib':<28}{sum(len(zlib.compress(m, 9)) for m in minified) / count:>10.0f}")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        for data_format in (FORMAT_JSON, FORMAT_COMPACT):
+            storage = LocalStorageBackend(os.path.join(scratch, data_format))
+            stored = 0
+            for document in documents:
+                content = encode_document(document, data_format)
+                storage.write_data(document["metadata"]["cv_id"], content, replace=False)
+                stored += len(content)
+
+            cv_ids = [document["metadata"]["cv_id"] for document in documents]
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for cv_id in cv_ids:
+                    CVDocument(**decode_document(storage.read_data(cv_id)))
+            per_load = (time.perf_counter() - start) / (args.repeat * count)
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for cv_id in cv_ids:
+                    decode_document(storage.read_data(cv_id))
+            per_decode = (time.perf_counter() - start) / (args.repeat * count)
+
+            label = "indented json (legacy)" if data_format == FORMAT_JSON else "compact (zlib + dictionary)"
+            print(
+                f"{label:<28}{stored / count:>10.0f}"
+                f"   read+decode {per_decode * 1e6:6.1f} us   read+decode+validate {per_load * 1e6:6.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
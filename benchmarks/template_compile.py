@@ -0,0 +1,54 @@
+"""
+Measure first-use template load time with and without the bytecode cache
+
+Usage:
+    python benchmarks/template_compile.py [templates_dir] [--repeat N]
+
+Every round builds a fresh environment, as a new process would, and times
+the first ``get_template`` of each template: parsing and compiling the
+source when cold, loading marshalled bytecode when the cache is built.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.templates import create_templates, precompile_templates  # noqa: E402
+
+
+def first_load_times(templates_dir: str, cache_dir, names, repeat: int) -> dict:
+    totals = dict.fromkeys(names, 0.0)
+    for _ in range(repeat):
+        env = create_templates(templates_dir, cache_dir).env
+        for name in names:
+            start = time.perf_counter()
+            env.get_template(name)
+            totals[name] += time.perf_counter() - start
+    return {name: total / repeat for name, total in totals.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("templates_dir", nargs="?", default="templates")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    names = create_templates(args.templates_dir).env.list_templates(extensions=["html"])
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        precompile_templates(create_templates(args.templates_dir, cache_dir).env)
+        cold = first_load_times(args.templates_dir, None, names, args.repeat)
+        warm = first_load_times(args.templates_dir, cache_dir, names, args.repeat)
+
+    print(f"{'template':<28}{'compile ms':>12}{'cached ms':>12}{'saved':>8}")
+    for name in names:
+        print(f"{name:<28}{cold[name] * 1e3:>12.2f}{warm[name] * 1e3:>12.2f}{1 - warm[name] / cold[name]:>8.0%}")
+    total_cold, total_warm = sum(cold.values()), sum(warm.values())
+    print(f"{'total':<28}{total_cold * 1e3:>12.2f}{total_warm * 1e3:>12.2f}{1 - total_warm / total_cold:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,92 +2,122 @@
 CV Generator Application - Refactored Version 2.0
 Clean architecture with Pydantic models and service layer
 """
-from fastapi import FastAPI, Request, HTTPException, Depends, Form
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
+from fastapi import FastAPI, Request, HTTPException, Depends, Form, Query
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import http_exception_handler
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import ValidationError as PydanticValidationError
-from typing import List, Optional
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import List, Optional, Tuple
 import json
-import os
-import re
-from pathlib import Path
-import weasyprint
-import pprint
-
-# Import our new models and services
-from app.models.cv_data import CVData, CVGenerateRequest, CVGenerateResponse
-from app.services.cv_service import CVService
-from app.core.exceptions import CVGenerationError, CVNotFoundError, TemplateError, PDFGenerationError
+import logging
+
+# Import our new models and services (services are built on first use)
+from app.models.cv_data import CVBookRequest, CVData, CVDocument, CVExportRequest, CVGenerateRequest, CVGenerateResponse
+from app.dependencies import (
+    get_batch_service, get_book_service, get_cv_service, get_export_service, get_html_service, get_pdf_service,
+    get_templates, shutdown_services
+)
+from app.core.codec import JSONBytesResponse, dump_json, dumps, validate_json
+from app.core.config import settings
+from app.core.compression import IDENTITY, CompressionMiddleware, negotiate_encoding
+from app.core.file_responses import artifact_response
+from app.core.filenames import create_filename
+from app.core.http_cache import IMMUTABLE, NO_CACHE, is_not_modified, make_etag, validator_headers
+from app.core.exceptions import (
+    CVGenerationError, CVGeneratorException, CVNotFoundError, TemplateError, PDFGenerationError, ValidationError
+)
 from app.core.logging import setup_logging, get_logger
+from app.core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, ERRORS, STAGE_SECONDS, SnapshotWriter, render_text
+from app.services.dynamic_forms import MAX_FORM_FIELDS, parse_dynamic_form_data
 
 # Setup logging
-setup_logging(level="INFO")
+setup_logging()
 logger = get_logger(__name__)
 
+# Request stages timed in this module
+FORM_PARSE_SECONDS = STAGE_SECONDS.labels("form_parse")
+VALIDATE_SECONDS = STAGE_SECONDS.labels("validate")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share this worker's metrics with the others; stop the PDF render engine cleanly on shutdown if it was started"""
+    snapshots = SnapshotWriter(settings.metrics_dir, settings.metrics_interval) if settings.metrics_dir else None
+    if snapshots:
+        snapshots.start()
+    yield
+    if snapshots:
+        snapshots.stop()
+    await shutdown_services()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="CV Generator v2.0",
     description="Generate professional PDF resumes with clean architecture",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
-# Create directories
-Path("static").mkdir(exist_ok=True)
-Path("templates").mkdir(exist_ok=True)
-Path("generated").mkdir(exist_ok=True)
+# Compress large JSON API responses (CV pages are served precompressed)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compress_min_bytes)
 
-# Mount static files
+# Mount static files (static/ ships with the repo, kept by static/.gitkeep)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Setup templates
-templates = Jinja2Templates(directory="templates")
-
-# Initialize services
-cv_service = CVService()
 
-
-def create_filename(name: str) -> str:
-    """Create a clean filename from the user's name"""
-    clean_name = re.sub(r'[^a-zA-Z0-9\s]', '', name)
-    return clean_name.replace(' ', '_').lower()
-
-
-def render_template(template_name: str, data: dict) -> str:
-    """Render Jinja2 template with data"""
-    try:
-        template = templates.env.get_template(template_name)
-        return template.render(**data)
-    except Exception as e:
-        logger.error(f"Template rendering error: {str(e)}")
-        raise TemplateError(f"Failed to render template {template_name}: {str(e)}")
+# Exception handlers
+def _count_error(exc: Optional[BaseException]) -> None:
+    """Count an application error that failed a request in cv_errors_total"""
+    if isinstance(exc, CVGeneratorException):
+        ERRORS.inc(type(exc).__name__)
 
 
-# Exception handlers
 @app.exception_handler(CVNotFoundError)
 async def cv_not_found_handler(request: Request, exc: CVNotFoundError):
-    logger.warning(f"CV not found: {str(exc)}")
-    raise HTTPException(status_code=404, detail=str(exc))
+    _count_error(exc)
+    logger.warning("CV not found: %s", exc)
+    return JSONResponse(status_code=404, content={"detail": str(exc)})
 
 
 @app.exception_handler(CVGenerationError)
 async def cv_generation_error_handler(request: Request, exc: CVGenerationError):
+    _count_error(exc)
     logger.error(f"CV generation error: {str(exc)}")
-    raise HTTPException(status_code=500, detail=str(exc))
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
+@app.exception_handler(CVGeneratorException)
+async def cv_generator_error_handler(request: Request, exc: CVGeneratorException):
+    _count_error(exc)
+    logger.error(f"{type(exc).__name__}: {str(exc)}")
+    status_code = 400 if isinstance(exc, ValidationError) else 500
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_error_handler(request: Request, exc: StarletteHTTPException):
+    # Routes turn application errors into HTTPExceptions inside their except blocks
+    _count_error(exc.__context__)
+    return await http_exception_handler(request, exc)
 
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.warning(f"Validation error: {str(exc)}")
-    return HTTPException(status_code=422, detail=f"Validation error: {str(exc)}")
+    logger.warning("Validation error: %s", exc)
+    return JSONResponse(status_code=422, content={"detail": f"Validation error: {str(exc)}"})
 
 
 # API Endpoints
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
     """Serve the dynamic CV form"""
-    return templates.TemplateResponse("form.html", {"request": request})
+    return get_templates().TemplateResponse("form.html", {"request": request})
 
 
 
@@ -100,12 +130,12 @@ async def test_form(request: Request):
         with open("test_data_structured.json", "r") as f:
             structured_data = json.load(f)
         
-        return templates.TemplateResponse("form.html", {"request": request, "form_data": structured_data})
+        return get_templates().TemplateResponse("form.html", {"request": request, "form_data": structured_data})
         
     except Exception as e:
         logger.error(f"Error loading test data: {str(e)}")
         # Fall back to empty form
-        return templates.TemplateResponse("form.html", {"request": request})
+        return get_templates().TemplateResponse("form.html", {"request": request})
 
 
 @app.get("/test/pdf")
@@ -119,11 +149,8 @@ async def download_test_cv_pdf():
         # Create CV data object
         cv_data = CVData(**structured_data)
         
-        # Render PDF-specific HTML template
-        html_content = render_template('cv_template_pdf.html', cv_data.dict())
-        
-        # Generate PDF using WeasyPrint
-        pdf_bytes = weasyprint.HTML(string=html_content).write_pdf()
+        # Render PDF (served from the artifact cache when unchanged)
+        pdf_bytes = await get_pdf_service().get_pdf(cv_data)
         
         # Create filename from user's name
         pdf_filename = f"{create_filename(cv_data.personal_info.full_name)}_test.pdf"
@@ -143,269 +170,118 @@ async def download_test_cv_pdf():
 
 
 
-def convert_structured_to_form_data(structured_data: dict) -> dict:
-    """Convert structured data to legacy form format for template compatibility"""
-    form_data = {}
-    
-    # Personal info
-    personal_info = structured_data.get("personal_info", {})
-    form_data.update({
-        "full_name": personal_info.get("full_name", ""),
-        "highest_education": personal_info.get("highest_education", ""),
-        "city": personal_info.get("city", ""),
-        "phone": personal_info.get("phone", ""),
-        "email": personal_info.get("email", "")
-    })
-    
-    # Education
-    education = structured_data.get("education", [])
-    for i, edu in enumerate(education[:5], 1):
-        form_data.update({
-            f"edu_{i}_qual": edu.get("qualification", ""),
-            f"edu_{i}_stream": edu.get("stream", ""),
-            f"edu_{i}_institute": edu.get("institute", ""),
-            f"edu_{i}_year": edu.get("year", ""),
-            f"edu_{i}_cgpa": edu.get("cgpa", "")
-        })
-    
-    # Achievements
-    achievements = structured_data.get("achievements", [])
-    for i, ach in enumerate(achievements[:5], 1):
-        form_data.update({
-            f"ach_{i}_desc": ach.get("description", ""),
-            f"ach_{i}_year": ach.get("year", "")
-        })
-    
-    # Internships
-    internships = structured_data.get("internships", [])
-    for i, intern in enumerate(internships[:3], 1):
-        form_data.update({
-            f"intern_{i}_company": intern.get("company", ""),
-            f"intern_{i}_role": intern.get("role", ""),
-            f"intern_{i}_duration": intern.get("duration", "")
-        })
-        points = intern.get("points", [])
-        for j, point in enumerate(points[:5], 1):
-            form_data[f"intern_{i}_point_{j}"] = point
-    
-    # Projects
-    projects = structured_data.get("projects", [])
-    for i, proj in enumerate(projects[:3], 1):
-        form_data.update({
-            f"proj_{i}_title": proj.get("title", ""),
-            f"proj_{i}_type": proj.get("type", ""),
-            f"proj_{i}_duration": proj.get("duration", "")
-        })
-        points = proj.get("points", [])
-        for j, point in enumerate(points[:5], 1):
-            form_data[f"proj_{i}_point_{j}"] = point
-    
-    # Positions of responsibility
-    positions = structured_data.get("positions_of_responsibility", [])
-    for i, pos in enumerate(positions[:3], 1):
-        form_data.update({
-            f"por_{i}_club": pos.get("club", ""),
-            f"por_{i}_role": pos.get("role", ""),
-            f"por_{i}_duration": pos.get("duration", "")
-        })
-        points = pos.get("points", [])
-        for j, point in enumerate(points[:5], 1):
-            form_data[f"por_{i}_point_{j}"] = point
-    
-    # Extracurricular activities
-    extracurricular = structured_data.get("extracurricular", [])
-    for i, activity in enumerate(extracurricular[:5], 1):
-        form_data[f"extracur_{i}_desc"] = activity
-    
-    # Technical skills
-    technical_skills = structured_data.get("technical_skills", [])
-    for i, skill in enumerate(technical_skills[:10], 1):
-        form_data[f"techskill_{i}"] = skill
-    
-    return form_data
-
-
 @app.post("/generate")
 async def generate_cv(request: Request):
     """Generate CV from form data - supports both legacy and dynamic formats"""
     try:
         # Get form data
-        form_data = await request.form()
-        logger.info(f"[DEBUG] Raw form_data keys: {list(form_data.keys())}")
-        # Check if this is dynamic form data (has array fields)
-        is_dynamic = any(key.startswith(('education[', 'achievements[', 'internships[', 'projects[', 'positions[')) 
-                        for key in form_data.keys())
-        logger.info(f"[DEBUG] is_dynamic: {is_dynamic}")
-        if is_dynamic:
-            # Handle dynamic form data
-            structured_data = parse_dynamic_form_data(form_data)
-            logger.info(f"[DEBUG] structured_data: {structured_data}")
-            cv_data = CVData(**structured_data)
-        else:
-            # Handle legacy form data
-            form_variables = dict(form_data)
-            logger.info(f"[DEBUG] form_variables: {form_variables}")
-            cv_data = cv_service.convert_legacy_data(form_variables)
-        
-        # Generate CV using service
-        logger.info(f"[DEBUG] cv_data.dict(): {cv_data.dict()}")
-        cv_id = cv_service.generate_cv(cv_data)
+        form_data = await request.form(max_fields=MAX_FORM_FIELDS)
         
-        # Generate HTML file for display
-        html_content = render_template('cv_template.html', cv_data.dict())
+        cv_data = cv_data_from_form(form_data)
         
-        # Save HTML file
-        html_file = f"generated/{cv_id}.html"
-        with open(html_file, "w") as f:
-            f.write(html_content)
+        # Storage and index writes block on disk (or network for S3): keep them off the event loop
+        cv_id = await run_in_threadpool(get_cv_service().generate_cv, cv_data)
         
-        # Create display HTML with download button
-        pdf_filename = f"{create_filename(cv_data.personal_info.full_name)}.pdf"
-        download_button = f"""
-        <div style="position: fixed; top: 20px; right: 20px; z-index: 1000;">
-            <a href="/cv/{cv_id}/pdf" download="{pdf_filename}" 
-               style="background-color: #4C5196; color: white; padding: 10px 20px; 
-                      text-decoration: none; border-radius: 5px; font-weight: bold;
-                      box-shadow: 0 2px 5px rgba(0,0,0,0.2);">
-                📄 Download PDF
-            </a>
-        </div>
-        """
+        # Optionally start laying out the PDF while the user views the HTML
+        if settings.pdf_prerender:
+            get_pdf_service().schedule_prerender(cv_id, cv_data)
         
-        html_with_button = html_content.replace('<body>', f'<body>{download_button}')
-        
-        # Save display HTML
-        with open(f"generated/{cv_id}_display.html", "w") as f:
-            f.write(html_with_button)
-        
-        logger.info(f"CV generated successfully: {cv_id}")
+        # Pages are rendered from the stored data when first viewed
+        logger.info("CV generated successfully: %s", cv_id)
         
         # Return redirect response
         return RedirectResponse(url=f"/cv/{cv_id}", status_code=302)
         
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except StarletteHTTPException:
+        # Raised by request.form, e.g. 400 for a multipart form over max_fields
+        raise
     except Exception as e:
         logger.error(f"Error in generate_cv endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error generating CV: {str(e)}")
 
 
+def cv_data_from_form(form_data) -> CVData:
+    """
+    Validate a submitted CV form
+    
+    Args:
+        form_data: Submitted form (dynamic or legacy field layout)
+        
+    Returns:
+        CVData: Validated CV data
+    
+    Raises:
+        ValidationError: If the form has too many fields or a malformed array field
+    """
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug(f"Raw form_data keys: {list(form_data.keys())}")
+    # One pass over the fields; None means no array fields, i.e. the legacy layout
+    with FORM_PARSE_SECONDS.time():
+        structured_data = parse_dynamic_form_data(form_data.multi_items())
+    if structured_data is not None:
+        if debug:
+            logger.debug(f"Structured data after parsing dynamic form: {structured_data}")
+        with VALIDATE_SECONDS.time():
+            cv_data = CVData(**structured_data)
+    else:
+        # Handle legacy form data
+        form_variables = dict(form_data)
+        if debug:
+            logger.debug(f"form_variables: {form_variables}")
+        with VALIDATE_SECONDS.time():
+            cv_data = get_cv_service().convert_legacy_data(form_variables)
+    
+    if debug:
+        logger.debug(f"cv_data: {cv_data.model_dump()}")
+    return cv_data
+
+
+def _not_modified(request: Request, headers: dict, last_modified=None) -> Optional[Response]:
+    """A 304 response if the client's cached copy matches, else None"""
+    if is_not_modified(request.headers, headers["ETag"], last_modified):
+        return Response(status_code=304, headers=headers)
+    return None
+
 
+def _page_headers(key: str, encoding: str, last_modified) -> dict:
+    """Validators and encoding headers for a (possibly precompressed) CV page"""
+    headers = validator_headers(make_etag(key, encoding), last_modified)
+    headers["Vary"] = "Accept-Encoding"
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding
+    return headers
 
-def parse_dynamic_form_data(form_data) -> dict:
-    """Parse dynamic form data into structured format"""
-    # Initialize structured data
-    structured_data = {
-        "personal_info": {},
-        "education": [],
-        "achievements": [],
-        "internships": [],
-        "projects": [],
-        "positions_of_responsibility": [],
-        "extracurricular": [],
-        "technical_skills": []
-    }
-    # Parse personal info
-    structured_data["personal_info"] = {
-        "full_name": form_data.get("full_name", ""),
-        "highest_education": form_data.get("highest_education", ""),
-        "city": form_data.get("city", ""),
-        "phone": form_data.get("phone", ""),
-        "email": form_data.get("email", "")
-    }
-    # Parse education entries
-    education_data = {}
-    for key, value in form_data.items():
-        if key.startswith("education["):
-            parts = key.split('][')
-            index = int(parts[0].split('[')[1])
-            field = parts[1].rstrip(']')
-            if index not in education_data:
-                education_data[index] = {}
-            education_data[index][field] = value
-    for i in sorted(education_data.keys()):
-        structured_data["education"].append(education_data[i])
-    # Parse achievements
-    achievement_data = {}
-    for key, value in form_data.items():
-        if key.startswith("achievements["):
-            parts = key.split('][')
-            index = int(parts[0].split('[')[1])
-            field = parts[1].rstrip(']')
-            if index not in achievement_data:
-                achievement_data[index] = {}
-            achievement_data[index][field] = value
-    for i in sorted(achievement_data.keys()):
-        structured_data["achievements"].append(achievement_data[i])
-    # Parse internships
-    internship_data = {}
-    for key in form_data.keys():
-        if key.startswith("internships["):
-            parts = key.split('][')
-            index = int(parts[0].split('[')[1])
-            if index not in internship_data:
-                internship_data[index] = {"points": []}
-            if key.endswith("[points][]"):
-                values = form_data.getlist(key)
-                internship_data[index]["points"].extend(values)
-            else:
-                field = parts[1].rstrip(']')
-                internship_data[index][field] = form_data[key]
-    for i in sorted(internship_data.keys()):
-        structured_data["internships"].append(internship_data[i])
-    # Parse projects
-    project_data = {}
-    for key in form_data.keys():
-        if key.startswith("projects["):
-            parts = key.split('][')
-            index = int(parts[0].split('[')[1])
-            if index not in project_data:
-                project_data[index] = {"points": []}
-            if key.endswith("[points][]"):
-                values = form_data.getlist(key)
-                project_data[index]["points"].extend(values)
-            else:
-                field = parts[1].rstrip(']')
-                project_data[index][field] = form_data[key]
-    for i in sorted(project_data.keys()):
-        structured_data["projects"].append(project_data[i])
-    # Parse positions
-    position_data = {}
-    for key in form_data.keys():
-        if key.startswith("positions["):
-            parts = key.split('][')
-            index = int(parts[0].split('[')[1])
-            if index not in position_data:
-                position_data[index] = {"points": []}
-            if key.endswith("[points][]"):
-                values = form_data.getlist(key)
-                position_data[index]["points"].extend(values)
-            else:
-                field = parts[1].rstrip(']')
-                position_data[index][field] = form_data[key]
-    for i in sorted(position_data.keys()):
-        structured_data["positions_of_responsibility"].append(position_data[i])
-    # Parse extracurricular activities
-    extracurricular = form_data.getlist("extracurricular[]")
-    structured_data["extracurricular"] = [activity for activity in extracurricular if activity.strip()]
-    # Parse technical skills
-    technical_skills = form_data.getlist("technical_skills[]")
-    structured_data["technical_skills"] = [skill for skill in technical_skills if skill.strip()]
-    # After parsing all data
-    logger.info("[DEBUG] Structured data after parsing dynamic form:")
-    logger.info(pprint.pformat(structured_data))
-    return structured_data
+
+def _display_page_args(cv_id: str, cv_data: CVData) -> Tuple[str, str]:
+    """Download filename and (content-hashed) PDF URL for a CV's display page"""
+    pdf_filename = f"{create_filename(cv_data.personal_info.full_name)}.pdf"
+    return pdf_filename, get_pdf_service().immutable_url(cv_id, cv_data)
 
 
 @app.get("/cv/{cv_id}")
-async def get_cv_display(cv_id: str):
+async def get_cv_display(request: Request, cv_id: str):
     """Serve the CV display page with download button"""
     try:
-        display_file = f"generated/{cv_id}_display.html"
-        if os.path.exists(display_file):
-            with open(display_file, "r") as f:
-                content = f.read()
-            return HTMLResponse(content=content)
-        else:
-            raise CVNotFoundError(f"CV display file not found for ID: {cv_id}")
+        cv_document = await run_in_threadpool(get_cv_service().get_cv_data, cv_id)
+        pdf_filename, download_url = _display_page_args(cv_id, cv_document.data)
+        html_service = get_html_service()
+        key = html_service.cache_key(cv_id, cv_document.data, pdf_filename, download_url)
+        
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        last_modified = cv_document.metadata.last_modified
+        headers = _page_headers(key, encoding, last_modified)
+        not_modified = _not_modified(request, headers, last_modified)
+        if not_modified:
+            return not_modified
+        
+        content = await run_in_threadpool(
+            html_service.locate_html, cv_id, cv_document.data, download_filename=pdf_filename,
+            download_url=download_url, key=key, encoding=encoding
+        )
+        return await artifact_response(request, content, "text/html", headers)
     except CVNotFoundError:
         raise
     except Exception as e:
@@ -414,14 +290,24 @@ async def get_cv_display(cv_id: str):
 
 
 @app.get("/cv/{cv_id}/html")
-async def get_cv_html(cv_id: str):
+async def get_cv_html(request: Request, cv_id: str):
     """Serve generated HTML CV"""
     try:
-        html_file = f"generated/{cv_id}.html"
-        if os.path.exists(html_file):
-            return FileResponse(html_file, media_type="text/html")
-        else:
-            raise CVNotFoundError(f"CV HTML file not found for ID: {cv_id}")
+        cv_document = await run_in_threadpool(get_cv_service().get_cv_data, cv_id)
+        html_service = get_html_service()
+        key = html_service.cache_key(cv_id, cv_document.data)
+        
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+        last_modified = cv_document.metadata.last_modified
+        headers = _page_headers(key, encoding, last_modified)
+        not_modified = _not_modified(request, headers, last_modified)
+        if not_modified:
+            return not_modified
+        
+        content = await run_in_threadpool(
+            html_service.locate_html, cv_id, cv_document.data, key=key, encoding=encoding
+        )
+        return await artifact_response(request, content, "text/html", headers)
     except CVNotFoundError:
         raise
     except Exception as e:
@@ -429,30 +315,44 @@ async def get_cv_html(cv_id: str):
         raise HTTPException(status_code=500, detail="Error serving CV HTML")
 
 
+async def _pdf_response(request: Request, cv_id: str, digest: Optional[str] = None) -> Response:
+    """
+    Serve a CV's PDF with validators
+    
+    Without ``digest`` the response must be revalidated on every use. With
+    the current content hash it is cacheable forever; an outdated hash is
+    redirected to the current URL.
+    """
+    cv_document = await run_in_threadpool(get_cv_service().get_cv_data, cv_id)
+    pdf_service = get_pdf_service()
+    key = pdf_service.cache_key(cv_document.data)
+    
+    if digest is not None and digest != key:
+        return RedirectResponse(url=f"/cv/{cv_id}/pdf/{key}", status_code=302)
+    
+    last_modified = cv_document.metadata.last_modified
+    headers = validator_headers(make_etag(key), last_modified, IMMUTABLE if digest else NO_CACHE)
+    not_modified = _not_modified(request, headers, last_modified)
+    if not_modified:
+        return not_modified
+    
+    # Stream the pre-rendered or cached PDF from disk if any, else render
+    content = await pdf_service.locate_cv_pdf(cv_id, cv_document.data)
+    
+    # Create filename from user's name
+    pdf_filename = f"{create_filename(cv_document.data.personal_info.full_name)}.pdf"
+    
+    logger.info("PDF generated successfully for CV: %s", cv_id)
+    
+    headers["Content-Disposition"] = f"attachment; filename={pdf_filename}"
+    return await artifact_response(request, content, "application/pdf", headers)
+
+
 @app.get("/cv/{cv_id}/pdf")
-async def get_cv_pdf(cv_id: str):
-    """Generate and serve PDF CV on-demand from HTML"""
+async def get_cv_pdf(request: Request, cv_id: str):
+    """Serve PDF CV, rendering it on-demand on a cache miss"""
     try:
-        # Get CV data using service
-        cv_document = cv_service.get_cv_data(cv_id)
-        
-        # Render PDF-specific HTML template
-        html_content = render_template('cv_template_pdf.html', cv_document.data.dict())
-        
-        # Generate PDF using WeasyPrint
-        pdf_bytes = weasyprint.HTML(string=html_content).write_pdf()
-        
-        # Create filename from user's name
-        pdf_filename = f"{create_filename(cv_document.data.personal_info.full_name)}.pdf"
-        
-        logger.info(f"PDF generated successfully for CV: {cv_id}")
-        
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename={pdf_filename}"}
-        )
-        
+        return await _pdf_response(request, cv_id)
     except CVNotFoundError:
         raise
     except Exception as e:
@@ -460,23 +360,251 @@ async def get_cv_pdf(cv_id: str):
         raise PDFGenerationError(f"Failed to generate PDF: {str(e)}")
 
 
+@app.get("/cv/{cv_id}/pdf/{digest}")
+async def get_cv_pdf_immutable(request: Request, cv_id: str, digest: str):
+    """Serve the PDF under its content-hashed URL, cacheable without revalidation"""
+    try:
+        return await _pdf_response(request, cv_id, digest)
+    except CVNotFoundError:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating PDF: {str(e)}")
+        raise PDFGenerationError(f"Failed to generate PDF: {str(e)}")
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
 @app.get("/api/v1/cvs")
-async def list_cvs():
-    """List all CVs with metadata"""
+async def list_cvs(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    format: Optional[str] = None
+):
+    """
+    List CVs with metadata, newest first
+    
+    - Without ``limit`` every CV is returned in one JSON object.
+    - With ``limit`` one page is returned plus ``next_cursor`` to pass back as
+      ``cursor`` for the following page.
+    - ``format=ndjson`` (or ``Accept: application/x-ndjson``) streams one CV
+      summary per line in constant memory.
+    """
     try:
-        cvs = cv_service.list_cvs()
-        return {"cvs": cvs, "total": len(cvs)}
+        cv_service = get_cv_service()
+        if format == "ndjson" or NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            lines = (dumps(cv) + b"\n" for cv in cv_service.iter_cvs())
+            return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+        
+        if limit is None:
+            cvs = await run_in_threadpool(cv_service.list_cvs)
+            return JSONBytesResponse({"cvs": cvs, "total": len(cvs)})
+        
+        cvs, next_cursor = await run_in_threadpool(cv_service.list_cvs_page, limit, cursor)
+        total = await run_in_threadpool(cv_service.count_cvs)
+        return JSONBytesResponse({"cvs": cvs, "total": total, "next_cursor": next_cursor})
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error listing CVs: {str(e)}")
         raise HTTPException(status_code=500, detail="Error listing CVs")
 
 
+@app.post("/api/v1/cvs", status_code=201, response_model=CVGenerateResponse)
+async def create_cv_api(request: Request, render_html: bool = False, render_pdf: bool = False):
+    """
+    Create a CV from a JSON body with the ``CVData`` fields
+    
+    The body is validated straight into ``CVData`` (errors come back as
+    ``422`` with pydantic's error list) and the response is a
+    ``CVGenerateResponse`` with the new CV's URLs. ``render_html=true``
+    renders and caches the display page before responding;
+    ``render_pdf=true`` queues the PDF render in the background.
+    """
+    body = await request.body()
+    try:
+        with VALIDATE_SECONDS.time():
+            cv_data = validate_json(CVData, body)
+    except PydanticValidationError as e:
+        errors = e.errors(include_url=False, include_context=False, include_input=False)
+        return JSONBytesResponse({"detail": errors}, status_code=422)
+    
+    cv_id = await run_in_threadpool(get_cv_service().generate_cv, cv_data)
+    
+    if render_html:
+        pdf_filename, download_url = _display_page_args(cv_id, cv_data)
+        await run_in_threadpool(
+            get_html_service().get_html, cv_id, cv_data, download_filename=pdf_filename, download_url=download_url
+        )
+    if render_pdf:
+        get_pdf_service().schedule_prerender(cv_id, cv_data)
+    
+    response = CVGenerateResponse(
+        cv_id=cv_id,
+        redirect_url=f"/cv/{cv_id}",
+        html_url=f"/cv/{cv_id}/html",
+        pdf_url=f"/cv/{cv_id}/pdf",
+        data_url=f"/api/v1/cv/{cv_id}"
+    )
+    return JSONBytesResponse(
+        dump_json(CVGenerateResponse, response),
+        status_code=201,
+        headers={"Location": response.data_url}
+    )
+
+
+@app.get("/api/v1/cvs/search")
+async def search_cvs(
+    q: str = Query(..., min_length=1, max_length=200),
+    field: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    Search CVs by name, contact details, education, companies, projects,
+    skills and bullet points, ranked by relevance
+    
+    Repeat ``field`` to restrict matching, e.g. ``?q=python&field=skills``.
+    """
+    try:
+        results = await run_in_threadpool(get_cv_service().search_cvs, q, fields=field, limit=limit)
+        return JSONBytesResponse({"results": results, "total": len(results)})
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching CVs: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error searching CVs")
+
+
+@app.post("/api/v1/cvs/batch")
+async def generate_cv_batch(request: Request, render_pdf: bool = True):
+    """
+    Generate CVs for a whole cohort in one request
+    
+    The body is either a JSON array of CV objects or, with
+    ``Content-Type: application/x-ndjson``, one CV object per line (parsed
+    line by line as it arrives). The response streams one NDJSON result
+    per input row, in order: ``created`` with its ``cv_id``, ``invalid``
+    with the validation errors, or ``error`` if storing failed. A bad row
+    never aborts the batch. PDFs of the new CVs are queued for rendering
+    unless ``render_pdf=false``.
+    """
+    from app.services.batch_service import iter_ndjson, parse_json_array
+    
+    try:
+        content_type = request.headers.get("content-type", "")
+        if NDJSON_MEDIA_TYPE in content_type or "application/jsonl" in content_type:
+            # The body must be consumed before the response starts streaming:
+            # StreamingResponse reads from the same channel to detect disconnects
+            rows = [row async for row in iter_ndjson(request.stream())]
+        else:
+            rows = parse_json_array(await request.body())
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    results = get_batch_service().generate(rows, render_pdf=render_pdf)
+    lines = (dumps(result) + b"\n" async for result in results)
+    return StreamingResponse(lines, media_type=NDJSON_MEDIA_TYPE)
+
+
+async def _export_response(
+    cv_ids: Optional[List[str]],
+    q: Optional[str],
+    fields: Optional[List[str]]
+) -> StreamingResponse:
+    """Stream the ZIP archive for the selected CVs"""
+    export_service = get_export_service()
+    try:
+        selected = await run_in_threadpool(export_service.select_cv_ids, cv_ids, query=q, fields=fields)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    filename = f"cvs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return StreamingResponse(
+        export_service.stream_zip(selected),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@app.get("/api/v1/cvs/export")
+async def export_cvs(
+    cv_id: Optional[List[str]] = Query(None),
+    q: Optional[str] = Query(None, min_length=1, max_length=200),
+    field: Optional[List[str]] = Query(None)
+):
+    """
+    Download the PDFs of several CVs as one ZIP archive
+    
+    Select CVs with repeated ``cv_id`` parameters or with a search query
+    (``q``, optionally restricted by ``field`` as in ``/api/v1/cvs/search``).
+    The archive is streamed as PDFs become ready; already rendered PDFs are
+    reused and missing ones rendered concurrently. CVs that could not be
+    exported are listed in ``errors.txt`` inside the archive.
+    """
+    return await _export_response(cv_id, q, field)
+
+
+@app.post("/api/v1/cvs/export")
+async def export_cvs_post(export_request: CVExportRequest):
+    """Same as ``GET /api/v1/cvs/export``, for selections too long for a URL"""
+    return await _export_response(export_request.cv_ids, export_request.q, export_request.fields)
+
+
+async def _book_response(
+    cv_ids: Optional[List[str]],
+    q: Optional[str],
+    fields: Optional[List[str]],
+    title: str
+) -> FileResponse:
+    """Serve the resume book PDF for the selected CVs"""
+    book_service = get_book_service()
+    try:
+        selected = await run_in_threadpool(
+            get_cv_service().select_cv_ids, cv_ids, query=q, fields=fields, max_items=book_service.max_items
+        )
+        book_path = await book_service.get_book(selected, title)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error generating resume book: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate resume book: {str(e)}")
+    
+    return FileResponse(
+        book_path,
+        media_type="application/pdf",
+        filename=f"{create_filename(title) or 'resume_book'}.pdf"
+    )
+
+
+@app.get("/api/v1/cvs/book")
+async def resume_book(
+    cv_id: Optional[List[str]] = Query(None),
+    q: Optional[str] = Query(None, min_length=1, max_length=200),
+    field: Optional[List[str]] = Query(None),
+    title: str = Query("Resume Book", min_length=1, max_length=200)
+):
+    """
+    Download one PDF with a contents page followed by every selected CV
+    
+    CVs are selected as for ``/api/v1/cvs/export`` and appear in that order
+    (the given ``cv_id`` order, or search relevance for ``q``).
+    """
+    return await _book_response(cv_id, q, field, title)
+
+
+@app.post("/api/v1/cvs/book")
+async def resume_book_post(book_request: CVBookRequest):
+    """Same as ``GET /api/v1/cvs/book``, for selections too long for a URL"""
+    return await _book_response(book_request.cv_ids, book_request.q, book_request.fields, book_request.title)
+
+
 @app.get("/api/v1/cv/{cv_id}")
 async def get_cv_data_api(cv_id: str):
     """Get CV data via API"""
     try:
-        cv_document = cv_service.get_cv_data(cv_id)
-        return cv_document.dict()
+        cv_document = await run_in_threadpool(get_cv_service().get_cv_data, cv_id)
+        return JSONBytesResponse(dump_json(CVDocument, cv_document))
     except CVNotFoundError:
         raise
     except Exception as e:
@@ -488,7 +616,8 @@ async def get_cv_data_api(cv_id: str):
 async def delete_cv_api(cv_id: str):
     """Delete CV via API"""
     try:
-        cv_service.delete_cv(cv_id)
+        get_pdf_service().cancel_prerender(cv_id)
+        await run_in_threadpool(get_cv_service().delete_cv, cv_id)
         return {"message": f"CV {cv_id} deleted successfully"}
     except CVNotFoundError:
         raise
@@ -503,6 +632,14 @@ async def health_check():
     return {"status": "healthy", "version": "2.0.0"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage latencies, renders, cache hits and errors, summed over all workers"""
+    # Reads the other workers' snapshot files
+    content = await run_in_threadpool(render_text, settings.metrics_dir or None)
+    return Response(content, media_type=METRICS_CONTENT_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
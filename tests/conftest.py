@@ -0,0 +1,50 @@
+"""
+Shared fixtures
+
+Settings are read once when ``app.core.config`` is imported, so the
+environment is pointed at a scratch directory here, before any test module
+imports the application: nothing is written to the working tree.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+_SCRATCH = tempfile.mkdtemp(prefix="cv-generator-tests-")
+os.environ.update({
+    "CV_GENERATED_DIR": os.path.join(_SCRATCH, "generated"),
+    "CV_TEMPLATES_DIR": str(REPO_ROOT / "templates"),
+    "CV_TEMPLATE_CACHE_DIR": "",
+    "CV_LOG_FILE": "",
+    "CV_METRICS_DIR": "",
+    "CV_PDF_WORKERS": "0",
+})
+
+
+@pytest.fixture
+def cv_payload() -> dict:
+    """The structured test CV as plain data"""
+    return json.loads((REPO_ROOT / "test_data_structured.json").read_text())
+
+
+@pytest.fixture
+def cv_data(cv_payload):
+    """The structured test CV, validated"""
+    from app.models.cv_data import CVData
+
+    return CVData(**cv_payload)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client for the application; static/ is mounted relative to the working directory"""
+    monkeypatch.chdir(REPO_ROOT)
+    from fastapi.testclient import TestClient
+
+    import main
+
+    return TestClient(main.app)
@@ -0,0 +1,104 @@
+"""
+Artifact cache: refs, invalidation, size-capped eviction and template digests
+"""
+import os
+import uuid
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.services import artifact_cache
+from app.services.artifact_cache import ArtifactCache, TemplateDigests
+
+
+def _age(path, seconds):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+
+def test_invalidate_drops_every_variant_of_one_cv(tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=10_000, suffix=".html")
+    cv_id, other = str(uuid.uuid4()), str(uuid.uuid4())
+    cache.put("a", b"plain", cv_id=cv_id, variant="plain")
+    cache.put("a-br", b"br", cv_id=cv_id, variant="plain.br")
+    cache.put("b", b"other", cv_id=other, variant="plain")
+
+    cache.invalidate(cv_id)
+
+    assert cache.get("a") is None and cache.get("a-br") is None
+    assert cache.get("b") == b"other"
+    assert not cache.ref_dir(cv_id).exists()
+    assert cache.ref_dir(cv_id).parent == tmp_path / "refs" / cv_id[:2]
+
+
+def test_put_replaces_the_previous_entry_of_a_variant(tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=10_000, suffix=".pdf")
+    cv_id = str(uuid.uuid4())
+    cache.put("old", b"v1", cv_id=cv_id)
+    cache.put("new", b"v2", cv_id=cv_id)
+
+    assert cache.get("old") is None
+    assert cache.get("new") == b"v2"
+    assert os.listdir(cache.ref_dir(cv_id)) == ["_.new"]
+
+
+def test_eviction_removes_refs_of_evicted_entries(tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=250, suffix=".pdf")
+    cv_ids = [str(uuid.uuid4()) for _ in range(3)]
+    for index, cv_id in enumerate(cv_ids):
+        cache.put(f"k{index}", b"x" * 100, cv_id=cv_id)
+        _age(cache.path_for(f"k{index}"), 100 - index)
+
+    # The third put went over the limit: the oldest entry and its ref are gone
+    assert cache.get("k0") is None
+    assert not cache.ref_dir(cv_ids[0]).exists()
+    assert cache.get("k1") == cache.get("k2") == b"x" * 100
+    assert cache.ref_dir(cv_ids[2]).exists()
+
+
+def test_size_is_tracked_without_rescanning_every_put(tmp_path, monkeypatch):
+    cache = ArtifactCache(tmp_path, max_bytes=1000, suffix=".pdf")
+    scans = []
+    enforce = cache._enforce_limit
+    monkeypatch.setattr(cache, "_enforce_limit", lambda: scans.append(1) or enforce())
+
+    for index in range(5):
+        cache.put(f"k{index}", b"x" * 100)
+    # Only the first put, when the size is unknown, scans the directory
+    assert len(scans) == 1
+
+    for index in range(5, 12):
+        cache.put(f"k{index}", b"x" * 100)
+    assert len(scans) > 1
+    total = sum(path.stat().st_size for path in tmp_path.glob("*.pdf"))
+    assert total <= cache.max_bytes
+
+
+def test_flat_refs_from_the_old_layout_are_removed(tmp_path):
+    (tmp_path / "refs").mkdir()
+    (tmp_path / "refs" / f"{uuid.uuid4()}.display").write_text("abc")
+
+    cache = ArtifactCache(tmp_path, max_bytes=1000)
+
+    assert list(cache.refs_dir.iterdir()) == []
+
+
+def test_template_mtime_reuses_the_parsed_closure(tmp_path, monkeypatch):
+    (tmp_path / "page.html").write_text('{% include "part.html" %}')
+    (tmp_path / "part.html").write_text("part")
+    _age(tmp_path / "page.html", 100)
+    _age(tmp_path / "part.html", 50)
+    digests = TemplateDigests(Environment(loader=FileSystemLoader(str(tmp_path))))
+    parses = []
+    closure = artifact_cache.template_closure
+    monkeypatch.setattr(artifact_cache, "template_closure", lambda *args: parses.append(1) or closure(*args))
+
+    first = digests.mtime("page.html")
+    assert first == os.stat(tmp_path / "part.html").st_mtime
+    assert digests.mtime("page.html") == first
+    digests.get("page.html")
+    assert len(parses) == 1
+
+    # Editing the partial is picked up through its uptodate check
+    (tmp_path / "part.html").write_text("edited")
+    assert digests.mtime("page.html") > first
+    assert len(parses) == 2
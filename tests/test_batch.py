@@ -0,0 +1,166 @@
+"""
+Batch generation: per-row results over HTTP, bounded PDF pre-rendering and
+pre-renders of deleted CVs
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.core.templates import create_templates
+from app.services.batch_service import STATUS_CREATED, STATUS_ERROR, STATUS_INVALID, BatchService
+from app.services.cv_service import CVService
+from app.services.pdf_service import PDFService
+from app.storage.base import PDF
+
+from conftest import REPO_ROOT
+
+
+def _results(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_reports_every_row(client, cv_payload):
+    rows = [cv_payload, {"personal_info": "not an object"}, ["not", "a", "dict"], cv_payload]
+
+    response = client.post("/api/v1/cvs/batch", params={"render_pdf": "false"}, json=rows)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = _results(response)
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert [result["status"] for result in results] == [STATUS_CREATED, STATUS_INVALID, STATUS_INVALID, STATUS_CREATED]
+    assert results[0]["cv_id"] != results[3]["cv_id"]
+    assert results[0]["url"] == f"/cv/{results[0]['cv_id']}"
+    assert results[1]["errors"][0]["loc"][0] == "personal_info"
+    assert client.get(f"/api/v1/cv/{results[3]['cv_id']}").status_code == 200
+
+
+def test_ndjson_batch_reports_unparsable_lines(client, cv_payload):
+    body = b"\n".join([json.dumps(cv_payload).encode(), b"{not json", b"", json.dumps(cv_payload).encode()])
+
+    response = client.post(
+        "/api/v1/cvs/batch",
+        params={"render_pdf": "false"},
+        content=body,
+        headers={"content-type": "application/x-ndjson"}
+    )
+
+    results = _results(response)
+    assert [result["status"] for result in results] == [STATUS_CREATED, STATUS_INVALID, STATUS_CREATED]
+    assert results[1]["errors"][0]["type"] == "json_invalid"
+
+
+def test_oversized_batch_stops_at_the_limit(client, cv_payload, monkeypatch):
+    from app.dependencies import get_batch_service
+
+    monkeypatch.setattr(get_batch_service(), "max_items", 2)
+
+    response = client.post("/api/v1/cvs/batch", params={"render_pdf": "false"}, json=[cv_payload] * 4)
+
+    results = _results(response)
+    assert [result["status"] for result in results] == [STATUS_CREATED, STATUS_CREATED, STATUS_ERROR]
+    assert "limit of 2" in results[2]["error"]
+
+
+def test_body_that_is_not_an_array_is_rejected(client):
+    response = client.post("/api/v1/cvs/batch", json={"personal_info": {}})
+
+    assert response.status_code == 400
+
+
+class _Engine:
+    """Stand-in render engine recording how many renders run at once, optionally held on a gate"""
+
+    workers = 2
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.running = self.peak = self.renders = 0
+
+    async def render(self, html_content, stylesheet=None):
+        self.running += 1
+        self.renders += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        if self.gate is not None:
+            await self.gate.wait()
+        self.running -= 1
+        return b"%PDF-1.7"
+
+
+def _pdf_service(cv_service, engine):
+    return PDFService(create_templates(str(REPO_ROOT / "templates"), "").env, engine, cv_service)
+
+
+def test_batch_prerenders_are_bounded_by_the_engine_workers(tmp_path, cv_payload):
+    cv_service = CVService(generated_dir=str(tmp_path))
+    engine = _Engine()
+    pdf_service = _pdf_service(cv_service, engine)
+    batch = BatchService(cv_service, pdf_service, group_size=4)
+
+    async def scenario():
+        # Renders are held until the whole batch is queued
+        engine.gate = asyncio.Event()
+        results = [result async for result in batch.generate([cv_payload] * 12)]
+        # Every row is queued, but only one consumer per worker is feeding the engine
+        assert len(pdf_service._jobs) == 12
+        assert len(pdf_service._consumers) == engine.workers
+        engine.gate.set()
+        await pdf_service.wait_for_prerenders()
+        return results
+
+    results = asyncio.run(scenario())
+
+    assert engine.peak == engine.workers
+    assert all(cv_service.artifact_mtime(result["cv_id"], PDF) is not None for result in results)
+
+
+@pytest.mark.parametrize("cancel", [True, False], ids=["same-worker", "other-worker"])
+def test_cv_deleted_during_its_prerender_stays_deleted(tmp_path, cv_data, cancel):
+    cv_service = CVService(generated_dir=str(tmp_path))
+    engine = _Engine()
+    pdf_service = _pdf_service(cv_service, engine)
+    cv_id = cv_service.generate_cv(cv_data)
+
+    async def scenario():
+        engine.gate = asyncio.Event()
+        pdf_service.schedule_prerender(cv_id, cv_data)
+        while not engine.running:
+            await asyncio.sleep(0.01)
+        # Another worker deleting the CV cannot reach this process's queue
+        if cancel:
+            pdf_service.cancel_prerender(cv_id)
+        cv_service.delete_cv(cv_id)
+        engine.gate.set()
+        await pdf_service.wait_for_prerenders()
+
+    asyncio.run(scenario())
+
+    assert not cv_service.cv_exists(cv_id)
+    assert not cv_service.storage.cv_dir(cv_id).exists()
+    assert pdf_service._jobs == {}
+
+
+def test_cancelled_prerender_still_queued_is_skipped(tmp_path, cv_data):
+    cv_service = CVService(generated_dir=str(tmp_path))
+    engine = _Engine()
+    engine.workers = 1
+    pdf_service = _pdf_service(cv_service, engine)
+    running, queued = cv_service.generate_cv(cv_data), cv_service.generate_cv(cv_data)
+
+    async def scenario():
+        engine.gate = asyncio.Event()
+        pdf_service.schedule_prerender(running, cv_data)
+        pdf_service.schedule_prerender(queued, cv_data)
+        while not engine.running:
+            await asyncio.sleep(0.01)
+        pdf_service.cancel_prerender(queued)
+        engine.gate.set()
+        await pdf_service.wait_for_prerenders()
+
+    asyncio.run(scenario())
+
+    assert engine.renders == 1
+    assert cv_service.artifact_mtime(running, PDF) is not None
+    assert cv_service.artifact_mtime(queued, PDF) is None
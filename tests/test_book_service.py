@@ -0,0 +1,63 @@
+"""
+Resume books: render timeout, stylesheet and caching
+"""
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.core.templates import create_templates
+from app.services.artifact_cache import ArtifactCache
+from app.services.book_service import ResumeBookService
+from app.services.cv_service import CVService
+from app.services.pdf_service import PDF_STYLESHEET
+
+from conftest import REPO_ROOT
+
+
+class _Engine:
+    """Stand-in render engine recording the arguments of each render"""
+
+    timeout = 10.0
+
+    def __init__(self):
+        self.calls = []
+
+    async def render_file(self, html_content, target, stylesheet=None, timeout=None):
+        self.calls.append({"stylesheet": stylesheet, "timeout": timeout})
+        Path(target).write_bytes(b"%PDF-1.7")
+        return target
+
+
+@pytest.fixture
+def books(tmp_path):
+    engine = _Engine()
+    cv_service = CVService(generated_dir=str(tmp_path / "generated"))
+    service = ResumeBookService(
+        create_templates(str(REPO_ROOT / "templates"), "").env,
+        engine,
+        cv_service,
+        ArtifactCache(tmp_path / "books", max_bytes=10_000_000, suffix=".pdf"),
+        max_items=50
+    )
+    return service, engine, cv_service
+
+
+@pytest.mark.parametrize("count, expected", [(1, 10.0), (10, 10.0), (25, 25.0), (50, 50.0)])
+def test_render_timeout_scales_with_book_size(books, count, expected):
+    service, _, _ = books
+    assert service.render_timeout(count) == expected
+
+
+def test_book_is_rendered_once_with_the_scaled_timeout(books, cv_data):
+    service, engine, cv_service = books
+    cv_ids = [cv_service.generate_cv(cv_data) for _ in range(25)]
+
+    first = asyncio.run(service.get_book(cv_ids, "Cohort 2024"))
+    second = asyncio.run(service.get_book(cv_ids, "Cohort 2024"))
+
+    assert first == second
+    assert first.read_bytes() == b"%PDF-1.7"
+    assert len(engine.calls) == 1
+    assert engine.calls[0]["timeout"] == 25.0
+    assert engine.calls[0]["stylesheet"] == str(REPO_ROOT / "templates" / PDF_STYLESHEET)
@@ -0,0 +1,118 @@
+"""
+Compact CV document encoding
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.models.cv_data import CVDocument, CVMetadata
+from app.services.cv_service import CVService
+from app.storage.compact import (
+    CURRENT_VERSION, FORMAT_COMPACT, FORMAT_JSON, MAGIC, _dictionary, compact_version, decode_document,
+    encode_document, is_compact, train_dictionary
+)
+from app.storage.convert import convert_data_files
+
+# Written by a build that used the first dictionary, which is still read
+V1_DOCUMENT = base64.b64decode("Q1ZaAavG0vaAt93hzfxYlOYesF2E3KzE1nSqja0FAA==")
+
+
+@pytest.fixture
+def document(cv_data) -> dict:
+    now = datetime(2024, 5, 1, 12, 30)
+    metadata = CVMetadata(cv_id=str(uuid.uuid4()), created_at=now, last_modified=now)
+    return CVDocument(data=cv_data, metadata=metadata).model_dump(mode="json")
+
+
+def test_compact_round_trip(document):
+    raw = encode_document(document, FORMAT_COMPACT)
+
+    assert raw[:len(MAGIC) + 1] == MAGIC + bytes([CURRENT_VERSION])
+    assert is_compact(raw)
+    assert decode_document(raw) == document
+    assert len(raw) < len(encode_document(document, FORMAT_JSON)) / 2
+
+
+def test_json_round_trip(document):
+    raw = encode_document(document, FORMAT_JSON)
+
+    assert not is_compact(raw)
+    assert json.loads(raw) == document
+    assert decode_document(raw) == document
+
+
+def test_non_ascii_text_survives(document):
+    document["data"]["personal_info"]["full_name"] = "Zoë Ångström 李雷"
+    assert decode_document(encode_document(document))["data"]["personal_info"]["full_name"] == "Zoë Ångström 李雷"
+
+
+@pytest.mark.parametrize("mangle", [
+    lambda raw: raw[:-10],
+    lambda raw: raw[:len(MAGIC) + 1] + b"\xff" * 20,
+    lambda raw: MAGIC + bytes([99]) + raw[len(MAGIC) + 1:],
+])
+def test_corrupt_documents_raise_value_error(document, mangle):
+    with pytest.raises(ValueError):
+        decode_document(mangle(encode_document(document)))
+
+
+def test_unknown_format_is_rejected(document):
+    with pytest.raises(ValueError):
+        encode_document(document, "xml")
+
+
+def _private_values(cv_payload: dict) -> list:
+    """Strings from the test CV that must never reach a dictionary"""
+    # highest_education ("M.Tech") is also an education qualification shared by many CVs
+    personal = dict(cv_payload["personal_info"], highest_education="")
+    values = [value for value in personal.values() if value]
+    for section in ("internships", "projects", "positions_of_responsibility"):
+        for entry in cv_payload[section]:
+            values.extend(entry["points"])
+    values.extend(entry["title"] for entry in cv_payload["projects"])
+    values.extend(entry["description"] for entry in cv_payload["achievements"])
+    values.extend(cv_payload["extracurricular"])
+    return [value.encode() for value in values]
+
+
+def test_training_skips_personal_details_and_free_text(document, cv_payload):
+    samples = [encode_document(document) for _ in range(10)]
+
+    dictionary = train_dictionary(samples)
+
+    assert b'"institute":' in dictionary
+    assert document["data"]["education"][0]["institute"].encode() in dictionary
+    assert document["metadata"]["cv_id"].encode() not in dictionary
+    for value in _private_values(cv_payload):
+        assert value not in dictionary
+
+
+def test_shipped_dictionary_has_no_personal_details(cv_payload):
+    dictionary = _dictionary(CURRENT_VERSION)
+
+    for value in _private_values(cv_payload):
+        assert value not in dictionary
+
+
+def test_documents_written_with_the_first_dictionary_are_read():
+    assert compact_version(V1_DOCUMENT) == 1
+    assert decode_document(V1_DOCUMENT) == {
+        "technical_skills": ["Python", "Docker"],
+        "education": [{"institute": "Stanford University"}],
+    }
+
+
+def test_convert_upgrades_older_compact_versions(tmp_path, cv_data):
+    service = CVService(generated_dir=str(tmp_path))
+    current = service.generate_cv(cv_data)
+    old = service.generate_cv(cv_data)
+    service.storage.write_data(old, V1_DOCUMENT)
+
+    assert convert_data_files(service.storage) == 1
+    assert compact_version(service.storage.read_data(old)) == CURRENT_VERSION
+    assert decode_document(service.storage.read_data(old)) == decode_document(V1_DOCUMENT)
+    assert compact_version(service.storage.read_data(current)) == CURRENT_VERSION
+    assert convert_data_files(service.storage) == 0
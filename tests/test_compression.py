@@ -0,0 +1,103 @@
+"""
+CompressionMiddleware: which responses are compressed on the fly
+"""
+import asyncio
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import GZIP, CompressionMiddleware
+
+ITEMS = [{"id": index, "name": "Jane Smith"} for index in range(100)]
+ENCODED = gzip.compress(b"[]" + b" " * 2000, mtime=0)
+
+
+def _app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/large")
+    def large():
+        return JSONResponse(ITEMS)
+
+    @app.get("/small")
+    def small():
+        return JSONResponse(ITEMS[:1])
+
+    @app.get("/html")
+    def html():
+        return HTMLResponse("<p>x</p>" * 500)
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(ENCODED, media_type="application/json", headers={"Content-Encoding": GZIP})
+
+    @app.get("/stream")
+    def stream():
+        lines = (f'{{"id": {index}}}\n' * 100 for index in range(3))
+        return StreamingResponse(lines, media_type="application/json")
+
+    return app
+
+
+@pytest.fixture
+def app_client():
+    return TestClient(_app())
+
+
+def test_large_json_is_compressed(app_client):
+    response = app_client.get("/large", headers={"Accept-Encoding": GZIP})
+
+    assert response.headers["content-encoding"] == GZIP
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == ITEMS
+
+
+@pytest.mark.parametrize("path, headers", [
+    ("/large", {"Accept-Encoding": "identity"}),
+    ("/large", {"Accept-Encoding": "gzip;q=0"}),
+    ("/small", {"Accept-Encoding": GZIP}),
+    ("/html", {"Accept-Encoding": GZIP}),
+])
+def test_response_passes_through_uncompressed(app_client, path, headers):
+    response = app_client.get(path, headers=headers)
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_already_encoded_response_is_left_alone(app_client):
+    response = app_client.get("/encoded", headers={"Accept-Encoding": GZIP})
+
+    assert response.headers["content-encoding"] == GZIP
+    assert response.headers["content-length"] == str(len(ENCODED))
+    assert response.json() == []
+
+
+def test_streaming_response_is_not_buffered():
+    # The test client joins body messages, so the middleware is driven directly
+    sent = []
+
+    async def receive():
+        # Only called to watch for a disconnect, which never comes
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "root_path": "",
+        "query_string": b"", "headers": [(b"accept-encoding", b"gzip")],
+    }
+    asyncio.run(_app()(scope, receive, send))
+
+    start, *bodies = sent
+    assert b"content-encoding" not in dict(start["headers"])
+    chunks = [message["body"] for message in bodies if message["body"]]
+    assert len(chunks) == 3
+    assert b"".join(chunks).count(b"\n") == 300
@@ -0,0 +1,58 @@
+"""
+POST /api/v1/cvs: JSON body in, 201 with the new CV's URLs out
+"""
+import pytest
+
+from app.dependencies import get_pdf_service
+
+
+def test_created_cv_is_returned_with_its_urls(client, cv_payload):
+    response = client.post("/api/v1/cvs", json=cv_payload)
+
+    assert response.status_code == 201
+    body = response.json()
+    cv_id = body["cv_id"]
+    assert body == {
+        "cv_id": cv_id,
+        "redirect_url": f"/cv/{cv_id}",
+        "html_url": f"/cv/{cv_id}/html",
+        "pdf_url": f"/cv/{cv_id}/pdf",
+        "data_url": f"/api/v1/cv/{cv_id}",
+        "message": "CV generated successfully",
+    }
+    assert response.headers["location"] == body["data_url"]
+
+    stored = client.get(body["data_url"])
+    assert stored.status_code == 200
+    assert stored.json()["metadata"]["cv_id"] == cv_id
+    assert stored.json()["data"]["personal_info"] == cv_payload["personal_info"]
+
+
+def test_invalid_body_returns_the_validation_errors(client, cv_payload):
+    del cv_payload["personal_info"]["full_name"]
+    cv_payload["technical_skills"] = []
+
+    response = client.post("/api/v1/cvs", json=cv_payload)
+
+    assert response.status_code == 422
+    locations = {tuple(error["loc"]) for error in response.json()["detail"]}
+    assert ("personal_info", "full_name") in locations
+    assert ("technical_skills",) in locations
+    assert all("input" not in error for error in response.json()["detail"])
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"[]", b""])
+def test_malformed_body_is_rejected(client, body):
+    response = client.post("/api/v1/cvs", content=body, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    assert isinstance(response.json()["detail"], list)
+
+
+def test_render_pdf_queues_a_prerender(client, cv_payload, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(get_pdf_service(), "schedule_prerender", lambda cv_id, cv_data: scheduled.append(cv_id))
+
+    cv_id = client.post("/api/v1/cvs", params={"render_pdf": "true"}, json=cv_payload).json()["cv_id"]
+
+    assert scheduled == [cv_id]
@@ -0,0 +1,104 @@
+"""
+CV metadata and search index: schema upgrades, bm25 ranking, field filters, query validation
+"""
+import copy
+import sqlite3
+
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.models.cv_data import CVData
+from app.services.cv_index import SCHEMA_VERSION, CVIndex
+from app.services.cv_service import CVService
+
+# The first released index schema: no data_mtime column, no search table, user_version 0
+_OLD_SCHEMA = """
+CREATE TABLE cvs (
+    cv_id TEXT PRIMARY KEY,
+    name TEXT,
+    created_at TEXT,
+    last_modified TEXT,
+    version TEXT,
+    status TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX idx_cvs_status_created ON cvs (status, created_at DESC, cv_id DESC);
+INSERT INTO cvs VALUES ('00000000-0000-4000-8000-000000000000', 'Gone', '', '', '1.0', 'ok', NULL);
+"""
+
+
+def test_index_with_old_schema_is_recreated(tmp_path, cv_data):
+    service = CVService(generated_dir=str(tmp_path))
+    cv_id = service.generate_cv(cv_data)
+    service.index._connection().close()
+
+    db_path = tmp_path / "index.sqlite3"
+    db_path.unlink()
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(_OLD_SCHEMA)
+
+    index = CVIndex(db_path)
+    assert index.needs_rebuild
+    columns = {row[1] for row in index._connection().execute("PRAGMA table_info(cvs)")}
+    assert "data_mtime" in columns
+
+    service = CVService(generated_dir=str(tmp_path))
+    assert [cv["cv_id"] for cv in service.list_cvs()] == [cv_id]
+    assert service.index._connection().execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert [cv["cv_id"] for cv in service.search_cvs(cv_data.personal_info.full_name.split()[0])] == [cv_id]
+
+
+def _cv(cv_payload, name, skills=("Python",), points=()):
+    payload = copy.deepcopy(cv_payload)
+    payload["personal_info"]["full_name"] = name
+    payload["technical_skills"] = list(skills)
+    payload["projects"][0]["points"] = list(points) or payload["projects"][0]["points"]
+    return CVData(**payload)
+
+
+@pytest.fixture
+def search_service(tmp_path, cv_payload):
+    service = CVService(generated_dir=str(tmp_path))
+    ids = {
+        "skills": service.generate_cv(_cv(cv_payload, "Asha Rao", skills=["Rust", "Go"])),
+        "points": service.generate_cv(_cv(cv_payload, "Ravi Kumar", points=["Rewrote the parser in Rust"])),
+        "none": service.generate_cv(_cv(cv_payload, "Meera Iyer")),
+    }
+    return service, ids
+
+
+def test_search_ranks_weighted_fields_first(search_service):
+    service, ids = search_service
+
+    results = service.search_cvs("rust")
+
+    assert [cv["cv_id"] for cv in results] == [ids["skills"], ids["points"]]
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_search_field_filter_and_prefix(search_service):
+    service, ids = search_service
+
+    assert [cv["cv_id"] for cv in service.search_cvs("rust", fields=["points"])] == [ids["points"]]
+    assert service.search_cvs("rust", fields=["name", "company"]) == []
+    # The last word matches as a prefix, accents are ignored
+    assert [cv["cv_id"] for cv in service.search_cvs("mée")] == [ids["none"]]
+
+
+@pytest.mark.parametrize("query, fields, message", [
+    ("!!! ???", None, "at least one word"),
+    ("rust", ["salary"], "Unknown search field"),
+])
+def test_search_rejects_invalid_queries(search_service, query, fields, message):
+    service, _ = search_service
+    with pytest.raises(ValidationError, match=message):
+        service.search_cvs(query, fields=fields)
+
+
+def test_search_input_is_never_parsed_as_fts_syntax(search_service):
+    service, ids = search_service
+
+    results = service.search_cvs('name:"asha" OR NEAR(')
+
+    assert [cv["cv_id"] for cv in results] == []
+    assert [cv["cv_id"] for cv in service.search_cvs('"asha"')] == [ids["skills"]]
@@ -0,0 +1,63 @@
+"""
+CV service: listing cursors and data files
+"""
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.services.cv_service import CVService
+from app.storage.base import DATA, JSON_DATA
+from app.storage.compact import FORMAT_JSON, is_compact
+
+
+@pytest.fixture
+def service(tmp_path) -> CVService:
+    return CVService(generated_dir=str(tmp_path))
+
+
+def test_cursor_round_trip():
+    cv_info = {"created_at": "2024-05-01T12:30:00", "cv_id": "0f6e1f7c-4a45-4d55-9d2b-0e0b8f1f7c11"}
+
+    cursor = CVService._encode_cursor(cv_info)
+
+    assert "=" not in cursor
+    assert CVService._decode_cursor(cursor) == (cv_info["created_at"], cv_info["cv_id"])
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "e30", "WzEsMl0", "WyJhIl0"])
+def test_invalid_cursor(cursor):
+    # e30 is {}, WzEsMl0 is [1,2], WyJhIl0 is ["a"]
+    with pytest.raises(ValidationError, match="Invalid cursor"):
+        CVService._decode_cursor(cursor)
+
+
+def test_pages_cover_every_cv_once(service, cv_data):
+    cv_ids = [service.generate_cv(cv_data) for _ in range(5)]
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = service.list_cvs_page(limit=2, cursor=cursor)
+        seen.extend(cv["cv_id"] for cv in page)
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(cv_ids)
+    assert seen == [cv["cv_id"] for cv in service.list_cvs()]
+
+
+def test_data_file_name_follows_format(tmp_path, cv_data):
+    json_service = CVService(generated_dir=str(tmp_path), data_format=FORMAT_JSON)
+    cv_id = json_service.generate_cv(cv_data)
+    storage = json_service.storage
+
+    assert storage.path_for(cv_id, JSON_DATA).name == "data.json"
+    assert not storage.path_for(cv_id, DATA).exists()
+
+    # Saving in the compact format replaces the JSON file
+    compact_service = CVService(generated_dir=str(tmp_path))
+    compact_service.update_cv_data(cv_id, cv_data)
+
+    assert storage.path_for(cv_id, DATA).name == "data.cvz"
+    assert is_compact(storage.path_for(cv_id, DATA).read_bytes())
+    assert not storage.path_for(cv_id, JSON_DATA).exists()
+    assert compact_service.get_cv_data(cv_id).data == cv_data
+    assert list(storage.iter_cv_ids()) == [cv_id]
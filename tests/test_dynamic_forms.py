@@ -0,0 +1,73 @@
+"""
+Dynamic CV form parsing and its limits, including over HTTP
+"""
+import pytest
+
+from app.core.exceptions import ValidationError
+from app.services.dynamic_forms import MAX_ENTRY_INDEX, MAX_FORM_FIELDS, parse_dynamic_form_data
+
+PERSONAL = [("full_name", "Asha Rao"), ("email", "asha@example.org")]
+
+
+def test_sections_are_collected_in_index_order():
+    data = parse_dynamic_form_data(PERSONAL + [
+        ("education[7][institute]", "Later"),
+        ("education[2][institute]", "Earlier"),
+        ("projects[0][title]", "Parser"),
+        ("projects[0][points][]", "one"),
+        ("projects[0][points][]", "two"),
+        ("technical_skills[]", "Python"),
+        ("technical_skills[]", "  "),
+        ("unknown_field", "ignored"),
+    ])
+
+    assert data["personal_info"]["full_name"] == "Asha Rao"
+    assert [entry["institute"] for entry in data["education"]] == ["Earlier", "Later"]
+    assert data["projects"] == [{"title": "Parser", "points": ["one", "two"]}]
+    assert data["technical_skills"] == ["Python"]
+
+
+def test_flat_form_is_not_dynamic():
+    assert parse_dynamic_form_data(PERSONAL + [("name", "Legacy")]) is None
+
+
+@pytest.mark.parametrize("as_generator", [False, True])
+def test_too_many_fields(as_generator):
+    items = [("technical_skills[]", "x")] * (MAX_FORM_FIELDS + 1)
+    if as_generator:
+        items = iter(items)
+    with pytest.raises(ValidationError, match="more than"):
+        parse_dynamic_form_data(items)
+
+
+def test_field_limit_is_inclusive():
+    items = [("technical_skills[]", "x")] * (MAX_FORM_FIELDS - 1) + [("education[0][institute]", "A")]
+    assert len(parse_dynamic_form_data(items)["technical_skills"]) == MAX_FORM_FIELDS - 1
+
+
+def test_entry_index_limit():
+    assert parse_dynamic_form_data([(f"education[{MAX_ENTRY_INDEX}][institute]", "A")])
+    with pytest.raises(ValidationError, match="exceeds"):
+        parse_dynamic_form_data([(f"education[{MAX_ENTRY_INDEX + 1}][institute]", "A")])
+
+
+@pytest.mark.parametrize("key", [
+    "education[0]",
+    "education[x][institute]",
+    "education[12345][institute]",
+    "education[0][" + "a" * 33 + "]",
+    "projects[0][points][][]",
+])
+def test_malformed_section_fields(key):
+    with pytest.raises(ValidationError, match="Malformed"):
+        parse_dynamic_form_data([(key, "value")])
+
+
+@pytest.mark.parametrize("multipart", [False, True])
+def test_generate_rejects_oversized_form(client, multipart):
+    fields = {f"field_{index}": "x" for index in range(MAX_FORM_FIELDS + 5)}
+    files = {"attachment": ("note.txt", b"x", "text/plain")} if multipart else None
+
+    response = client.post("/generate", data=fields, files=files, follow_redirects=False)
+
+    assert response.status_code == 400
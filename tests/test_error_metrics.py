@@ -0,0 +1,42 @@
+"""
+cv_errors_total counts application errors that fail a request, once each
+"""
+import uuid
+
+from app.core.metrics import ERRORS
+
+
+def _errors(name):
+    return ERRORS.labels(name).values()[0]
+
+
+def test_missing_cv_is_counted_once(client):
+    before = _errors("CVNotFoundError")
+
+    response = client.get(f"/api/v1/cv/{uuid.uuid4()}")
+
+    assert response.status_code == 404
+    assert "not found" in response.json()["detail"]
+    assert _errors("CVNotFoundError") == before + 1
+
+
+def test_error_turned_into_http_exception_is_counted(client):
+    before = _errors("ValidationError")
+
+    response = client.get("/api/v1/cvs", params={"limit": 5, "cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
+    assert _errors("ValidationError") == before + 1
+
+
+def test_errors_handled_inside_a_request_are_not_counted(client, cv_payload):
+    from app.dependencies import get_cv_service
+
+    before = _errors("CVNotFoundError")
+
+    # validate_cv_id raises and cv_exists catches
+    assert not get_cv_service().cv_exists("../not-a-cv")
+    cv_id = client.post("/api/v1/cvs", json=cv_payload).json()["cv_id"]
+    assert client.get(f"/api/v1/cv/{cv_id}").status_code == 200
+
+    assert _errors("CVNotFoundError") == before
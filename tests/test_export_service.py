@@ -0,0 +1,97 @@
+"""
+ZIP export: streamed entries, errors.txt and the render window
+"""
+import asyncio
+import io
+import uuid
+import zipfile
+
+import pytest
+
+from app.core.exceptions import PDFGenerationError
+from app.services.cv_service import CVService
+from app.services.export_service import ERRORS_ENTRY, ExportService
+
+
+class _PDFService:
+    """Stand-in PDF service: one PDF per CV, failing or held back on request"""
+
+    def __init__(self):
+        self.failing = set()
+        self.held = {}
+        self.running = self.peak = 0
+
+    async def get_cv_pdf(self, cv_id, cv_data):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            if cv_id in self.held:
+                await self.held[cv_id].wait()
+            else:
+                await asyncio.sleep(0.01)
+            if cv_id in self.failing:
+                raise PDFGenerationError("layout failed")
+            return f"%PDF {cv_id}".encode()
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def export(tmp_path, cv_data):
+    cv_service = CVService(generated_dir=str(tmp_path))
+    pdf_service = _PDFService()
+    cv_ids = [cv_service.generate_cv(cv_data) for _ in range(5)]
+    return ExportService(cv_service, pdf_service, concurrency=2), pdf_service, cv_ids
+
+
+def _collect(service, cv_ids):
+    async def scenario():
+        return [chunk async for chunk in service.stream_zip(cv_ids)]
+
+    return asyncio.run(scenario())
+
+
+def test_archive_lists_failures_in_errors_txt(export):
+    service, pdf_service, cv_ids = export
+    pdf_service.failing.add(cv_ids[1])
+    missing = str(uuid.uuid4())
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(_collect(service, cv_ids + [missing]))))
+
+    names = archive.namelist()
+    assert len(names) == 5 and names[-1] == ERRORS_ENTRY
+    # Every CV has the same name, so entries are told apart by ID and a counter
+    assert len(set(names)) == 5
+    assert all(name.startswith("jane_smith_") and name.endswith(".pdf") for name in names[:-1])
+    errors = archive.read(ERRORS_ENTRY).decode().splitlines()
+    assert sorted(line.split(":")[0] for line in errors) == sorted([cv_ids[1], missing])
+    assert "layout failed" in "\n".join(errors)
+    assert archive.testzip() is None
+    rendered = {f"%PDF {cv_id}".encode() for cv_id in cv_ids if cv_id != cv_ids[1]}
+    assert {archive.read(name) for name in names[:-1]} == rendered
+
+
+def test_entries_are_streamed_as_their_pdfs_are_ready(export):
+    service, pdf_service, cv_ids = export
+
+    async def scenario():
+        held = pdf_service.held[cv_ids[1]] = asyncio.Event()
+        stream = service.stream_zip(cv_ids[:2])
+        # The first PDF is sent while the second is still rendering
+        first = await stream.__anext__()
+        assert first.startswith(b"PK\x03\x04") and cv_ids[0].encode() in first
+        assert pdf_service.running == 1
+        held.set()
+        return [first] + [chunk async for chunk in stream]
+
+    chunks = asyncio.run(scenario())
+
+    assert len(zipfile.ZipFile(io.BytesIO(b"".join(chunks))).namelist()) == 2
+
+
+def test_renders_stay_within_the_concurrency_window(export):
+    service, pdf_service, cv_ids = export
+
+    _collect(service, cv_ids)
+
+    assert pdf_service.peak == service.concurrency
@@ -0,0 +1,98 @@
+"""
+HTML pages: memory LRU, disk cache and precompressed variants
+"""
+import gzip
+from pathlib import Path
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app.core.compression import BROTLI, ENCODINGS, GZIP, brotli
+from app.services.artifact_cache import ArtifactCache
+from app.services.html_service import HTMLService
+
+from conftest import REPO_ROOT
+
+CV_ID = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+
+@pytest.fixture
+def templates_env():
+    return Environment(loader=FileSystemLoader(str(REPO_ROOT / "templates")))
+
+
+def _service(templates_env, cache=None, memory_max_bytes=1024 * 1024):
+    service = HTMLService(templates_env, cache=cache, memory_max_bytes=memory_max_bytes)
+    service.renders = 0
+    render = service.render_html
+
+    def counting_render(*args, **kwargs):
+        service.renders += 1
+        return render(*args, **kwargs)
+
+    service.render_html = counting_render
+    return service
+
+
+def test_every_encoding_is_rendered_once(templates_env, cv_data):
+    service = _service(templates_env)
+
+    page = service.get_html(CV_ID, cv_data)
+    assert cv_data.personal_info.full_name.encode() in page
+    assert gzip.decompress(service.get_html(CV_ID, cv_data, encoding=GZIP)) == page
+    if BROTLI in ENCODINGS:
+        assert brotli.decompress(service.get_html(CV_ID, cv_data, encoding=BROTLI)) == page
+    assert service.get_html(CV_ID, cv_data) == page
+
+    assert service.renders == 1
+
+
+def test_display_page_is_a_separate_entry(templates_env, cv_data):
+    service = _service(templates_env)
+
+    plain = service.get_html(CV_ID, cv_data)
+    display = service.get_html(CV_ID, cv_data, download_filename="jane.pdf")
+
+    assert display != plain and b"jane.pdf" in display
+    assert service.renders == 2
+
+
+def test_edited_cv_is_rendered_again(templates_env, cv_data):
+    service = _service(templates_env)
+    service.get_html(CV_ID, cv_data)
+
+    edited = cv_data.model_copy(deep=True)
+    edited.personal_info.city = "Pune"
+    assert b"Pune" in service.get_html(CV_ID, edited)
+    assert service.renders == 2
+
+
+def test_memory_lru_stays_within_its_byte_limit(templates_env, cv_data):
+    page_bytes = len(_service(templates_env).render_html(CV_ID, cv_data).encode())
+    # Room for one page and its compressed variants, not two
+    service = _service(templates_env, memory_max_bytes=int(page_bytes * 1.5))
+    cv_ids = [f"{CV_ID[:-1]}{index}" for index in range(3)]
+
+    for cv_id in cv_ids:
+        service.get_html(cv_id, cv_data)
+    assert service._memory_bytes <= service.memory_max_bytes
+
+    # The latest page is still in memory, the first one was evicted
+    service.get_html(cv_ids[-1], cv_data)
+    assert service.renders == 3
+    service.get_html(cv_ids[0], cv_data)
+    assert service.renders == 4
+
+
+def test_disk_cache_is_shared_across_instances(templates_env, cv_data, tmp_path):
+    cache = ArtifactCache(tmp_path, max_bytes=10 * 1024 * 1024, suffix=".html")
+    page = _service(templates_env, cache=cache).get_html(CV_ID, cv_data)
+
+    # A fresh instance (another worker) has an empty memory LRU
+    service = _service(templates_env, cache=cache)
+    located = service.locate_html(CV_ID, cv_data, encoding=GZIP)
+
+    assert isinstance(located, Path)
+    assert gzip.decompress(located.read_bytes()) == page
+    assert service.get_html(CV_ID, cv_data) == page
+    assert service.renders == 0
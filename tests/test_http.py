@@ -0,0 +1,83 @@
+"""
+HTTP helpers: byte ranges, content-encoding negotiation, conditional requests
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.compression import BROTLI, GZIP, IDENTITY, negotiate_encoding
+from app.core.file_responses import RangeNotSatisfiable, parse_range
+from app.core.http_cache import http_date, is_not_modified, make_etag
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("BYTES = 0-0", (0, 0)),
+    ("bytes=0-1,5-9", None),
+    ("items=0-1", None),
+    ("bytes=a-b", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=5-2", "bytes=-0"])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable, match=r"bytes \*/1000"):
+        parse_range(header, 1000)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, IDENTITY),
+    ("", IDENTITY),
+    ("gzip, deflate, br", BROTLI),
+    ("gzip", GZIP),
+    ("br;q=0.5, gzip", GZIP),
+    ("br;q=1, gzip;q=1", BROTLI),
+    ("*", BROTLI),
+    ("*;q=0.1, br;q=0", GZIP),
+    ("gzip;q=0, br;q=0", IDENTITY),
+    ("gzip;q=bad", IDENTITY),
+    ("deflate", IDENTITY),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, available=(BROTLI, GZIP)) == expected
+
+
+def test_negotiate_encoding_only_offers_available():
+    assert negotiate_encoding("br, gzip;q=0.5", available=(GZIP,)) == GZIP
+
+
+ETAG = make_etag("0123456789abcdef" * 4)
+MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 500000)
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, False),
+    ({"if-none-match": ETAG}, True),
+    ({"if-none-match": f'"other", W/{ETAG}'}, True),
+    ({"if-none-match": "*"}, True),
+    ({"if-none-match": '"other"'}, False),
+    # If-None-Match wins over If-Modified-Since
+    ({"if-none-match": '"other"', "if-modified-since": http_date(MODIFIED)}, False),
+    ({"if-modified-since": http_date(MODIFIED)}, True),
+    ({"if-modified-since": http_date(MODIFIED + timedelta(days=1))}, True),
+    ({"if-modified-since": http_date(MODIFIED - timedelta(seconds=1))}, False),
+    ({"if-modified-since": "not a date"}, False),
+])
+def test_is_not_modified(headers, expected):
+    assert is_not_modified(headers, ETAG, MODIFIED) is expected
+
+
+def test_is_not_modified_compares_aware_and_naive_times():
+    aware = MODIFIED.replace(tzinfo=timezone.utc)
+    assert is_not_modified({"if-modified-since": http_date(MODIFIED)}, ETAG, aware)
+    assert not is_not_modified({"if-modified-since": http_date(MODIFIED)}, ETAG, None)
+
+
+def test_etag_differs_per_encoding():
+    assert make_etag("abc", GZIP) != make_etag("abc") == make_etag("abc", IDENTITY)
@@ -0,0 +1,103 @@
+"""
+Queue-based logging: records are written by the listener thread, to text or JSON
+"""
+import json
+import logging
+import threading
+from logging.handlers import RotatingFileHandler
+
+import pytest
+
+from app.core import logging as app_logging
+from app.core.logging import get_logger, setup_logging, stop_logging
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    yield tmp_path / "app.log"
+    # Back to the test configuration
+    setup_logging()
+
+
+def _queue_handlers():
+    return [
+        handler for handler in logging.getLogger().handlers
+        if isinstance(handler, app_logging._InProcessQueueHandler)
+    ]
+
+
+def test_records_are_written_by_the_listener_thread(log_file, monkeypatch):
+    setup_logging(level="INFO", log_file=str(log_file))
+    writers = []
+    handle = RotatingFileHandler.emit
+    monkeypatch.setattr(
+        RotatingFileHandler, "emit",
+        lambda self, record: writers.append(threading.current_thread()) or handle(self, record)
+    )
+
+    get_logger("tests.logging").info("rendered %s in %.1fs", "cv", 1.25)
+    get_logger("tests.logging").debug("below the level")
+    stop_logging()
+
+    lines = log_file.read_text().splitlines()
+    assert len(lines) == 1
+    assert lines[0].endswith(" - tests.logging - INFO - rendered cv in 1.2s")
+    assert writers and threading.main_thread() not in writers
+
+
+def test_json_lines_carry_extra_fields_and_tracebacks(log_file):
+    setup_logging(level="INFO", json_format=True, log_file=str(log_file))
+    logger = get_logger("tests.logging")
+
+    logger.info("saved", extra={"cv_id": "abc", "size": 3, "path": log_file})
+    try:
+        raise ValueError("bad data")
+    except ValueError:
+        logger.exception("failed")
+    stop_logging()
+
+    saved, failed = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert saved["message"] == "saved" and saved["level"] == "INFO"
+    assert saved["cv_id"] == "abc" and saved["size"] == 3
+    # Values the codec can't serialize are written as their repr
+    assert saved["path"] == repr(log_file)
+    assert failed["level"] == "ERROR"
+    assert "ValueError: bad data" in failed["exception"]
+
+
+def test_setup_again_replaces_the_previous_queue(log_file):
+    setup_logging(log_file=str(log_file))
+    first = app_logging._listener
+    setup_logging(log_file=str(log_file))
+
+    assert len(_queue_handlers()) == 1
+    assert app_logging._listener is not first
+    assert first._thread is None
+
+
+def test_log_file_is_rotated(log_file):
+    setup_logging(level="INFO", log_file=str(log_file), max_bytes=200, backup_count=2)
+
+    for index in range(20):
+        get_logger("tests.logging").info("line %d", index)
+    stop_logging()
+
+    assert log_file.exists()
+    assert (log_file.parent / "app.log.1").exists()
+    assert not (log_file.parent / "app.log.3").exists()
+
+
+def test_message_keeps_the_arguments_of_the_call(log_file, monkeypatch):
+    setup_logging(level="INFO", log_file=str(log_file))
+    written = threading.Event()
+    handle = RotatingFileHandler.emit
+    # Hold the listener so the record is written after the list changes
+    monkeypatch.setattr(RotatingFileHandler, "emit", lambda self, record: written.wait(5) and handle(self, record))
+    rows = ["first"]
+
+    get_logger("tests.logging").info("rows: %s", rows)
+    rows.append("second")
+    written.set()
+    stop_logging()
+
+    assert log_file.read_text().rstrip().endswith("rows: ['first']")
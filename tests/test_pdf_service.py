@@ -0,0 +1,49 @@
+"""
+PDF rendering: reproducible output
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from app.core.templates import create_templates
+from app.services.pdf_service import PDF_STYLESHEET, PDF_TEMPLATE, render_pdf_bytes
+
+from conftest import REPO_ROOT
+
+weasyprint_error = ""
+try:
+    import weasyprint  # noqa: F401
+except (ImportError, OSError) as exc:  # OSError: Pango/HarfBuzz libraries missing
+    weasyprint_error = str(exc).splitlines()[0]
+
+requires_weasyprint = pytest.mark.skipif(bool(weasyprint_error), reason=f"WeasyPrint cannot load: {weasyprint_error}")
+
+STYLESHEET = str(REPO_ROOT / "templates" / PDF_STYLESHEET)
+
+
+@pytest.fixture
+def pdf_html(cv_data) -> str:
+    env = create_templates(str(REPO_ROOT / "templates"), "").env
+    return env.get_template(PDF_TEMPLATE).render(**cv_data.model_dump())
+
+
+@requires_weasyprint
+def test_same_cv_renders_identical_bytes(pdf_html):
+    first = render_pdf_bytes(pdf_html, stylesheet=STYLESHEET)
+    second = render_pdf_bytes(pdf_html, stylesheet=STYLESHEET)
+
+    assert first.startswith(b"%PDF")
+    assert first == second
+    assert b"/CreationDate" not in first
+    assert b"/ModDate" not in first
+    assert b"/ID" not in first
+
+
+@requires_weasyprint
+def test_render_worker_process_produces_identical_bytes(pdf_html):
+    # Cache entries written by one render worker are served for renders in any other
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        from_worker = pool.submit(render_pdf_bytes, pdf_html, STYLESHEET).result(timeout=120)
+
+    assert from_worker == render_pdf_bytes(pdf_html, stylesheet=STYLESHEET)
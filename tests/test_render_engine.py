@@ -0,0 +1,149 @@
+"""
+Render engine: timeouts and pool restarts
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core.exceptions import PDFGenerationError
+from app.services import render_engine
+from app.services.render_engine import PDFRenderEngine
+
+# Holds "hang" renders; in a worker process nothing sets it, so they hang until killed
+_RELEASE = threading.Event()
+
+
+def _render(html_content, stylesheet=None):
+    if html_content == "hang":
+        _RELEASE.wait(60)
+    elif html_content == "slow":
+        time.sleep(0.2)
+    elif html_content == "fail":
+        raise ValueError("layout failed")
+    return html_content.encode()
+
+
+def _render_file(html_content, target, stylesheet=None):
+    _render(html_content)
+    return target
+
+
+def _warm_up():
+    pass
+
+
+@pytest.fixture(autouse=True)
+def fake_render(monkeypatch):
+    """Stand-ins for WeasyPrint, importable by spawned workers"""
+    monkeypatch.setattr(render_engine, "render_pdf_bytes", _render)
+    monkeypatch.setattr(render_engine, "render_pdf_file", _render_file)
+    monkeypatch.setattr(render_engine, "_warm_up_worker", _warm_up)
+    _RELEASE.clear()
+    yield
+    _RELEASE.set()
+
+
+def test_timeout_kills_stuck_worker_and_resubmits_queued_render():
+    engine = PDFRenderEngine(workers=1, timeout=60)
+
+    async def scenario():
+        # Start the worker before timing anything
+        assert await engine.render("warm") == b"warm"
+        old_workers = list(engine._executor._processes.values())
+
+        # One worker: "next" is queued behind the stuck render
+        stuck = asyncio.ensure_future(engine.render_file("hang", "out.pdf", timeout=1))
+        queued = asyncio.ensure_future(engine.render("next"))
+        results = await asyncio.gather(stuck, queued, return_exceptions=True)
+        return old_workers, results
+
+    try:
+        old_workers, (stuck, queued) = asyncio.run(scenario())
+    finally:
+        engine.shutdown()
+
+    assert isinstance(stuck, PDFGenerationError)
+    assert "timed out" in str(stuck)
+    assert queued == b"next"
+    for process in old_workers:
+        process.join(timeout=5)
+        assert not process.is_alive()
+
+
+def test_timeout_in_thread_mode_resubmits_queued_render():
+    engine = PDFRenderEngine(workers=0, timeout=60)
+
+    async def scenario():
+        stuck = asyncio.ensure_future(engine.render_file("hang", "out.pdf", timeout=0.5))
+        queued = asyncio.ensure_future(engine.render("next"))
+        return await asyncio.gather(stuck, queued, return_exceptions=True)
+
+    try:
+        stuck, queued = asyncio.run(scenario())
+    finally:
+        _RELEASE.set()
+        engine.shutdown()
+
+    assert isinstance(stuck, PDFGenerationError)
+    assert queued == b"next"
+
+
+def test_time_spent_queued_does_not_count_towards_the_timeout():
+    # One render slot: the last of six 0.2 s renders finishes after 1.2 s
+    engine = PDFRenderEngine(workers=0, timeout=0.5)
+
+    async def scenario():
+        return await asyncio.gather(*(engine.render("slow") for _ in range(6)), return_exceptions=True)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        engine.shutdown()
+
+    assert results == [b"slow"] * 6
+
+
+def test_render_error_is_wrapped():
+    engine = PDFRenderEngine(workers=0, timeout=60)
+
+    try:
+        with pytest.raises(PDFGenerationError, match="layout failed"):
+            asyncio.run(engine.render("fail"))
+    finally:
+        engine.shutdown()
+
+
+def test_shutdown_fails_queued_render_with_generation_error():
+    engine = PDFRenderEngine(workers=0, timeout=60)
+
+    async def scenario():
+        running = asyncio.ensure_future(engine.render("hang"))
+        queued = asyncio.ensure_future(engine.render("next"))
+        await asyncio.sleep(0.1)
+        threading.Timer(0.2, _RELEASE.set).start()
+        engine.shutdown()
+        return await asyncio.gather(running, queued, return_exceptions=True)
+
+    running, queued = asyncio.run(scenario())
+
+    assert running == b"hang"
+    assert isinstance(queued, PDFGenerationError)
+
+
+def test_cancelled_caller_is_not_converted():
+    engine = PDFRenderEngine(workers=0, timeout=60)
+
+    async def scenario():
+        task = asyncio.ensure_future(engine.render("hang"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        _RELEASE.set()
+        engine.shutdown()
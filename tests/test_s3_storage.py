@@ -0,0 +1,108 @@
+"""
+S3 storage backend, against moto's in-process S3
+"""
+import uuid
+
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from app.services.cv_service import CVService  # noqa: E402
+from app.storage import s3  # noqa: E402
+from app.storage.base import DATA, HTML, JSON_DATA, PDF  # noqa: E402
+
+BUCKET = "cv-generator-tests"
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    # Clients are shared per process; one made outside the mock would reach AWS
+    s3.get_s3_client.cache_clear()
+    with moto.mock_aws():
+        backend = s3.S3StorageBackend(BUCKET, region="us-east-1", multipart_threshold=5 * 1024 * 1024)
+        backend.client.create_bucket(Bucket=BUCKET)
+        yield backend
+    s3.get_s3_client.cache_clear()
+
+
+def test_write_read_delete(storage):
+    cv_id = str(uuid.uuid4())
+
+    storage.write_bytes(cv_id, HTML, b"<html></html>")
+
+    assert storage.read_bytes(cv_id, HTML) == b"<html></html>"
+    assert storage.exists(cv_id, HTML)
+    assert storage.mtime(cv_id, PDF) is None
+    head = storage.client.head_object(Bucket=BUCKET, Key=storage.key_for(cv_id, HTML))
+    assert head["ContentType"] == "text/html; charset=utf-8"
+
+    storage.delete(cv_id, HTML)
+    assert not storage.exists(cv_id, HTML)
+    with pytest.raises(FileNotFoundError):
+        storage.read_bytes(cv_id, HTML)
+
+
+def test_large_artifact_uses_multipart_upload(storage):
+    cv_id = str(uuid.uuid4())
+    content = bytes(range(256)) * (24 * 1024)  # 6 MiB: two parts
+
+    storage.write_bytes(cv_id, PDF, content)
+
+    assert storage.read_bytes(cv_id, PDF) == content
+    head = storage.client.head_object(Bucket=BUCKET, Key=storage.key_for(cv_id, PDF))
+    # Multipart ETags end in -<part count>
+    assert head["ETag"].strip('"').endswith("-2")
+    assert head["ContentType"] == "application/pdf"
+
+
+def test_listing_pages_and_only_counts_data_objects(storage):
+    cv_ids = {str(uuid.uuid4()) for _ in range(1005)}
+    for cv_id in cv_ids:
+        storage.client.put_object(Bucket=BUCKET, Key=storage.key_for(cv_id, DATA), Body=b"{}")
+    # A plain JSON data file next to the compact one is the same CV
+    storage.write_bytes(min(cv_ids), JSON_DATA, b"{}")
+    # Artifacts without data, objects outside the prefix and look-alike names are not CVs
+    orphan = str(uuid.uuid4())
+    storage.write_bytes(orphan, HTML, b"<html></html>")
+    storage.client.put_object(Bucket=BUCKET, Key=f"other/{orphan}/data.json", Body=b"{}")
+    storage.client.put_object(Bucket=BUCKET, Key=f"{storage.prefix}{orphan}_data.json", Body=b"{}")
+
+    stamps = list(storage.iter_cv_stamps())
+
+    # More than one ListObjectsV2 page (1000 keys each)
+    assert len(stamps) == 1005
+    assert {cv_id for cv_id, _ in stamps} == cv_ids
+    assert all(isinstance(mtime, float) for _, mtime in stamps)
+
+
+def test_delete_all_removes_every_artifact(storage):
+    cv_id, other = str(uuid.uuid4()), str(uuid.uuid4())
+    for artifact in (DATA, HTML, PDF):
+        storage.write_bytes(cv_id, artifact, b"x")
+    storage.write_bytes(other, DATA, b"x")
+
+    storage.delete_all(cv_id)
+
+    assert [artifact for artifact in (DATA, HTML, PDF) if storage.exists(cv_id, artifact)] == []
+    assert list(storage.iter_cv_ids()) == [other]
+
+
+def test_cv_service_round_trip(storage, tmp_path, cv_data):
+    service = CVService(generated_dir=str(tmp_path), storage=storage)
+    cv_id = service.generate_cv(cv_data)
+
+    assert service.get_cv_data(cv_id).data == cv_data
+    head = storage.client.head_object(Bucket=BUCKET, Key=f"{storage.prefix}{cv_id}/data.cvz")
+    assert head["ContentType"] == "application/octet-stream"
+    assert [cv["cv_id"] for cv in service.list_cvs()] == [cv_id]
+
+    # A second instance sharing the bucket picks the CV up from the listing
+    replica = CVService(generated_dir=str(tmp_path / "replica"), storage=storage)
+    assert [cv["cv_id"] for cv in replica.list_cvs()] == [cv_id]
+
+    service.delete_cv(cv_id)
+    assert service.list_cvs() == []
+    assert list(storage.iter_cv_ids()) == []
@@ -0,0 +1,80 @@
+"""
+Legacy flat layout migration
+"""
+import uuid
+
+import pytest
+
+from app.core.config import Settings
+from app.storage.factory import create_storage_backend
+from app.storage.local import LocalStorageBackend
+from app.storage.migrate import migrate_flat_to_sharded
+
+
+@pytest.fixture
+def flat_root(tmp_path):
+    """A flat ``generated/`` with one complete CV, one orphan and a hand-made sample"""
+    cv_id, orphan_id = str(uuid.uuid4()), str(uuid.uuid4())
+    for name in (f"{cv_id}_data.json", f"{cv_id}.html", f"{cv_id}_display.html", f"{cv_id}.pdf"):
+        (tmp_path / name).write_bytes(name.encode())
+    (tmp_path / f"{orphan_id}.html").write_text("orphan")
+    (tmp_path / f"{orphan_id}_display.html").write_text("orphan")
+    (tmp_path / "test_cv_jane_smith.pdf").write_text("sample")
+    return tmp_path, cv_id, orphan_id
+
+
+def test_migrate_moves_cvs_and_keeps_orphans(flat_root):
+    root, cv_id, orphan_id = flat_root
+
+    assert migrate_flat_to_sharded(str(root)) == 1
+
+    sharded = LocalStorageBackend(root)
+    assert sharded.read_data(cv_id) == f"{cv_id}_data.json".encode()
+    assert sharded.path_for(cv_id, "json_data").name == "data.json"
+    assert sharded.read_bytes(cv_id, "display_html") == f"{cv_id}_display.html".encode()
+    assert sharded.read_bytes(cv_id, "pdf") == f"{cv_id}.pdf".encode()
+    assert list(sharded.iter_cv_ids()) == [cv_id]
+    assert sorted(path.name for path in root.iterdir() if path.is_file() and not path.name.startswith(".")) == [
+        f"{orphan_id}.html", f"{orphan_id}_display.html", "test_cv_jane_smith.pdf"
+    ]
+
+
+def test_delete_orphans(flat_root):
+    root, _, orphan_id = flat_root
+
+    migrate_flat_to_sharded(str(root), delete_orphans=True)
+
+    assert not (root / f"{orphan_id}.html").exists()
+    assert (root / "test_cv_jane_smith.pdf").exists()
+
+
+def test_orphan_whose_data_was_moved_meanwhile_is_kept(flat_root):
+    root, _, orphan_id = flat_root
+    # Another worker moved the data file to the sharded layout after this one scanned
+    sharded = LocalStorageBackend(root)
+    sharded.write_bytes(orphan_id, "json_data", b"{}")
+
+    migrate_flat_to_sharded(str(root), delete_orphans=True)
+
+    assert (root / f"{orphan_id}.html").exists()
+
+
+def test_dry_run_changes_nothing(flat_root):
+    root, _, _ = flat_root
+    before = sorted(path.name for path in root.iterdir())
+
+    assert migrate_flat_to_sharded(str(root), dry_run=True, delete_orphans=True) == 1
+    assert sorted(path.name for path in root.iterdir() if path.name != ".migrate.lock") == before
+
+
+def test_local_backend_migrates_on_start(flat_root, monkeypatch):
+    root, cv_id, orphan_id = flat_root
+    monkeypatch.setenv("CV_GENERATED_DIR", str(root))
+    monkeypatch.setenv("CV_STORAGE_BACKEND", "local")
+
+    storage = create_storage_backend(Settings())
+
+    assert list(storage.iter_cv_ids()) == [cv_id]
+    assert not (root / f"{cv_id}_data.json").exists()
+    # Startup never deletes
+    assert (root / f"{orphan_id}.html").exists()